@@ -1,20 +1,67 @@
-"""CLI entrypoint for running the Pit Viper nightly job."""
+"""CLI entrypoint for running the Pit Viper nightly job.
+
+Only the standard library is imported before arguments are parsed; pandas,
+the connectors and the API clients load once a stage actually runs, so
+``--help`` and single-stage intraday refreshes stay cheap to start.
+"""
 from __future__ import annotations
 
 import argparse
 import json
 
-from .orchestration.advice_job import run_daily_advice
-from .utils.config import load_config
+STAGES = ("all", "ingest", "sentiment", "compact")
 
 
-def main() -> None:
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run the Pit Viper daily advice pipeline")
-    parser.add_argument("--output", help="Optional path to write the advice JSON payload")
-    args = parser.parse_args()
+    parser.add_argument("--output", help="Optional path to write the JSON payload")
+    parser.add_argument(
+        "--stage",
+        choices=STAGES,
+        default="all",
+        help=(
+            "Run the full advice job (default), only market ingestion and features, only sentiment collection, "
+            "or storage compaction and retention"
+        ),
+    )
+    parser.add_argument(
+        "--holdings",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Holdings export or directory of exports for one portfolio (repeatable); portfolios share one market pass and are keyed by file name",
+    )
+    parser.add_argument(
+        "--tickers",
+        default="",
+        help="Comma-separated tickers scored by the sentiment stage",
+    )
+    return parser
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+
+    from .orchestration import advice_job
+    from .utils.config import load_config
 
     config = load_config()
-    payload = run_daily_advice(config)
+    if args.stage == "compact":
+        from .orchestration.maintenance import run_storage_maintenance
+
+        payload = run_storage_maintenance(config)
+    elif args.stage == "ingest":
+        payload = advice_job.run_market_refresh(config)
+    elif args.stage == "sentiment":
+        tickers = [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()]
+        payload = advice_job.run_sentiment_refresh(config, tickers)
+    elif args.holdings:
+        from pathlib import Path
+
+        portfolios = {Path(path).stem: advice_job.load_portfolio(config, path) for path in args.holdings}
+        payload = advice_job.run_batch_advice(config, portfolios)
+    else:
+        payload = advice_job.run_daily_advice(config)
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as handle:
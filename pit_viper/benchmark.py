@@ -0,0 +1,277 @@
+"""Stage-level benchmarks on synthetic universes, with baseline comparison.
+
+Run ``python -m pit_viper.benchmark --output bench.json`` to time each stage
+at every universe size, and ``--compare baseline.json`` to flag stages that
+got slower than a stored run (the exit status is 1 when any did).
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .ingestion.base import IngestionResult
+from .ingestion.synthetic import synthetic_market, synthetic_symbols
+from .processing.feature_pipeline import clean_and_combine, engineer_features
+from .processing.portfolio import latest_prices, reconcile, value_holdings
+from .processing.scoring import rank_assets, score_assets
+from .sentiment.lexicon import lexicon_scorer
+from .sentiment.scoring import score_texts, vader_compound
+from .utils.storage import DataStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (10, 1_000, 10_000, 100_000)
+DEFAULT_REPEATS = 3
+DEFAULT_HISTORY_DAYS = 20
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA = 0.005
+SNAPSHOT_NAME = "market_benchmark"
+ASSET_MIX = (("equity", 0.7), ("crypto", 0.3))
+HEADLINE_WORDS = (
+    "shares", "stock", "earnings", "guidance", "rally", "surges", "plunges", "beats", "misses", "strong",
+    "weak", "great", "terrible", "not", "very", "record", "losses", "growth", "crash", "upgrade",
+    "downgrade", "!", "good", "bad", "investors", "fear", "optimism", "lawsuit", "dividend", "boost",
+)
+
+
+@dataclass
+class Universe:
+    """Pre-built inputs for every stage at one size; building them is not timed.
+
+    ``store`` already holds the snapshot and history the read stages load, so
+    they can run on their own; the write stages go to ``scratch``, whose
+    history is cleared before every timed run.
+    """
+
+    size: int
+    results: List[IngestionResult]
+    history: pd.DataFrame
+    combined: pd.DataFrame
+    features: pd.DataFrame
+    ranked: pd.DataFrame
+    holdings: pd.DataFrame
+    texts: List[str]
+    store: DataStore
+    scratch: DataStore
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[Universe], Any]
+    max_size: int | None = None
+    prepare: Callable[[Universe], Any] | None = None
+
+
+def _texts(count: int, seed: int = 0) -> List[str]:
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(6, 16, count)
+    words = np.asarray(HEADLINE_WORDS, dtype=object)[rng.integers(0, len(HEADLINE_WORDS), lengths.sum())]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return [f"{idx} " + " ".join(words[bounds[idx] : bounds[idx + 1]]) for idx in range(count)]
+
+
+def build_universe(size: int, root: Path, history_days: int = DEFAULT_HISTORY_DAYS, end: str = "2024-06-28") -> Universe:
+    """Synthetic market, features, holdings and headlines for ``size`` assets."""
+
+    results, histories = [], []
+    for asset_type, share in ASSET_MIX:
+        count = max(int(round(size * share)), 1)
+        symbols = synthetic_symbols(count, prefix=asset_type[:2].upper())
+        bars = synthetic_market(symbols, days=history_days + 1, asset_type=asset_type, end=end)
+        latest = bars["as_of"] == bars["as_of"].max()
+        results.append(IngestionResult(asset_type, bars[latest].drop(columns="asset_type").reset_index(drop=True), {}))
+        histories.append(bars[~latest])
+    history = pd.concat(histories, ignore_index=True)
+    combined = clean_and_combine(results)
+    features = engineer_features(combined, history)
+    ranked = rank_assets(features, top_n=len(features))
+    lots = combined.sample(n=max(len(combined) // 10, 1), random_state=0)
+    holdings = pd.DataFrame(
+        {
+            "asset_id": lots["asset_id"].to_numpy(),
+            "asset_type": lots["asset_type"].to_numpy(),
+            "quantity": 10.0,
+            "cost_basis": lots["close"].to_numpy() * 9.0,
+            "source": "benchmark",
+            "account": np.where(np.arange(len(lots)) % 2, "taxable", "ira"),
+        }
+    )
+    store = DataStore(root / str(size) / "seeded")
+    store.write_frame(combined, "processed", SNAPSHOT_NAME)
+    store.write_history(history, "processed")
+    scratch = DataStore(root / str(size) / "scratch")
+    return Universe(size, results, history, combined, features, ranked, holdings, _texts(size), store, scratch)
+
+
+def _value_and_reconcile(universe: Universe) -> pd.DataFrame:
+    valuation = value_holdings(universe.holdings, latest_prices(universe.combined))
+    return reconcile(universe.holdings, universe.ranked, valuation)
+
+
+def _clear_scratch_history(universe: Universe) -> None:
+    shutil.rmtree(universe.scratch.history_path("processed"), ignore_errors=True)
+
+
+STAGES: Sequence[Stage] = (
+    Stage("clean_and_combine", lambda u: clean_and_combine(u.results)),
+    Stage("engineer_features", lambda u: engineer_features(u.combined, u.history)),
+    Stage("score_assets", lambda u: score_assets(u.features)),
+    Stage("rank_assets", lambda u: rank_assets(u.features)),
+    Stage("reconcile", _value_and_reconcile),
+    Stage("sentiment_vader", lambda u: score_texts(u.texts, vader_compound), max_size=10_000),
+    Stage("sentiment_lexicon", lambda u: score_texts(u.texts, lexicon_scorer())),
+    Stage("store_write", lambda u: u.scratch.write_frame(u.combined, "processed", SNAPSHOT_NAME)),
+    Stage("store_read", lambda u: u.store.read_frame("processed", SNAPSHOT_NAME)),
+    Stage("history_write", lambda u: u.scratch.write_history(u.history, "processed"), prepare=_clear_scratch_history),
+    Stage(
+        "history_read",
+        lambda u: u.store.read_history("processed", columns=["asset_id", "as_of", "close", "volume"], asset_types=["equity"]),
+    ),
+)
+
+
+def _time(stage: Stage, universe: Universe, repeats: int) -> Dict[str, Any]:
+    runs = []
+    output = None
+    for _ in range(repeats):
+        if stage.prepare is not None:
+            stage.prepare(universe)
+        gc.collect()
+        start = time.perf_counter()
+        output = stage.run(universe)
+        runs.append(time.perf_counter() - start)
+    rows = len(output) if hasattr(output, "__len__") and not isinstance(output, (str, Path)) else None
+    return {
+        "stage": stage.name,
+        "size": universe.size,
+        "rows": rows,
+        "min_s": min(runs),
+        "median_s": statistics.median(runs),
+        "runs": runs,
+    }
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    stages: Sequence[str] | None = None,
+    repeats: int = DEFAULT_REPEATS,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+) -> Dict[str, Any]:
+    """Time every selected stage at every size; stages above their ``max_size`` are skipped."""
+
+    selected = [stage for stage in STAGES if stages is None or stage.name in stages]
+    results = []
+    with tempfile.TemporaryDirectory(prefix="pit-viper-bench-") as tmp:
+        for size in sizes:
+            universe = build_universe(size, Path(tmp), history_days)
+            for stage in selected:
+                if stage.max_size is not None and size > stage.max_size:
+                    continue
+                result = _time(stage, universe, repeats)
+                logger.info("%s @ %d: %.4fs", stage.name, size, result["min_s"])
+                results.append(result)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "repeats": repeats,
+            "history_days": history_days,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> List[Dict[str, Any]]:
+    """Match results by stage and size; a stage regresses when its best time grew by more than
+    ``threshold`` (relative) and ``min_delta`` seconds (absolute, to ignore timer noise)."""
+
+    reference = {(row["stage"], row["size"]): row["min_s"] for row in baseline.get("results", [])}
+    rows = []
+    for row in current.get("results", []):
+        before = reference.get((row["stage"], row["size"]))
+        if before is None:
+            continue
+        after = row["min_s"]
+        ratio = after / before if before > 0 else float("inf")
+        rows.append(
+            {
+                "stage": row["stage"],
+                "size": row["size"],
+                "baseline_s": before,
+                "current_s": after,
+                "ratio": ratio,
+                "regressed": ratio > 1 + threshold and after - before > min_delta,
+            }
+        )
+    return rows
+
+
+def _format(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'stage':<20}{'size':>9}{'baseline':>12}{'current':>12}{'ratio':>8}"]
+    for row in rows:
+        flag = "  SLOWER" if row["regressed"] else ""
+        lines.append(
+            f"{row['stage']:<20}{row['size']:>9}{row['baseline_s']:>12.4f}{row['current_s']:>12.4f}{row['ratio']:>8.2f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark Pit Viper pipeline stages on synthetic universes")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="Comma-separated universe sizes")
+    parser.add_argument("--stages", default="", help=f"Comma-separated subset of: {', '.join(stage.name for stage in STAGES)}")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Timed runs per stage; the best is compared")
+    parser.add_argument("--history-days", type=int, default=DEFAULT_HISTORY_DAYS, help="Bars of history behind each asset")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--compare", metavar="BASELINE", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA, help="Ignore slowdowns smaller than this many seconds")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()] or None
+    report = run_benchmarks(sizes, stages, args.repeats, args.history_days)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if not args.compare:
+        if not args.output:
+            print(json.dumps(report, indent=2))
+        return 0
+    rows = compare(report, json.loads(Path(args.compare).read_text()), args.threshold, args.min_delta)
+    print(_format(rows))
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+__all__ = ["STAGES", "Stage", "Universe", "build_universe", "compare", "run_benchmarks"]
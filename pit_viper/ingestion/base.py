@@ -4,11 +4,13 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Callable, Dict, Iterable, List, Tuple
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
 
-import numpy as np
 import pandas as pd
 
+from .quotes import QuoteCache, stamp_live
+from .synthetic import synthetic_market
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,41 +24,96 @@ class IngestionResult:
 
 
 def _generate_mock_prices(symbols: Iterable[str], asset_type: str) -> pd.DataFrame:
-    """Generate deterministic-yet-random-looking price data for tests/offline work."""
-
-    now = datetime.utcnow()
-    records: List[Dict[str, object]] = []
-    for idx, symbol in enumerate(symbols):
-        base_price = 10 + idx * 5
-        rng = np.random.default_rng(seed=hash(symbol) % 2**32)
-        close_price = base_price * rng.uniform(0.95, 1.05)
-        records.append(
-            {
-                "asset_id": symbol,
-                "asset_type": asset_type,
-                "currency": "USD",
-                "close": round(close_price, 2),
-                "open": round(close_price * rng.uniform(0.98, 1.02), 2),
-                "high": round(close_price * rng.uniform(1.00, 1.05), 2),
-                "low": round(close_price * rng.uniform(0.95, 1.00), 2),
-                "volume": int(rng.integers(1_000, 1_000_000)),
-                "as_of": now,
-            }
-        )
-    return pd.DataFrame.from_records(records)
-
-
-def safe_call(callable_fn: Callable[[], pd.DataFrame], fallback: pd.DataFrame) -> Tuple[pd.DataFrame, bool]:
-    """Execute an ingestion function and fall back to offline data when it fails."""
-
-    try:
-        result = callable_fn()
-        if not isinstance(result, pd.DataFrame) or result.empty:
-            raise ValueError("ingestion produced no data")
-        return result, False
-    except Exception as exc:  # noqa: BLE001 - we want to log any ingestion failure
-        logger.warning("Falling back to offline data for ingestion: %s", exc, exc_info=True)
-        return fallback.copy(), True
-
-
-__all__ = ["IngestionResult", "safe_call", "_generate_mock_prices"]
+    """Generate deterministic-yet-random-looking price data for tests/offline work.
+
+    One synthetic bar per symbol, seeded from the symbol itself so the same
+    symbol gets the same price in every process.
+    """
+
+    frame = synthetic_market(list(symbols), days=1, asset_type=asset_type, end=datetime.utcnow())
+    return frame.round({"close": 2, "open": 2, "high": 2, "low": 2})
+
+
+def offline_quotes(asset_type: str, symbols: Sequence[str], quotes: QuoteCache | None = None) -> pd.DataFrame:
+    """Serve the last known good quote per symbol regardless of age, then mock data for the rest."""
+
+    frames: List[pd.DataFrame] = []
+    missing = list(symbols)
+    stale = quotes.lookup(asset_type, missing) if quotes is not None and missing else pd.DataFrame()
+    if not stale.empty:
+        logger.warning("Serving last known good %s quotes for %s", asset_type, ", ".join(stale["asset_id"]))
+        frames.append(stale.assign(quote_source="stale"))
+        served = set(stale["asset_id"])
+        missing = [symbol for symbol in missing if symbol not in served]
+    if missing:
+        logger.warning("Falling back to offline %s data for %s", asset_type, ", ".join(missing))
+        frames.append(_generate_mock_prices(missing, asset_type).assign(quote_source="mock", fetched_at=pd.NaT))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def resilient_fetch(
+    asset_type: str,
+    symbols: Sequence[str],
+    fetch: Callable[[List[str]], pd.DataFrame],
+    quotes: QuoteCache | None = None,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Fetch quotes, degrading symbol by symbol instead of replacing the whole batch.
+
+    Symbols with a quote younger than the cache freshness window are answered
+    from the cache immediately and re-fetched in the background. The rest are
+    fetched live; any symbol the connector could not return falls back to its
+    last known good quote regardless of age, and only then to mock data. Each
+    row carries a ``quote_source`` of ``live``, ``cache``, ``stale`` or ``mock``.
+    """
+
+    symbols = list(dict.fromkeys(symbols))
+    frames: List[pd.DataFrame] = []
+    fresh = quotes.lookup(asset_type, symbols, fresh_only=True) if quotes is not None else pd.DataFrame()
+    fresh_symbols = set(fresh["asset_id"]) if not fresh.empty else set()
+    if fresh_symbols:
+        frames.append(fresh.assign(quote_source="cache"))
+    to_fetch = [symbol for symbol in symbols if symbol not in fresh_symbols]
+
+    live = pd.DataFrame()
+    if to_fetch:
+        try:
+            result = fetch(to_fetch)
+            if isinstance(result, pd.DataFrame) and not result.empty:
+                live = stamp_live(result, asset_type, to_fetch)
+        except Exception as exc:  # noqa: BLE001 - we want to log any ingestion failure
+            logger.warning("Live %s fetch failed for %d symbols: %s", asset_type, len(to_fetch), exc, exc_info=True)
+    if not live.empty:
+        frames.append(live)
+        if quotes is not None:
+            quotes.update(live)
+
+    fetched = fresh_symbols | (set(live["asset_id"]) if not live.empty else set())
+    missing = [symbol for symbol in symbols if symbol not in fetched]
+    if missing:
+        frames.append(offline_quotes(asset_type, missing, quotes))
+
+    if fresh_symbols and quotes is not None:
+        quotes.refresh_in_background(asset_type, sorted(fresh_symbols), fetch)
+
+    data = pd.concat(frames, ignore_index=True)
+    order = {symbol: idx for idx, symbol in enumerate(symbols)}
+    data = data.sort_values("asset_id", key=lambda ids: ids.map(order), kind="stable").reset_index(drop=True)
+    counts = data["quote_source"].value_counts()
+    return data, {source: int(counts.get(source, 0)) for source in ("live", "cache", "stale", "mock")}
+
+
+def describe_sources(source: str, counts: Dict[str, int], total: int) -> Dict[str, str]:
+    """Build ``IngestionResult.metadata`` from the per-symbol counts of :func:`resilient_fetch`."""
+
+    metadata = {"source": "mock" if counts.get("mock", 0) == total else source, "count": str(total)}
+    metadata.update({f"{key}_count": str(value) for key, value in counts.items()})
+    return metadata
+
+
+__all__ = [
+    "IngestionResult",
+    "describe_sources",
+    "offline_quotes",
+    "resilient_fetch",
+    "_generate_mock_prices",
+]
@@ -1,13 +1,18 @@
 """Bond ingestion using FRED yields with deterministic fallback."""
 from __future__ import annotations
 
-from typing import Iterable
+import logging
+from typing import Dict, Iterable, List
 
 import pandas as pd
 
-from .base import IngestionResult, _generate_mock_prices, safe_call
+from .base import IngestionResult, describe_sources, resilient_fetch
+from .quotes import quote_cache_for
+from .reference import ReferenceDataCache, reference_cache_for
 from ..utils.config import AppConfig
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_BOND_SERIES = {
     "DGS10": "10Y Treasury",
     "DGS2": "2Y Treasury",
@@ -15,15 +20,39 @@ DEFAULT_BOND_SERIES = {
 }
 
 
-def _fred_series(series_ids: Iterable[str]) -> pd.DataFrame:
+def _describe(fred, series_ids: List[str]) -> Dict[str, str | None]:
+    descriptions: Dict[str, str | None] = {}
+    for series_id in series_ids:
+        if series_id in DEFAULT_BOND_SERIES:
+            descriptions[series_id] = DEFAULT_BOND_SERIES[series_id]
+            continue
+        try:
+            title = fred.get_series_info(series_id).get("title")
+        except Exception:  # noqa: BLE001 - a missing title should not drop the yield; not cached, retried next run
+            title = None
+        descriptions[series_id] = str(title) if title else None
+    return descriptions
+
+
+def _fred_series(series_ids: Iterable[str], reference: ReferenceDataCache | None = None) -> pd.DataFrame:
     from fredapi import Fred
 
     fred = Fred()
+    series_ids = list(series_ids)
+    if reference is not None:
+        descriptions = reference.get_many(series_ids, "description", lambda todo: _describe(fred, todo))
+    else:
+        descriptions = dict(DEFAULT_BOND_SERIES)
     frames = []
     for series_id in series_ids:
-        series = fred.get_series_latest_release(series_id)
+        try:
+            series = fred.get_series_latest_release(series_id)
+        except Exception as exc:  # noqa: BLE001 - degrade per series, not per batch
+            logger.warning("FRED request for %s failed: %s", series_id, exc)
+            continue
         if series is None or series.empty:
-            raise ValueError(f"No FRED data for {series_id}")
+            logger.warning("No FRED data for %s", series_id)
+            continue
         latest_value = float(series.iloc[-1])
         frames.append(
             {
@@ -35,8 +64,8 @@ def _fred_series(series_ids: Iterable[str]) -> pd.DataFrame:
                 "high": latest_value,
                 "low": latest_value,
                 "volume": 0.0,
-                "as_of": pd.Timestamp.utcnow(),
-                "description": DEFAULT_BOND_SERIES.get(series_id, series_id),
+                "as_of": pd.Timestamp.now("UTC"),
+                "description": descriptions.get(series_id, series_id),
             }
         )
     return pd.DataFrame(frames)
@@ -44,13 +73,12 @@ def _fred_series(series_ids: Iterable[str]) -> pd.DataFrame:
 
 def fetch_bonds(config: AppConfig, series_ids: Iterable[str] | None = None) -> IngestionResult:
     series_ids = tuple(series_ids or DEFAULT_BOND_SERIES.keys())
-    fallback = _generate_mock_prices(series_ids, "bond")
-    data, used_fallback = safe_call(lambda: _fred_series(series_ids), fallback)
-    return IngestionResult(
-        asset_type="bond",
-        data=data,
-        metadata={"source": "fred" if not used_fallback else "mock", "count": str(len(data))},
+    reference = reference_cache_for(config.storage)
+    data, counts = resilient_fetch(
+        "bond", series_ids, lambda todo: _fred_series(todo, reference), quote_cache_for(config)
     )
+    reference.save()
+    return IngestionResult(asset_type="bond", data=data, metadata=describe_sources("fred", counts, len(data)))
 
 
 __all__ = ["fetch_bonds"]
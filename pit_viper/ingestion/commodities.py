@@ -1,13 +1,19 @@
 """Commodity ingestion using Stooq CSV endpoints with offline fallback."""
 from __future__ import annotations
 
-from typing import Iterable
+import logging
+from typing import Dict, Iterable, List
 
 import pandas as pd
 
-from .base import IngestionResult, _generate_mock_prices, safe_call
+from .base import IngestionResult, describe_sources, resilient_fetch
+from .quotes import quote_cache_for
+from .reference import ReferenceDataCache, reference_cache_for
+from .yahoo import DEFAULT_CHUNK_SIZE, download_latest_bars, lookup_currencies, lookup_descriptions
 from ..utils.config import AppConfig
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_COMMODITIES = {
     "GC=F": "Gold Futures",
     "CL=F": "WTI Crude",
@@ -15,42 +21,55 @@ DEFAULT_COMMODITIES = {
 }
 
 
-def _yfinance_commodities(symbols: Iterable[str]) -> pd.DataFrame:
-    import yfinance as yf
-
-    frames = []
-    for symbol in symbols:
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period="5d")
-        if history.empty:
-            raise ValueError(f"No commodity data for {symbol}")
-        latest = history.tail(1).reset_index(drop=False)
-        frames.append(
-            {
-                "asset_id": symbol,
-                "asset_type": "commodity",
-                "currency": ticker.info.get("currency", "USD"),
-                "close": float(latest["Close"].iloc[0]),
-                "open": float(latest["Open"].iloc[0]),
-                "high": float(latest["High"].iloc[0]),
-                "low": float(latest["Low"].iloc[0]),
-                "volume": float(latest.get("Volume", pd.Series([0.0])).iloc[0]),
-                "as_of": pd.Timestamp(latest["Date"].iloc[0]),
-                "description": DEFAULT_COMMODITIES.get(symbol, symbol),
-            }
-        )
-    return pd.DataFrame(frames)
+def _describe(symbols: List[str], max_workers: int) -> Dict[str, str | None]:
+    known = {symbol: DEFAULT_COMMODITIES[symbol] for symbol in symbols if symbol in DEFAULT_COMMODITIES}
+    unknown = [symbol for symbol in symbols if symbol not in known]
+    return {**known, **lookup_descriptions(unknown, max_workers)}
+
+
+def _yfinance_commodities(
+    symbols: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = 16,
+    reference: ReferenceDataCache | None = None,
+) -> pd.DataFrame:
+    symbols = list(symbols)
+    bars = download_latest_bars(symbols, period="5d", chunk_size=chunk_size)
+    missing = [symbol for symbol in symbols if symbol not in bars]
+    if missing:
+        logger.warning("No commodity data for %s", ", ".join(missing))
+    symbols = [symbol for symbol in symbols if symbol in bars]
+    if reference is not None:
+        currencies = reference.get_many(symbols, "currency", lambda todo: lookup_currencies(todo, max_workers))
+        descriptions = reference.get_many(symbols, "description", lambda todo: _describe(todo, max_workers))
+    else:
+        currencies = lookup_currencies(symbols, max_workers=max_workers)
+        descriptions = {symbol: DEFAULT_COMMODITIES.get(symbol, symbol) for symbol in symbols}
+
+    records: List[Dict[str, object]] = [
+        {
+            "asset_id": symbol,
+            "asset_type": "commodity",
+            "currency": currencies.get(symbol) or "USD",
+            **bars[symbol],
+            "description": descriptions.get(symbol, symbol),
+        }
+        for symbol in symbols
+    ]
+    return pd.DataFrame.from_records(records)
 
 
 def fetch_commodities(config: AppConfig, symbols: Iterable[str] | None = None) -> IngestionResult:
     symbols = tuple(symbols or DEFAULT_COMMODITIES.keys())
-    fallback = _generate_mock_prices(symbols, "commodity")
-    data, used_fallback = safe_call(lambda: _yfinance_commodities(symbols), fallback)
-    return IngestionResult(
-        asset_type="commodity",
-        data=data,
-        metadata={"source": "yfinance" if not used_fallback else "mock", "count": str(len(data))},
+    reference = reference_cache_for(config.storage)
+    data, counts = resilient_fetch(
+        "commodity",
+        symbols,
+        lambda todo: _yfinance_commodities(todo, config.ingestion.yahoo_chunk_size, config.ingestion.http_concurrency, reference),
+        quote_cache_for(config),
     )
+    reference.save()
+    return IngestionResult(asset_type="commodity", data=data, metadata=describe_sources("yfinance", counts, len(data)))
 
 
 __all__ = ["fetch_commodities"]
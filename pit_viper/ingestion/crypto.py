@@ -1,54 +1,109 @@
 """Crypto ingestion using Coinbase when available with offline fallbacks."""
 from __future__ import annotations
 
-from typing import Iterable, List
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
 
 import pandas as pd
 
-from .base import IngestionResult, _generate_mock_prices, safe_call
+from .base import IngestionResult, describe_sources, resilient_fetch
+from .quotes import quote_cache_for
+from .reference import ReferenceDataCache, reference_cache_for
 from ..utils.config import AppConfig
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_CRYPTO_SYMBOLS = ("BTC-USD", "ETH-USD", "SOL-USD")
 
 
-def _coinbase_prices(symbols: Iterable[str], api_key: str | None) -> pd.DataFrame:
+COINBASE_PRODUCT_URL = "https://api.exchange.coinbase.com/products/{product_id}"
+COINBASE_TICKER_URL = COINBASE_PRODUCT_URL + "/ticker"
+
+
+def _build_session(pool_size: int):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return session
+
+
+def _ticker_record(product_id: str, payload: Dict[str, object], as_of: pd.Timestamp) -> Dict[str, object]:
+    price = payload.get("price", 0.0)
+    return {
+        "asset_id": product_id,
+        "asset_type": "crypto",
+        "currency": payload.get("currency", "USD"),
+        "close": float(price),
+        "open": float(payload.get("open", price)),
+        "high": float(payload.get("high", price)),
+        "low": float(payload.get("low", price)),
+        "volume": float(payload.get("volume", 0.0)),
+        "as_of": as_of,
+    }
+
+
+def _coinbase_prices(
+    symbols: Iterable[str],
+    api_key: str | None,
+    max_concurrency: int = 16,
+    reference: ReferenceDataCache | None = None,
+) -> pd.DataFrame:
+    """Fetch tickers over one keep-alive session with at most ``max_concurrency`` requests in flight."""
+
     if not api_key:
         raise ValueError("Coinbase API key not provided")
-    import requests
+    product_ids = list(symbols)
+    if not product_ids:
+        return pd.DataFrame()
+    max_concurrency = max(1, min(max_concurrency, len(product_ids)))
+    as_of = pd.Timestamp.now("UTC")
+
+    with _build_session(max_concurrency) as session:
+
+        def _fetch(product_id: str) -> Dict[str, object] | None:
+            try:
+                response = session.get(COINBASE_TICKER_URL.format(product_id=product_id), timeout=10)
+                response.raise_for_status()
+                return _ticker_record(product_id, response.json(), as_of)
+            except Exception as exc:  # noqa: BLE001 - one bad product must not sink the batch
+                logger.warning("Coinbase ticker for %s failed: %s", product_id, exc)
+                return None
+
+        def _quote_currency(product_id: str) -> str | None:
+            try:
+                response = session.get(COINBASE_PRODUCT_URL.format(product_id=product_id), timeout=10)
+                response.raise_for_status()
+                return response.json().get("quote_currency")
+            except Exception:  # noqa: BLE001 - not cached, so the lookup is retried next run
+                logger.debug("Coinbase product lookup for %s failed", product_id, exc_info=True)
+                return None
 
-    frames: List[pd.DataFrame] = []
-    for product_id in symbols:
-        url = f"https://api.exchange.coinbase.com/products/{product_id}/ticker"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        payload = response.json()
-        frames.append(
-            pd.DataFrame(
-                {
-                    "asset_id": [product_id],
-                    "asset_type": ["crypto"],
-                    "currency": [payload.get("currency", "USD")],
-                    "close": [float(payload.get("price", 0.0))],
-                    "open": [float(payload.get("open", payload.get("price", 0.0)))],
-                    "high": [float(payload.get("high", payload.get("price", 0.0)))],
-                    "low": [float(payload.get("low", payload.get("price", 0.0)))],
-                    "volume": [float(payload.get("volume", 0.0))],
-                    "as_of": [pd.Timestamp.utcnow()],
-                }
-            )
-        )
-    return pd.concat(frames, ignore_index=True)
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="coinbase") as executor:
+            records: List[Dict[str, object]] = [record for record in executor.map(_fetch, product_ids) if record]
+            if reference is not None and records:
+                currencies = reference.get_many(
+                    [record["asset_id"] for record in records], "currency", lambda todo: dict(zip(todo, executor.map(_quote_currency, todo)))
+                )
+                for record in records:
+                    record["currency"] = currencies.get(record["asset_id"], record["currency"])
+    return pd.DataFrame.from_records(records)
 
 
 def fetch_crypto(config: AppConfig, symbols: Iterable[str] | None = None) -> IngestionResult:
     symbols = tuple(symbols or DEFAULT_CRYPTO_SYMBOLS)
-    fallback = _generate_mock_prices(symbols, "crypto")
-    data, used_fallback = safe_call(lambda: _coinbase_prices(symbols, config.credentials.coinbase), fallback)
-    return IngestionResult(
-        asset_type="crypto",
-        data=data,
-        metadata={"source": "coinbase" if not used_fallback else "mock", "count": str(len(data))},
+    reference = reference_cache_for(config.storage)
+    data, counts = resilient_fetch(
+        "crypto",
+        symbols,
+        lambda todo: _coinbase_prices(todo, config.credentials.coinbase, config.ingestion.http_concurrency, reference),
+        quote_cache_for(config),
     )
+    reference.save()
+    return IngestionResult(asset_type="crypto", data=data, metadata=describe_sources("coinbase", counts, len(data)))
 
 
 __all__ = ["fetch_crypto"]
@@ -1,53 +1,57 @@
 """Equity and ETF ingestion leveraging yfinance with Alpha Vantage fallback."""
 from __future__ import annotations
 
-from typing import Iterable, List
+import logging
+from typing import Dict, Iterable, List
 
 import pandas as pd
 
-from .base import IngestionResult, _generate_mock_prices, safe_call
+from .base import IngestionResult, describe_sources, resilient_fetch
+from .quotes import quote_cache_for
+from .reference import ReferenceDataCache, reference_cache_for
+from .yahoo import DEFAULT_CHUNK_SIZE, download_latest_bars, lookup_currencies
 from ..utils.config import AppConfig
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_EQUITY_SYMBOLS = ("AAPL", "MSFT", "SPY")
 
 
-def _yfinance_prices(symbols: Iterable[str]) -> pd.DataFrame:
-    import yfinance as yf
-
-    frames: List[pd.DataFrame] = []
-    for symbol in symbols:
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period="5d")
-        if history.empty:
-            raise ValueError(f"No history for {symbol}")
-        latest = history.tail(1).reset_index(drop=False)
-        frames.append(
-            pd.DataFrame(
-                {
-                    "asset_id": [symbol],
-                    "asset_type": ["equity"],
-                    "currency": [ticker.info.get("currency", "USD")],
-                    "close": [float(latest["Close"].iloc[0])],
-                    "open": [float(latest["Open"].iloc[0])],
-                    "high": [float(latest["High"].iloc[0])],
-                    "low": [float(latest["Low"].iloc[0])],
-                    "volume": [float(latest["Volume"].iloc[0])],
-                    "as_of": [pd.Timestamp(latest["Date"].iloc[0])],
-                }
-            )
-        )
-    return pd.concat(frames, ignore_index=True)
+def _yfinance_prices(
+    symbols: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = 16,
+    reference: ReferenceDataCache | None = None,
+) -> pd.DataFrame:
+    symbols = list(symbols)
+    bars = download_latest_bars(symbols, period="5d", chunk_size=chunk_size)
+    missing = [symbol for symbol in symbols if symbol not in bars]
+    if missing:
+        logger.warning("No history for %s", ", ".join(missing))
+    symbols = [symbol for symbol in symbols if symbol in bars]
+    if reference is not None:
+        currencies = reference.get_many(symbols, "currency", lambda todo: lookup_currencies(todo, max_workers))
+    else:
+        currencies = lookup_currencies(symbols, max_workers=max_workers)
+
+    records: List[Dict[str, object]] = [
+        {"asset_id": symbol, "asset_type": "equity", "currency": currencies.get(symbol) or "USD", **bars[symbol]}
+        for symbol in symbols
+    ]
+    return pd.DataFrame.from_records(records)
 
 
 def fetch_equities(config: AppConfig, symbols: Iterable[str] | None = None) -> IngestionResult:
     symbols = tuple(symbols or DEFAULT_EQUITY_SYMBOLS)
-    fallback = _generate_mock_prices(symbols, "equity")
-    data, used_fallback = safe_call(lambda: _yfinance_prices(symbols), fallback)
-    return IngestionResult(
-        asset_type="equity",
-        data=data,
-        metadata={"source": "yfinance" if not used_fallback else "mock", "count": str(len(data))},
+    reference = reference_cache_for(config.storage)
+    data, counts = resilient_fetch(
+        "equity",
+        symbols,
+        lambda todo: _yfinance_prices(todo, config.ingestion.yahoo_chunk_size, config.ingestion.http_concurrency, reference),
+        quote_cache_for(config),
     )
+    reference.save()
+    return IngestionResult(asset_type="equity", data=data, metadata=describe_sources("yfinance", counts, len(data)))
 
 
 __all__ = ["fetch_equities"]
@@ -1,53 +1,65 @@
 """Mutual fund and ETF ingestion leveraging yahoo finance."""
 from __future__ import annotations
 
-from typing import Iterable, List
+import logging
+from typing import Dict, Iterable, List
 
 import pandas as pd
 
-from .base import IngestionResult, _generate_mock_prices, safe_call
+from .base import IngestionResult, describe_sources, resilient_fetch
+from .quotes import quote_cache_for
+from .reference import ReferenceDataCache, reference_cache_for
+from .yahoo import DEFAULT_CHUNK_SIZE, download_latest_bars, lookup_currencies, lookup_descriptions
 from ..utils.config import AppConfig
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_FUND_SYMBOLS = ("VTI", "VXUS", "BND")
 
 
-def _yfinance_funds(symbols: Iterable[str]) -> pd.DataFrame:
-    import yfinance as yf
-
-    frames: List[pd.DataFrame] = []
-    for symbol in symbols:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info or {}
-        nav = info.get("navPrice") or info.get("regularMarketPrice")
-        if nav is None:
-            raise ValueError(f"No NAV for {symbol}")
-        frames.append(
-            pd.DataFrame(
-                {
-                    "asset_id": [symbol],
-                    "asset_type": ["fund"],
-                    "currency": [info.get("currency", "USD")],
-                    "close": [float(nav)],
-                    "open": [float(info.get("regularMarketOpen", nav))],
-                    "high": [float(info.get("regularMarketDayHigh", nav))],
-                    "low": [float(info.get("regularMarketDayLow", nav))],
-                    "volume": [float(info.get("regularMarketVolume", 0.0))],
-                    "as_of": [pd.Timestamp.utcnow()],
-                }
-            )
-        )
-    return pd.concat(frames, ignore_index=True)
+def _yfinance_funds(
+    symbols: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = 16,
+    reference: ReferenceDataCache | None = None,
+) -> pd.DataFrame:
+    symbols = list(symbols)
+    bars = download_latest_bars(symbols, period="5d", chunk_size=chunk_size)
+    missing = [symbol for symbol in symbols if symbol not in bars]
+    if missing:
+        logger.warning("No NAV for %s", ", ".join(missing))
+    symbols = [symbol for symbol in symbols if symbol in bars]
+    if reference is not None:
+        currencies = reference.get_many(symbols, "currency", lambda todo: lookup_currencies(todo, max_workers))
+        descriptions = reference.get_many(symbols, "description", lambda todo: lookup_descriptions(todo, max_workers))
+    else:
+        currencies = lookup_currencies(symbols, max_workers=max_workers)
+        descriptions = {}
+
+    records: List[Dict[str, object]] = [
+        {
+            "asset_id": symbol,
+            "asset_type": "fund",
+            "currency": currencies.get(symbol) or "USD",
+            **bars[symbol],
+            "description": descriptions.get(symbol, symbol),
+        }
+        for symbol in symbols
+    ]
+    return pd.DataFrame.from_records(records)
 
 
 def fetch_funds(config: AppConfig, symbols: Iterable[str] | None = None) -> IngestionResult:
     symbols = tuple(symbols or DEFAULT_FUND_SYMBOLS)
-    fallback = _generate_mock_prices(symbols, "fund")
-    data, used_fallback = safe_call(lambda: _yfinance_funds(symbols), fallback)
-    return IngestionResult(
-        asset_type="fund",
-        data=data,
-        metadata={"source": "yfinance" if not used_fallback else "mock", "count": str(len(data))},
+    reference = reference_cache_for(config.storage)
+    data, counts = resilient_fetch(
+        "fund",
+        symbols,
+        lambda todo: _yfinance_funds(todo, config.ingestion.yahoo_chunk_size, config.ingestion.http_concurrency, reference),
+        quote_cache_for(config),
     )
+    reference.save()
+    return IngestionResult(asset_type="fund", data=data, metadata=describe_sources("yfinance", counts, len(data)))
 
 
 __all__ = ["fetch_funds"]
@@ -0,0 +1,207 @@
+"""Last-known-good quote cache with stale-while-revalidate refreshes."""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, wait
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+import pandas as pd
+
+from ..utils.config import AppConfig
+from ..utils.storage import DataStore
+
+logger = logging.getLogger(__name__)
+
+LATEST_QUOTES_NAME = "quotes_latest"
+MARKET_PREFIX = "market_"
+SERVABLE_SOURCES = ("live", "cache", "stale")
+
+
+def _utcnow() -> pd.Timestamp:
+    return pd.Timestamp.now("UTC").tz_localize(None)
+
+
+class QuoteCache:
+    """Serves previously persisted quotes per ``(asset_type, asset_id)``.
+
+    The cache is seeded from ``processed/quotes_latest.parquet`` when present and
+    otherwise from the newest ``processed/market_*.parquet`` snapshots. Only rows
+    that came from a live fetch (``quote_source`` of live/cache/stale) are kept,
+    so mock data is never served back as a real price. Freshness is judged on
+    ``fetched_at`` rather than ``as_of`` because daily bars carry the session date.
+    """
+
+    def __init__(
+        self,
+        store: DataStore,
+        category: str,
+        max_age: timedelta,
+        lookback_files: int = 7,
+        refresh_timeout: float | None = None,
+    ) -> None:
+        self.store = store
+        self.category = category
+        self.max_age = max_age
+        self.lookback_files = lookback_files
+        self.refresh_timeout = refresh_timeout
+        self._lock = threading.RLock()
+        self._quotes: pd.DataFrame | None = None
+        self._refreshes: Dict[str, Future] = {}
+
+    def _seed_paths(self) -> List[Path]:
+        latest = self.store.list_frames(self.category, LATEST_QUOTES_NAME)
+        if latest:
+            return latest
+        return self.store.list_frames(self.category, MARKET_PREFIX)[: self.lookback_files]
+
+    def _load(self) -> pd.DataFrame:
+        frames = []
+        for path in self._seed_paths():
+            try:
+                frame = pd.read_parquet(path)
+            except Exception:  # noqa: BLE001 - a corrupt snapshot only loses its own rows
+                logger.warning("Skipping unreadable quote snapshot %s", path, exc_info=True)
+                continue
+            if "quote_source" not in frame.columns or "fetched_at" not in frame.columns:
+                continue
+            frames.append(frame[frame["quote_source"].isin(SERVABLE_SOURCES)])
+        if not frames:
+            return pd.DataFrame(columns=["asset_type", "asset_id", "fetched_at"])
+        quotes = pd.concat(frames, ignore_index=True)
+        quotes["fetched_at"] = pd.to_datetime(quotes["fetched_at"])
+        quotes.sort_values("fetched_at", inplace=True)
+        quotes.drop_duplicates(["asset_type", "asset_id"], keep="last", inplace=True)
+        return quotes.set_index(["asset_type", "asset_id"], drop=False)
+
+    @property
+    def quotes(self) -> pd.DataFrame:
+        with self._lock:
+            if self._quotes is None:
+                self._quotes = self._load()
+            return self._quotes
+
+    def lookup(self, asset_type: str, symbols: Iterable[str], fresh_only: bool = False) -> pd.DataFrame:
+        """Return cached rows for ``symbols``; with ``fresh_only`` only those inside ``max_age``."""
+
+        quotes = self.quotes
+        keys = [(asset_type, symbol) for symbol in symbols]
+        rows = quotes.loc[quotes.index.intersection(keys, sort=False)] if len(quotes) else quotes.iloc[0:0]
+        if fresh_only:
+            if self.max_age <= timedelta(0):
+                return rows.iloc[0:0]
+            rows = rows[rows["fetched_at"] >= _utcnow() - self.max_age]
+        return rows.reset_index(drop=True)
+
+    def update(self, frame: pd.DataFrame, persist: bool = True) -> None:
+        """Merge freshly fetched live rows into the cache and persist the last-known-good table."""
+
+        if frame.empty:
+            return
+        with self._lock:
+            incoming = frame.set_index(["asset_type", "asset_id"], drop=False)
+            current = self.quotes
+            current = current[~current.index.isin(incoming.index)]
+            self._quotes = pd.concat([current, incoming]) if len(current) else incoming
+            if persist:
+                self.store.write_frame(self._quotes.reset_index(drop=True), self.category, LATEST_QUOTES_NAME)
+
+    def refresh_in_background(
+        self, asset_type: str, symbols: List[str], fetch: Callable[[List[str]], pd.DataFrame]
+    ) -> Future:
+        """Re-fetch symbols that were served from cache without blocking the caller.
+
+        Refreshes run on daemon threads, so a hung upstream never holds the
+        process open, and at most one per asset type is in flight (a second
+        request returns the pending future). After ``refresh_timeout`` seconds
+        the future fails with ``TimeoutError`` and a late result is discarded.
+        """
+
+        with self._lock:
+            pending = self._refreshes.get(asset_type)
+            if pending is not None and not pending.done():
+                return pending
+            future: Future = Future()
+            future.set_running_or_notify_cancel()
+            self._refreshes[asset_type] = future
+
+        def _expire() -> None:
+            with self._lock:
+                if not future.done():
+                    logger.warning("Background quote refresh for %s timed out after %.1fs", asset_type, self.refresh_timeout)
+                    future.set_exception(TimeoutError(f"quote refresh for {asset_type} timed out"))
+
+        timer = None
+        if self.refresh_timeout is not None:
+            timer = threading.Timer(self.refresh_timeout, _expire)
+            timer.daemon = True
+
+        def _refresh() -> None:
+            try:
+                live = fetch(symbols)
+            except Exception:  # noqa: BLE001 - the cached value already answered the request
+                logger.warning("Background quote refresh for %s failed", asset_type, exc_info=True)
+                live = None
+            finally:
+                if timer is not None:
+                    timer.cancel()
+            with self._lock:
+                if future.done():
+                    logger.debug("Discarding late quote refresh for %s", asset_type)
+                    return
+                if isinstance(live, pd.DataFrame) and not live.empty:
+                    try:
+                        self.update(stamp_live(live, asset_type, symbols))
+                    except Exception:  # noqa: BLE001 - keep serving the previous quotes
+                        logger.warning("Could not apply quote refresh for %s", asset_type, exc_info=True)
+                future.set_result(None)
+
+        if timer is not None:
+            timer.start()
+        threading.Thread(target=_refresh, name=f"quote-refresh-{asset_type}", daemon=True).start()
+        return future
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until outstanding background refreshes have finished or timed out."""
+
+        with self._lock:
+            pending = list(self._refreshes.values())
+        wait(pending, timeout=timeout)
+
+
+def stamp_live(frame: pd.DataFrame, asset_type: str, symbols: Iterable[str]) -> pd.DataFrame:
+    """Keep rows for the requested symbols and tag them as a live fetch made now."""
+
+    live = frame[frame["asset_id"].astype(str).isin(set(symbols))].copy()
+    live["asset_id"] = live["asset_id"].astype(str)
+    live["asset_type"] = asset_type
+    if "as_of" in live.columns:
+        live["as_of"] = pd.to_datetime(live["as_of"], utc=True, errors="coerce").dt.tz_localize(None)
+    live["quote_source"] = "live"
+    live["fetched_at"] = _utcnow()
+    return live
+
+
+_CACHES: Dict[Path, QuoteCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def quote_cache_for(config: AppConfig) -> QuoteCache:
+    """Return the process-wide quote cache for the configured data directory."""
+
+    root = Path(config.storage.data_dir).resolve()
+    max_age = timedelta(seconds=config.ingestion.quote_max_age)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(root)
+        if cache is None:
+            cache = _CACHES[root] = QuoteCache(
+                DataStore(root, schemas=config.storage.schemas()), config.storage.processed_subdir, max_age
+            )
+        cache.max_age = max_age
+        cache.refresh_timeout = config.ingestion.fetch_timeout
+        return cache
+
+
+__all__ = ["QuoteCache", "quote_cache_for", "stamp_live"]
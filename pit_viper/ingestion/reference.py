@@ -0,0 +1,153 @@
+"""Persistent cache for slowly changing instrument reference data."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+from ..utils.config import StorageConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIELD_TTLS: Dict[str, timedelta] = {
+    "currency": timedelta(days=7),
+    "description": timedelta(days=7),
+}
+DEFAULT_TTL = timedelta(days=7)
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_IDLE_EVICTION = timedelta(days=90)
+CACHE_FILENAME = "reference_data.json"
+
+
+class ReferenceDataCache:
+    """Symbol-keyed metadata store with per-field TTLs.
+
+    Entries are persisted as JSON. On save, symbols not requested for
+    ``idle_eviction`` are dropped, then the least recently used symbols are
+    evicted until at most ``max_entries`` remain. All methods are thread-safe so
+    connectors running concurrently can share one instance.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        field_ttls: Mapping[str, timedelta] | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        idle_eviction: timedelta = DEFAULT_IDLE_EVICTION,
+    ) -> None:
+        self.path = Path(path)
+        self.field_ttls = dict(DEFAULT_FIELD_TTLS if field_ttls is None else field_ttls)
+        self.max_entries = max_entries
+        self.idle_eviction = idle_eviction
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, object]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, object]]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Ignoring unreadable reference cache at %s", self.path, exc_info=True)
+            return {}
+
+    def _ttl(self, field: str) -> timedelta:
+        return self.field_ttls.get(field, DEFAULT_TTL)
+
+    def get(self, symbol: str, field: str, now: datetime | None = None) -> Optional[object]:
+        """Return a cached value, or ``None`` when missing or older than the field TTL."""
+
+        now = now or datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                return None
+            entry["last_used"] = now.isoformat()
+            cached = entry.get("fields", {}).get(field)
+            if cached is None:
+                return None
+            if now - datetime.fromisoformat(cached["fetched_at"]) > self._ttl(field):
+                return None
+            return cached["value"]
+
+    def put(self, symbol: str, field: str, value: object, now: datetime | None = None) -> None:
+        now = now or datetime.utcnow()
+        with self._lock:
+            entry = self._entries.setdefault(symbol, {"fields": {}})
+            entry["fields"][field] = {"value": value, "fetched_at": now.isoformat()}
+            entry["last_used"] = now.isoformat()
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        field: str,
+        fetch_missing: Callable[[List[str]], Mapping[str, object]],
+    ) -> Dict[str, object]:
+        """Resolve ``field`` for every symbol, fetching only missing or expired values in one batch."""
+
+        symbols = list(dict.fromkeys(symbols))
+        resolved: Dict[str, object] = {}
+        missing: List[str] = []
+        for symbol in symbols:
+            value = self.get(symbol, field)
+            if value is None:
+                missing.append(symbol)
+            else:
+                resolved[symbol] = value
+        if missing:
+            fetched = fetch_missing(missing)
+            for symbol, value in fetched.items():
+                if value is not None:
+                    self.put(symbol, field, value)
+                    resolved[symbol] = value
+        return resolved
+
+    def evict(self, now: datetime | None = None) -> int:
+        """Apply the idle and size limits, returning the number of symbols dropped."""
+
+        now = now or datetime.utcnow()
+        cutoff = (now - self.idle_eviction).isoformat()
+        with self._lock:
+            before = len(self._entries)
+            self._entries = {
+                symbol: entry for symbol, entry in self._entries.items() if entry.get("last_used", "") >= cutoff
+            }
+            if len(self._entries) > self.max_entries:
+                ranked = sorted(self._entries, key=lambda symbol: self._entries[symbol].get("last_used", ""))
+                for symbol in ranked[: len(self._entries) - self.max_entries]:
+                    del self._entries[symbol]
+            return before - len(self._entries)
+
+    def save(self) -> Path:
+        with self._lock:
+            self.evict()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self._entries, sort_keys=True))
+            os.replace(tmp_path, self.path)
+        return self.path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHES: Dict[Path, ReferenceDataCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def reference_cache_for(storage: StorageConfig) -> ReferenceDataCache:
+    """Return the process-wide cache for a data directory, loading it on first use."""
+
+    path = (storage.data_dir / storage.reference_subdir / CACHE_FILENAME).resolve()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            cache = _CACHES[path] = ReferenceDataCache(path)
+        return cache
+
+
+__all__ = ["DEFAULT_FIELD_TTLS", "ReferenceDataCache", "reference_cache_for"]
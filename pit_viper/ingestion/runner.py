@@ -0,0 +1,140 @@
+"""Concurrent execution of the asset-class connectors."""
+from __future__ import annotations
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .base import IngestionResult, describe_sources, offline_quotes
+from .bonds import DEFAULT_BOND_SERIES, fetch_bonds
+from .commodities import DEFAULT_COMMODITIES, fetch_commodities
+from .crypto import DEFAULT_CRYPTO_SYMBOLS, fetch_crypto
+from .equities import DEFAULT_EQUITY_SYMBOLS, fetch_equities
+from .funds import DEFAULT_FUND_SYMBOLS, fetch_funds
+from .quotes import QuoteCache, quote_cache_for
+from ..utils.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IngestionTask:
+    """A connector plus the symbols used to build its offline fallback."""
+
+    asset_type: str
+    fetch: Callable[[AppConfig], IngestionResult]
+    fallback_symbols: Tuple[str, ...]
+
+
+DEFAULT_TASKS: Tuple[IngestionTask, ...] = (
+    IngestionTask("crypto", fetch_crypto, tuple(DEFAULT_CRYPTO_SYMBOLS)),
+    IngestionTask("equity", fetch_equities, tuple(DEFAULT_EQUITY_SYMBOLS)),
+    IngestionTask("fund", fetch_funds, tuple(DEFAULT_FUND_SYMBOLS)),
+    IngestionTask("bond", fetch_bonds, tuple(DEFAULT_BOND_SERIES)),
+    IngestionTask("commodity", fetch_commodities, tuple(DEFAULT_COMMODITIES)),
+)
+
+
+def _fallback_result(task: IngestionTask, reason: str, quotes: QuoteCache) -> IngestionResult:
+    data = offline_quotes(task.asset_type, task.fallback_symbols, quotes)
+    counts = data["quote_source"].value_counts()
+    metadata = describe_sources("cache", {source: int(counts.get(source, 0)) for source in ("stale", "mock")}, len(data))
+    return IngestionResult(asset_type=task.asset_type, data=data, metadata={**metadata, "error": reason})
+
+
+class _DaemonWorkers:
+    """Run ``fn(index)`` for every index on daemon threads, one future per index.
+
+    Unlike ``ThreadPoolExecutor`` workers, daemon threads are not joined at
+    interpreter exit, so a connector that never returns cannot hold the
+    process open. :meth:`add` starts another worker, which replaces one stuck
+    in an abandoned task so queued tasks still run. Cancelled futures are
+    skipped when a worker reaches them.
+    """
+
+    def __init__(self, fn: Callable[[int], IngestionResult], count: int, workers: int) -> None:
+        self.fn = fn
+        self.futures: List[Future] = [Future() for _ in range(count)]
+        self._jobs: queue.SimpleQueue[int] = queue.SimpleQueue()
+        self._names = itertools.count()
+        for index in range(count):
+            self._jobs.put(index)
+        for _ in range(workers):
+            self.add()
+
+    def add(self) -> None:
+        threading.Thread(target=self._work, name=f"pit-viper-ingest_{next(self._names)}", daemon=True).start()
+
+    def _work(self) -> None:
+        while True:
+            try:
+                index = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            future = self.futures[index]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.fn(index))
+            except BaseException as exc:  # noqa: BLE001 - handed to the caller through the future
+                future.set_exception(exc)
+
+
+def run_ingestion(config: AppConfig, tasks: Sequence[IngestionTask] | None = None) -> List[IngestionResult]:
+    """Run the connectors on a bounded thread pool, preserving task order.
+
+    Each connector gets ``config.ingestion.fetch_timeout`` seconds measured from
+    the moment it starts running, so tasks queued behind a small pool are not
+    penalised. A connector that times out or raises is replaced by the last known
+    good quotes for its fallback symbols, or mock data where none exist.
+    Connectors run on daemon threads, so stragglers are abandoned rather than
+    joined, even at interpreter exit; each abandoned connector's worker is
+    replaced so tasks queued behind it still start.
+    """
+
+    tasks = tuple(tasks if tasks is not None else DEFAULT_TASKS)
+    if not tasks:
+        return []
+    timeout = config.ingestion.fetch_timeout
+    quotes = quote_cache_for(config)
+    started: Dict[int, float] = {}
+    results: List[IngestionResult | None] = [None] * len(tasks)
+
+    def _run(index: int) -> IngestionResult:
+        started[index] = time.monotonic()
+        return tasks[index].fetch(config)
+
+    workers = _DaemonWorkers(_run, len(tasks), max(1, min(config.ingestion.max_workers, len(tasks))))
+    pending: Dict[Future, int] = {future: idx for idx, future in enumerate(workers.futures)}
+    while pending:
+        now = time.monotonic()
+        deadlines = [started[idx] + timeout for idx in pending.values() if idx in started]
+        wait_for = max(0.0, min(deadlines) - now) if deadlines else timeout
+        done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            idx = pending.pop(future)
+            task = tasks[idx]
+            try:
+                results[idx] = future.result()
+            except Exception as exc:  # noqa: BLE001 - a connector bug must not sink the run
+                logger.warning("Ingestion for %s failed: %s", task.asset_type, exc, exc_info=True)
+                results[idx] = _fallback_result(task, f"error: {exc}", quotes)
+        now = time.monotonic()
+        for future, idx in list(pending.items()):
+            if idx in started and now - started[idx] >= timeout:
+                task = tasks[idx]
+                logger.warning("Ingestion for %s timed out after %.1fs", task.asset_type, timeout)
+                future.cancel()
+                pending.pop(future)
+                results[idx] = _fallback_result(task, "timeout", quotes)
+                if any(queued not in started for queued in pending.values()):
+                    workers.add()
+    return [result for result in results if result is not None]
+
+
+__all__ = ["DEFAULT_TASKS", "IngestionTask", "run_ingestion"]
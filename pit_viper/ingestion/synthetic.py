@@ -0,0 +1,140 @@
+"""Vectorized synthetic OHLCV history for offline runs, load tests and benchmarks."""
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+STREAMS = 6  # independent draws per bar: return (2), open gap, high, low, volume
+_RETURN_A, _RETURN_B, _GAP, _HIGH, _LOW, _VOLUME = range(STREAMS)
+
+
+def splitmix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finaliser applied element-wise to ``uint64`` counters."""
+
+    z = np.asarray(values, dtype=np.uint64) + GOLDEN_GAMMA
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def symbol_seeds(symbols: Sequence[str], seed: int = 0) -> np.ndarray:
+    """Per-symbol ``uint64`` seeds from a BLAKE2b digest, identical in every process (unlike ``hash``)."""
+
+    digests = b"".join(hashlib.blake2b(f"{seed}:{symbol}".encode(), digest_size=8).digest() for symbol in symbols)
+    return np.frombuffer(digests, dtype="<u8").copy()
+
+
+def synthetic_symbols(count: int, prefix: str = "SYN") -> list[str]:
+    width = max(len(str(count - 1)), 1)
+    return [f"{prefix}{idx:0{width}d}" for idx in range(count)]
+
+
+def _uniform(keys: np.ndarray, counters: np.ndarray, stream: int) -> np.ndarray:
+    """Uniform (0, 1) draws for each (counter, key) pair of one stream."""
+
+    with np.errstate(over="ignore"):
+        mixed = splitmix64(keys[None, :] + (counters[:, None] * np.uint64(STREAMS) + np.uint64(stream)) * GOLDEN_GAMMA)
+    return ((mixed >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0**-53
+
+
+def _normal(keys: np.ndarray, counters: np.ndarray, first_stream: int) -> np.ndarray:
+    """Standard normals by Box-Muller from two uniform streams."""
+
+    radius = np.sqrt(-2.0 * np.log(_uniform(keys, counters, first_stream)))
+    return radius * np.cos(2.0 * np.pi * _uniform(keys, counters, first_stream + 1))
+
+
+def synthetic_paths(
+    symbols: Sequence[str],
+    days: int,
+    drift: float | np.ndarray = 0.05,
+    volatility: float | np.ndarray = 0.3,
+    correlation: float = 0.3,
+    seed: int = 0,
+    periods_per_year: int = 252,
+    price_range: Tuple[float, float] = (5.0, 500.0),
+    volume_range: Tuple[float, float] = (1e4, 1e7),
+) -> Dict[str, np.ndarray]:
+    """OHLCV arrays of shape ``(days, len(symbols))`` from a one-factor geometric random walk.
+
+    Daily log returns are ``(mu - sigma^2 / 2) dt + sigma sqrt(dt) (sqrt(rho) F_t + sqrt(1 - rho) e_it)``
+    with a market factor ``F_t`` shared by all symbols, so any two symbols'
+    returns have correlation ``rho``. ``drift`` and ``volatility`` are
+    annualised and may be per-symbol arrays. Every draw is a SplitMix64 hash
+    of the symbol's seed and the bar index, so a symbol's path is the same in
+    any process and does not depend on the other symbols in the universe.
+    """
+
+    if not 0.0 <= correlation < 1.0:
+        raise ValueError("correlation must be in [0, 1)")
+    keys = symbol_seeds(symbols, seed)
+    counters = np.arange(days, dtype=np.uint64)
+    dt = 1.0 / periods_per_year
+    drift = np.broadcast_to(np.asarray(drift, dtype=float), keys.shape)
+    volatility = np.broadcast_to(np.asarray(volatility, dtype=float), keys.shape)
+    step = volatility * np.sqrt(dt)
+
+    market_key = splitmix64(np.array([seed], dtype=np.uint64) ^ np.uint64(0x5EED))
+    factor = _normal(market_key, counters, _RETURN_A)
+    shocks = np.sqrt(correlation) * factor + np.sqrt(1.0 - correlation) * _normal(keys, counters, _RETURN_A)
+    log_returns = (drift - 0.5 * volatility**2) * dt + step * shocks
+
+    # Per-symbol levels use a counter no bar index reaches.
+    level = np.array([np.iinfo(np.uint64).max], dtype=np.uint64)
+    low_price, high_price = np.log(price_range[0]), np.log(price_range[1])
+    base = np.exp(low_price + (high_price - low_price) * _uniform(keys, level, _RETURN_A)[0])
+    close = base * np.exp(np.cumsum(log_returns, axis=0))
+    previous = np.vstack([base[None, :], close[:-1]])
+    open_ = previous * np.exp(0.25 * step * (_uniform(keys, counters, _GAP) * 2.0 - 1.0))
+    high = np.maximum(open_, close) * np.exp(0.5 * step * _uniform(keys, counters, _HIGH))
+    low = np.minimum(open_, close) * np.exp(-0.5 * step * _uniform(keys, counters, _LOW))
+    low_volume, high_volume = np.log(volume_range[0]), np.log(volume_range[1])
+    typical_volume = np.exp(low_volume + (high_volume - low_volume) * _uniform(keys, level, _VOLUME)[0])
+    volume = (typical_volume * np.exp(0.5 * (_uniform(keys, counters, _VOLUME) - 0.5))).astype(np.int64)
+    return {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def synthetic_market(
+    symbols: Sequence[str] | int,
+    days: int = 1,
+    asset_type: str = "equity",
+    end: pd.Timestamp | str | None = None,
+    freq: str = "B",
+    currency: str = "USD",
+    **params: object,
+) -> pd.DataFrame:
+    """Long OHLCV frame (one row per symbol and bar, sorted by date) in the ingestion schema.
+
+    ``symbols`` may be a count, in which case names come from
+    :func:`synthetic_symbols`. Bars end at ``end`` (default: today) on a
+    ``freq`` calendar; the remaining keyword arguments go to
+    :func:`synthetic_paths`.
+    """
+
+    if isinstance(symbols, int):
+        symbols = synthetic_symbols(symbols)
+    symbols = list(symbols)
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.now().normalize()
+    dates = pd.date_range(end=end, periods=days, freq=freq) if days > 1 else pd.DatetimeIndex([end])
+    paths = synthetic_paths(symbols, len(dates), **params)
+    count = len(symbols)
+    return pd.DataFrame(
+        {
+            "asset_id": np.tile(np.asarray(symbols, dtype=object), len(dates)),
+            "asset_type": asset_type,
+            "currency": currency,
+            "close": paths["close"].ravel(),
+            "open": paths["open"].ravel(),
+            "high": paths["high"].ravel(),
+            "low": paths["low"].ravel(),
+            "volume": paths["volume"].ravel(),
+            "as_of": np.repeat(dates.to_numpy(), count),
+        }
+    )
+
+
+__all__ = ["splitmix64", "symbol_seeds", "synthetic_market", "synthetic_paths", "synthetic_symbols"]
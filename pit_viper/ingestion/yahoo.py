@@ -0,0 +1,119 @@
+"""Batched Yahoo Finance helpers shared by the equity and commodity connectors."""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def _chunks(symbols: Sequence[str], size: int) -> Iterable[Sequence[str]]:
+    size = max(1, size)
+    for start in range(0, len(symbols), size):
+        yield symbols[start : start + size]
+
+
+def download_latest_bars(
+    symbols: Iterable[str], period: str = "5d", chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Dict[str, object]]:
+    """Return the most recent OHLCV bar per symbol using multi-ticker downloads.
+
+    Symbols are requested ``chunk_size`` at a time so a large universe costs a
+    handful of round-trips instead of one per ticker. Symbols Yahoo returns no
+    rows for are simply absent from the result.
+    """
+
+    import yfinance as yf
+
+    symbols = list(dict.fromkeys(symbols))
+    bars: Dict[str, Dict[str, object]] = {}
+    for chunk in _chunks(symbols, chunk_size):
+        frame = yf.download(
+            list(chunk),
+            period=period,
+            group_by="ticker",
+            threads=True,
+            progress=False,
+            multi_level_index=True,
+        )
+        if frame is None or frame.empty:
+            continue
+        if not isinstance(frame.columns, pd.MultiIndex):
+            frame = pd.concat({chunk[0]: frame}, axis=1)
+        available = set(frame.columns.get_level_values(0))
+        for symbol in chunk:
+            if symbol not in available:
+                continue
+            history = frame[symbol].dropna(subset=["Close"])
+            if history.empty:
+                continue
+            latest = history.iloc[-1]
+            volume = latest.get("Volume", 0.0)
+            bars[symbol] = {
+                "close": float(latest["Close"]),
+                "open": float(latest["Open"]),
+                "high": float(latest["High"]),
+                "low": float(latest["Low"]),
+                "volume": 0.0 if pd.isna(volume) else float(volume),
+                "as_of": pd.Timestamp(history.index[-1]),
+            }
+    return bars
+
+
+def _lookup_currency(symbol: str) -> str | None:
+    import yfinance as yf
+
+    try:
+        return yf.Ticker(symbol).fast_info.currency or None
+    except Exception:  # noqa: BLE001 - currency is cosmetic, never fail the batch on it
+        logger.debug("Currency lookup failed for %s", symbol, exc_info=True)
+        return None
+
+
+def lookup_currencies(symbols: Iterable[str], max_workers: int = 16) -> Dict[str, str | None]:
+    """Resolve trading currencies from chart metadata rather than the full ``.info`` profile.
+
+    Failed lookups map to ``None`` so a cache does not store a guess; callers
+    default to USD when building records.
+    """
+
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as executor:
+        currencies: List[str | None] = list(executor.map(_lookup_currency, symbols))
+    return dict(zip(symbols, currencies))
+
+
+def _lookup_description(symbol: str) -> str | None:
+    import yfinance as yf
+
+    try:
+        info = yf.Ticker(symbol).info or {}
+    except Exception:  # noqa: BLE001 - callers display the symbol instead
+        logger.debug("Description lookup failed for %s", symbol, exc_info=True)
+        return None
+    return info.get("longName") or info.get("shortName")
+
+
+def lookup_descriptions(symbols: Iterable[str], max_workers: int = 16) -> Dict[str, str | None]:
+    """Resolve display names from the full profile; callers are expected to cache the result.
+
+    Failed lookups map to ``None`` so a cache does not keep the symbol as its
+    name; fall back to the symbol where the description is displayed.
+    """
+
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as executor:
+        names = list(executor.map(_lookup_description, symbols))
+    return dict(zip(symbols, names))
+
+
+__all__ = ["DEFAULT_CHUNK_SIZE", "download_latest_bars", "lookup_currencies", "lookup_descriptions"]
@@ -3,16 +3,23 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Dict
-
-from ..ingestion.bonds import fetch_bonds
-from ..ingestion.commodities import fetch_commodities
-from ..ingestion.crypto import fetch_crypto
-from ..ingestion.equities import fetch_equities
-from ..ingestion.funds import fetch_funds
-from ..processing.feature_pipeline import run_feature_pipeline
-from ..processing.portfolio import load_holdings, reconcile
-from ..processing.scoring import summarize_recommendations, score_assets
+from pathlib import Path
+from typing import Dict, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..ingestion.runner import run_ingestion
+from ..processing.covariance import COVARIANCE_STATE_NAME, StreamingCovariance, correlation_diversification
+from ..processing.feature_state import FEATURE_STATE_NAME, FeatureState
+from ..processing.feature_pipeline import (
+    FeaturePipelineResult,
+    append_market_history,
+    load_market_history,
+    run_feature_pipeline,
+)
+from ..processing.portfolio import PortfolioSnapshot, PortfolioValuation, latest_prices, load_holdings, reconcile, value_holdings
+from ..processing.scoring import rank_assets
 from ..sentiment.news import collect_news_sentiment
 from ..sentiment.social import collect_social_sentiment
 from ..utils.config import AppConfig, load_config
@@ -22,68 +29,187 @@ from .chatgpt import AdviceRequest, ChatGPTClient
 logger = logging.getLogger(__name__)
 
 
-def run_daily_advice(config: AppConfig | None = None) -> Dict[str, Dict[str, object]]:
-    """Run the end-to-end ingestion, scoring, and advice workflow."""
+def _ingest_features(config: AppConfig, store: DataStore) -> FeaturePipelineResult:
+    ingestions = run_ingestion(config)
 
-    config = config or load_config()
-    store = DataStore(config.storage.data_dir)
+    if config.features.incremental:
+        state = FeatureState.load(config.storage.path_for(config.storage.state_subdir) / FEATURE_STATE_NAME)
+        if state.empty:
+            state.seed(load_market_history(store, config.storage.processed_subdir))
+        feature_result = run_feature_pipeline(ingestions, state=state)
+        state.save()
+    else:
+        history = load_market_history(store, config.storage.processed_subdir)
+        feature_result = run_feature_pipeline(ingestions, history)
+    return feature_result
 
-    ingestions = [
-        fetch_crypto(config),
-        fetch_equities(config),
-        fetch_funds(config),
-        fetch_bonds(config),
-        fetch_commodities(config),
-    ]
 
-    feature_result = run_feature_pipeline(ingestions)
-    scored = score_assets(feature_result.features)
-    recommendations = summarize_recommendations(scored, top_n=10)
+def _diversification(
+    config: AppConfig, store: DataStore, feature_result: FeaturePipelineResult, holdings: pd.DataFrame
+) -> np.ndarray | None:
+    """Advance the streaming return covariance with today's bars and score correlation to holdings and leaders.
 
-    portfolio_snapshot = load_holdings()
-    reconciled = reconcile(portfolio_snapshot.holdings, recommendations)
+    The covariance takes the NaN-preserving returns: an asset without a prior
+    bar has no observation that day rather than a 0% return.
+    """
 
-    tickers = recommendations["asset_id"].tolist() if not recommendations.empty else []
-    news_sentiment = collect_news_sentiment(config, tickers)
-    social_sentiment = collect_social_sentiment(config, tickers)
+    covariance = StreamingCovariance.load(
+        config.storage.path_for(config.storage.state_subdir) / COVARIANCE_STATE_NAME,
+        shrinkage=config.features.covariance_shrinkage,
+        min_periods=config.features.covariance_min_periods,
+    )
+    if covariance.empty:
+        covariance.seed(load_market_history(store, config.storage.processed_subdir))
+    returns = feature_result.returns
+    if returns is not None:
+        covariance.update_frame(feature_result.combined.assign(return_1d=returns))
+    covariance.save()
+    if covariance.periods < config.features.covariance_min_periods:
+        return None
+    return correlation_diversification(feature_result.features, covariance, holdings, top_n=10)
 
-    market_overview = {
+
+def load_portfolio(config: AppConfig, path: Path | str | None = None) -> PortfolioSnapshot:
+    """Holdings from ``path`` (default: the configured export file or directory) via the parsed-snapshot cache."""
+
+    path = path if path is not None else config.portfolio.holdings_path
+    cache_dir = config.storage.path_for(config.storage.state_subdir) / config.portfolio.holdings_cache_subdir
+    return load_holdings(Path(path) if path else None, cache_dir)
+
+
+def _market_overview(feature_result: FeaturePipelineResult) -> Dict[str, object]:
+    return {
         "generated_at": datetime.utcnow().isoformat(),
         "assets_considered": len(feature_result.combined),
         "asset_breakdown": feature_result.combined["asset_type"].value_counts().to_dict(),
     }
 
+
+def run_market_refresh(config: AppConfig | None = None) -> Dict[str, object]:
+    """Ingest quotes and update features without the sentiment or advice stages."""
+
+    config = config or load_config()
+    store = DataStore.from_config(config.storage)
+    feature_result = _ingest_features(config, store)
+    store.write_frame(feature_result.combined, config.storage.processed_subdir, f"market_{datetime.utcnow().date()}")
+    append_market_history(store, config.storage.processed_subdir, feature_result.combined)
+    return _market_overview(feature_result)
+
+
+def run_sentiment_refresh(config: AppConfig | None = None, tickers: Iterable[str] = ()) -> Dict[str, object]:
+    """Collect and store news and social sentiment for ``tickers`` only."""
+
+    config = config or load_config()
+    store = DataStore.from_config(config.storage)
+    tickers = list(tickers)
+    news_sentiment = collect_news_sentiment(config, tickers)
+    social_sentiment = collect_social_sentiment(config, tickers)
+    store.write_frame(news_sentiment.aggregated, config.storage.sentiment_subdir, f"news_{datetime.utcnow().date()}")
+    store.write_frame(social_sentiment.aggregated, config.storage.sentiment_subdir, f"social_{datetime.utcnow().date()}")
+    return {
+        "news": news_sentiment.aggregated.to_dict(orient="records"),
+        "social": social_sentiment.aggregated.to_dict(orient="records"),
+    }
+
+
+DEFAULT_PORTFOLIO = "default"
+
+
+def _stack_holdings(portfolios: Mapping[str, PortfolioSnapshot]) -> pd.DataFrame:
+    frames = [snapshot.holdings.assign(portfolio=name) for name, snapshot in portfolios.items()]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=["asset_id", "asset_type", "quantity", "cost_basis", "source", "portfolio"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_batch_advice(
+    config: AppConfig | None = None, portfolios: Mapping[str, PortfolioSnapshot] | None = None
+) -> Dict[str, Dict[str, object]]:
+    """Build advice for several portfolios from one shared market pass.
+
+    Ingestion, features, ranking and sentiment run once. All portfolios' lots
+    are then valued together in a single indexed pass; only reconciliation
+    and the advice request itself are per portfolio. The correlation
+    diversification term uses the union of every portfolio's holdings.
+    Artifacts are persisted by the store's background writer and flushed
+    before returning.
+    """
+
+    config = config or load_config()
+    portfolios = dict(portfolios) if portfolios else {DEFAULT_PORTFOLIO: load_portfolio(config)}
+    store = DataStore.from_config(config.storage)
+    today = datetime.utcnow().date()
+
+    feature_result = _ingest_features(config, store)
+    holdings = _stack_holdings(portfolios)
+
+    diversification = None
+    if config.features.correlation_diversification:
+        diversification = _diversification(config, store, feature_result, holdings)
+    recommendations = rank_assets(feature_result.features, top_n=10, diversification=diversification)
+    valuation = value_holdings(holdings, latest_prices(feature_result.combined))
+
+    # History readers are done for this run; persist market data while sentiment and the LLM calls run.
+    store.write_frame_async(feature_result.combined, config.storage.processed_subdir, f"market_{today}")
+    store.submit(append_market_history, store, config.storage.processed_subdir, feature_result.combined)
+
+    tickers = recommendations["asset_id"].tolist() if not recommendations.empty else []
+    news_sentiment = collect_news_sentiment(config, tickers)
+    social_sentiment = collect_social_sentiment(config, tickers)
+
+    market_overview = _market_overview(feature_result)
     sentiment_summary = {
         "news": news_sentiment.aggregated.to_dict(orient="records"),
         "social": social_sentiment.aggregated.to_dict(orient="records"),
     }
+    top = {"top": recommendations.to_dict(orient="records")}
 
-    request = AdviceRequest(
-        market_overview=market_overview,
-        recommendations={"top": recommendations.to_dict(orient="records")},
-        portfolio={
-            "holdings": portfolio_snapshot.holdings.to_dict(orient="records"),
-            "reconciled": reconciled.to_dict(orient="records"),
-        },
-        sentiment=sentiment_summary,
-    )
+    store.write_frame_async(news_sentiment.aggregated, config.storage.sentiment_subdir, f"news_{today}")
+    store.write_frame_async(social_sentiment.aggregated, config.storage.sentiment_subdir, f"social_{today}")
+
+    positions_by_portfolio = dict(tuple(valuation.positions.groupby("portfolio", sort=False)))
+    accounts_by_portfolio = dict(tuple(valuation.accounts.groupby("portfolio", sort=False)))
     chatgpt = ChatGPTClient(api_key=config.credentials.openai)
-    advice = chatgpt.generate_advice(request)
+    outputs: Dict[str, Dict[str, object]] = {}
+    for name, snapshot in portfolios.items():
+        positions = positions_by_portfolio.get(name, valuation.positions.iloc[0:0]).drop(columns="portfolio")
+        accounts = accounts_by_portfolio.get(name, valuation.accounts.iloc[0:0]).drop(columns="portfolio")
+        reconciled = reconcile(snapshot.holdings, recommendations, PortfolioValuation(positions, accounts))
+
+        request = AdviceRequest(
+            market_overview=market_overview,
+            recommendations=top,
+            portfolio={
+                "holdings": snapshot.holdings.to_dict(orient="records"),
+                "reconciled": reconciled.to_dict(orient="records"),
+                "positions": positions.to_dict(orient="records"),
+                "accounts": accounts.to_dict(orient="records"),
+            },
+            sentiment=sentiment_summary,
+        )
+        advice = chatgpt.generate_advice(request)
+        store.write_json_async(
+            advice, config.storage.advice_subdir, f"advice_{today}" if name == DEFAULT_PORTFOLIO else f"advice_{name}_{today}"
+        )
+
+        outputs[name] = {
+            "market_overview": market_overview,
+            "recommendations": request.recommendations,
+            "portfolio": request.portfolio,
+            "sentiment": sentiment_summary,
+            "advice": advice,
+        }
+        logger.info("Generated advice packet for %s", name, extra={"summary": advice.get("summary")})
+    store.flush()
+    return outputs
 
-    store.write_frame(feature_result.combined, config.storage.processed_subdir, f"market_{datetime.utcnow().date()}")
-    store.write_frame(news_sentiment.aggregated, config.storage.sentiment_subdir, f"news_{datetime.utcnow().date()}")
-    store.write_frame(social_sentiment.aggregated, config.storage.sentiment_subdir, f"social_{datetime.utcnow().date()}")
-    store.write_json(advice, config.storage.advice_subdir, f"advice_{datetime.utcnow().date()}")
-
-    output = {
-        "market_overview": market_overview,
-        "recommendations": request.recommendations,
-        "portfolio": request.portfolio,
-        "sentiment": sentiment_summary,
-        "advice": advice,
-    }
-    logger.info("Generated daily advice packet", extra={"summary": advice.get("summary")})
-    return output
+
+def run_daily_advice(config: AppConfig | None = None) -> Dict[str, Dict[str, object]]:
+    """Run the end-to-end ingestion, scoring, and advice workflow."""
+
+    config = config or load_config()
+    return run_batch_advice(config, {DEFAULT_PORTFOLIO: load_portfolio(config)})[DEFAULT_PORTFOLIO]
 
 
-__all__ = ["run_daily_advice"]
+__all__ = ["load_portfolio", "run_batch_advice", "run_daily_advice", "run_market_refresh", "run_sentiment_refresh"]
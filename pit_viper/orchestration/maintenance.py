@@ -0,0 +1,31 @@
+"""Storage housekeeping: monthly compaction and retention of the data directory."""
+from __future__ import annotations
+
+import logging
+from typing import Dict
+
+import pandas as pd
+
+from ..utils.compaction import compact_category, prune_history
+from ..utils.config import AppConfig, load_config
+from ..utils.storage import DataStore
+
+logger = logging.getLogger(__name__)
+
+
+def run_storage_maintenance(config: AppConfig | None = None, today: pd.Timestamp | None = None) -> Dict[str, object]:
+    """Compact every artifact category and apply the retention configured in ``StorageConfig``."""
+
+    config = config or load_config()
+    store = DataStore.from_config(config.storage)
+    summary: Dict[str, object] = {}
+    for category, retention_days in config.storage.retention().items():
+        if (store.root / category).exists():
+            summary[category] = compact_category(store, category, retention_days, today).as_dict()
+    summary["history"] = {
+        "removed": prune_history(store, config.storage.processed_subdir, config.storage.history_retention_days, today)
+    }
+    return summary
+
+
+__all__ = ["run_storage_maintenance"]
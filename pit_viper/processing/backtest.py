@@ -0,0 +1,255 @@
+"""Vectorized historical backtest of the composite scoring model.
+
+Stored daily market snapshots are turned into one feature panel, pivoted to
+date-by-asset arrays and scored for every date at once. Portfolios, turnover,
+costs and drawdowns are then array operations over those matrices rather than
+a per-day loop through the live pipeline.
+"""
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from ..utils.storage import DataStore
+from .feature_pipeline import engineer_features, load_market_history
+from .rolling import KEYS, prepare_history
+from .scoring import SUB_SCORES, ScoringWeights, top_n_per_row
+
+PANEL_FEATURES = ("valuation_proxy", "momentum_proxy", "liquidity_score", "volatility_proxy")
+TRADING_DAYS = 252
+DEFAULT_COST_BPS = 10.0
+DAILY_COLUMNS = [
+    "date",
+    "gross_return",
+    "cost",
+    "net_return",
+    "turnover",
+    "equity",
+    "drawdown",
+    "benchmark_return",
+    "pick_hit_rate",
+]
+HOLDING_COLUMNS = ["date", "rank", "asset_id", "asset_type", "forward_return"]
+
+
+@dataclass
+class FeaturePanel:
+    """Scoring inputs as ``(dates, assets)`` arrays; NaN marks an asset without a bar that day."""
+
+    dates: pd.DatetimeIndex
+    asset_ids: np.ndarray
+    asset_types: np.ndarray
+    close: np.ndarray
+    features: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def present(self) -> np.ndarray:
+        return ~np.isnan(self.close)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "FeaturePanel":
+        """Pivot a long feature frame (one row per asset and bar date) into arrays."""
+
+        bar_date = pd.to_datetime(frame["as_of"]).dt.normalize()
+        date_codes, dates = pd.factorize(bar_date, sort=True)
+        asset_keys = frame["asset_type"].astype(str) + "\x1f" + frame["asset_id"].astype(str)
+        asset_codes, assets = pd.factorize(asset_keys, sort=True)
+        shape = (len(dates), len(assets))
+
+        def pivot(column: str) -> np.ndarray:
+            values = np.full(shape, np.nan)
+            values[date_codes, asset_codes] = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+            return values
+
+        split = pd.Series(assets).str.split("\x1f", n=1, expand=True)
+        return cls(
+            dates=pd.DatetimeIndex(dates),
+            asset_ids=split[1].to_numpy(dtype=object),
+            asset_types=split[0].to_numpy(dtype=object),
+            close=pivot("close"),
+            features={name: pivot(name) for name in PANEL_FEATURES},
+        )
+
+
+def load_feature_panel(store: DataStore, category: str, lookback: int | None = None) -> FeaturePanel:
+    """Rebuild scoring features for every stored market snapshot in ``category``."""
+
+    if lookback is None:
+        lookback = len(store.history_dates(category)) or len(store.list_frames(category, "market_"))
+    history = load_market_history(store, category, lookback)
+    return FeaturePanel.from_frame(feature_frame_for(history))
+
+
+def feature_frame_for(history: pd.DataFrame) -> pd.DataFrame:
+    """Scoring features for every bar in ``history``, as the daily pipeline would have produced them."""
+
+    bars = prepare_history(history).drop(columns=["bar_date"])
+    if bars.empty:
+        return pd.DataFrame(columns=KEYS + ["as_of", "close", *PANEL_FEATURES])
+    return engineer_features(bars)
+
+
+def _normalize_rows(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Per-date min-max scaling over the assets present that date, matching ``scoring._normalize``."""
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low = np.nanmin(np.where(present, values, np.nan), axis=1, keepdims=True)
+        high = np.nanmax(np.where(present, values, np.nan), axis=1, keepdims=True)
+    spread = high - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = np.where(spread > 0, (values - low) / spread, 1.0)
+    return np.where(present & ~np.isnan(values), scaled, 0.0)
+
+
+def composite_scores(panel: FeaturePanel, weights: ScoringWeights | None = None) -> np.ndarray:
+    """Composite score for every date and asset; ``-inf`` where the asset has no bar."""
+
+    weights = weights or ScoringWeights()
+    present = panel.present
+    type_codes, _ = pd.factorize(pd.Series(panel.asset_types))
+    type_counts = np.zeros((len(panel.dates), type_codes.max() + 1 if len(type_codes) else 0))
+    for code in range(type_counts.shape[1]):
+        type_counts[:, code] = present[:, type_codes == code].sum(axis=1)
+
+    sub_scores = {
+        "valuation": _normalize_rows(panel.features["valuation_proxy"], present),
+        "momentum": _normalize_rows(panel.features["momentum_proxy"], present),
+        "liquidity": _normalize_rows(panel.features["liquidity_score"], present),
+        "risk": 1 - _normalize_rows(panel.features["volatility_proxy"], present),
+        "diversification": 1.0 / np.maximum(type_counts[:, type_codes], 1.0),
+    }
+    composite = np.zeros(present.shape)
+    for name, weight in zip(SUB_SCORES, weights.as_vector()):
+        composite += weight * sub_scores[name]
+    composite[~present] = -np.inf
+    return composite
+
+
+@dataclass
+class BacktestResult:
+    """Daily portfolio path, the holdings behind it and headline statistics."""
+
+    daily: pd.DataFrame
+    holdings: pd.DataFrame
+    summary: Dict[str, float]
+
+
+def run_backtest(
+    panel: FeaturePanel,
+    weights: ScoringWeights | None = None,
+    top_n: int = 10,
+    cost_bps: float = DEFAULT_COST_BPS,
+) -> BacktestResult:
+    """Hold the equal-weighted top ``top_n`` assets from each date's close to the next.
+
+    Returns on date ``t`` are earned from ``t``'s close to the next stored
+    date's close. Assets without a next bar contribute a zero return. Turnover
+    is the one-way traded fraction against the previous day's drifted weights;
+    costs charge ``cost_bps`` on every unit traded. The benchmark holds every
+    present asset equally.
+    """
+
+    dates, assets = panel.close.shape
+    if dates < 2 or assets == 0:
+        return BacktestResult(pd.DataFrame(columns=DAILY_COLUMNS), pd.DataFrame(columns=HOLDING_COLUMNS), {})
+
+    composite = composite_scores(panel, weights)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        forward = panel.close[1:] / panel.close[:-1] - 1
+    forward = np.nan_to_num(forward, nan=0.0, posinf=0.0, neginf=0.0)
+    composite = composite[:-1]
+    present = panel.present[:-1]
+    periods = len(composite)
+
+    picks = top_n_per_row(composite, top_n)
+    valid = np.isfinite(np.take_along_axis(composite, picks, axis=1))
+    held = np.maximum(valid.sum(axis=1, keepdims=True), 1)
+    holdings = np.zeros((periods, assets))
+    np.put_along_axis(holdings, picks, valid / held, axis=1)
+
+    pick_returns = np.take_along_axis(forward, picks, axis=1)
+    gross = (holdings * forward).sum(axis=1)
+    drifted = np.zeros_like(holdings)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drifted[1:] = holdings[:-1] * (1 + forward[:-1]) / (1 + gross[:-1, None])
+    traded = np.abs(holdings - np.nan_to_num(drifted)).sum(axis=1)
+    cost = traded * cost_bps / 10_000
+    net = gross - cost
+    equity = np.cumprod(1 + net)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    benchmark = (forward * present).sum(axis=1) / np.maximum(present.sum(axis=1), 1)
+    with np.errstate(invalid="ignore"):
+        pick_hit_rate = ((pick_returns > 0) & valid).sum(axis=1) / valid.sum(axis=1)
+
+    daily = pd.DataFrame(
+        {
+            "date": panel.dates[:-1],
+            "gross_return": gross,
+            "cost": cost,
+            "net_return": net,
+            "turnover": traded / 2,
+            "equity": equity,
+            "drawdown": drawdown,
+            "benchmark_return": benchmark,
+            "pick_hit_rate": pick_hit_rate,
+        }
+    )
+    rows, ranks = np.nonzero(valid)
+    held_frame = pd.DataFrame(
+        {
+            "date": panel.dates[:-1][rows],
+            "rank": ranks + 1,
+            "asset_id": panel.asset_ids[picks[rows, ranks]],
+            "asset_type": panel.asset_types[picks[rows, ranks]],
+            "forward_return": pick_returns[rows, ranks],
+        }
+    )
+    return BacktestResult(daily=daily, holdings=held_frame, summary=_summarize(daily))
+
+
+def _summarize(daily: pd.DataFrame) -> Dict[str, float]:
+    net = daily["net_return"].to_numpy()
+    volatility = float(net.std(ddof=1) * np.sqrt(TRADING_DAYS)) if len(net) > 1 else 0.0
+    annual_return = float(daily["equity"].iloc[-1] ** (TRADING_DAYS / len(net)) - 1)
+    return {
+        "periods": float(len(net)),
+        "total_return": float(daily["equity"].iloc[-1] - 1),
+        "annual_return": annual_return,
+        "annual_volatility": volatility,
+        "sharpe": annual_return / volatility if volatility > 0 else 0.0,
+        "max_drawdown": float(daily["drawdown"].min()),
+        "hit_rate": float((net > 0).mean()),
+        "pick_hit_rate": float(daily["pick_hit_rate"].mean()),
+        "average_turnover": float(daily["turnover"].mean()),
+        "total_cost": float(daily["cost"].sum()),
+        "benchmark_total_return": float(np.prod(1 + daily["benchmark_return"].to_numpy()) - 1),
+    }
+
+
+def backtest_from_store(
+    store: DataStore,
+    category: str,
+    weights: ScoringWeights | None = None,
+    top_n: int = 10,
+    cost_bps: float = DEFAULT_COST_BPS,
+    lookback: int | None = None,
+) -> BacktestResult:
+    """Load stored snapshots from ``category`` and backtest the scoring model over them."""
+
+    return run_backtest(load_feature_panel(store, category, lookback), weights, top_n, cost_bps)
+
+
+__all__ = [
+    "BacktestResult",
+    "FeaturePanel",
+    "backtest_from_store",
+    "composite_scores",
+    "feature_frame_for",
+    "load_feature_panel",
+    "run_backtest",
+]
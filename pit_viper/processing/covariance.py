@@ -0,0 +1,248 @@
+"""Streaming return covariance and the correlation-aware diversification score."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rolling import KEYS, prepare_history
+from .scoring import ScoringWeights, sub_score_matrix, top_n_indices
+
+COVARIANCE_STATE_NAME = "covariance_state.npz"
+DEFAULT_SHRINKAGE = 0.2
+DEFAULT_MIN_PERIODS = 20
+DEFAULT_BLOCK_SIZE = 1024
+NEUTRAL_DIVERSIFICATION = 0.5
+
+
+def asset_keys(frame: pd.DataFrame) -> np.ndarray:
+    """``asset_type:asset_id`` strings identifying assets in the covariance state."""
+
+    return (frame["asset_type"].astype(str) + ":" + frame["asset_id"].astype(str)).to_numpy(dtype=object)
+
+
+class StreamingCovariance:
+    """Running mean and co-moment matrix of daily returns, merged batch by batch.
+
+    Each update folds a block of days into the state with the pairwise
+    (Chan et al.) form of Welford's algorithm, so nightly runs add one day
+    without revisiting history. A missing return counts as the asset's running
+    mean, which contributes nothing to its co-moments; assets first seen later
+    simply start with no co-movement. Correlations are shrunk toward zero by
+    ``shrinkage`` (a diagonal covariance target) and are only reported for
+    assets with at least ``min_periods`` observed returns.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        keys: Sequence[str] = (),
+        mean: np.ndarray | None = None,
+        comoment: np.ndarray | None = None,
+        observations: np.ndarray | None = None,
+        periods: int = 0,
+        last_date: pd.Timestamp | None = None,
+        shrinkage: float = DEFAULT_SHRINKAGE,
+        min_periods: int = DEFAULT_MIN_PERIODS,
+    ) -> None:
+        self.path = Path(path)
+        self.keys = list(keys)
+        self._index = {key: position for position, key in enumerate(self.keys)}
+        size = len(self.keys)
+        self.mean = mean if mean is not None else np.zeros(size)
+        self.comoment = comoment if comoment is not None else np.zeros((size, size))
+        self.observations = observations if observations is not None else np.zeros(size, dtype=np.int64)
+        self.periods = int(periods)
+        self.last_date = last_date
+        self.shrinkage = shrinkage
+        self.min_periods = min_periods
+
+    @classmethod
+    def load(
+        cls, path: Path, shrinkage: float = DEFAULT_SHRINKAGE, min_periods: int = DEFAULT_MIN_PERIODS
+    ) -> "StreamingCovariance":
+        path = Path(path)
+        if not path.exists():
+            return cls(path, shrinkage=shrinkage, min_periods=min_periods)
+        with np.load(path, allow_pickle=False) as stored:
+            last_date = str(stored["last_date"])
+            return cls(
+                path,
+                keys=stored["keys"].tolist(),
+                mean=stored["mean"],
+                comoment=stored["comoment"],
+                observations=stored["observations"],
+                periods=int(stored["periods"]),
+                last_date=pd.Timestamp(last_date) if last_date else None,
+                shrinkage=shrinkage,
+                min_periods=min_periods,
+            )
+
+    @property
+    def empty(self) -> bool:
+        return self.periods == 0
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as handle:
+            np.savez(
+                handle,
+                keys=np.array(self.keys, dtype=str),
+                mean=self.mean,
+                comoment=self.comoment,
+                observations=self.observations,
+                periods=np.int64(self.periods),
+                last_date=np.array(self.last_date.isoformat() if self.last_date is not None else ""),
+            )
+        os.replace(tmp_path, self.path)
+        return self.path
+
+    def indices(self, keys: Iterable[str]) -> np.ndarray:
+        """State positions of ``keys``; ``-1`` for assets never seen."""
+
+        return np.array([self._index.get(key, -1) for key in keys], dtype=np.intp)
+
+    def _grow(self, keys: Iterable[str]) -> np.ndarray:
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self._index]
+        if new_keys:
+            old, added = len(self.keys), len(new_keys)
+            self.keys.extend(new_keys)
+            self._index.update({key: old + offset for offset, key in enumerate(new_keys)})
+            self.mean = np.concatenate([self.mean, np.zeros(added)])
+            self.observations = np.concatenate([self.observations, np.zeros(added, dtype=np.int64)])
+            comoment = np.zeros((old + added, old + added))
+            comoment[:old, :old] = self.comoment
+            self.comoment = comoment
+        return self.indices(keys)
+
+    def update(self, returns: np.ndarray, keys: Sequence[str]) -> None:
+        """Fold a ``(days, len(keys))`` block of returns (NaN = missing) into the state."""
+
+        returns = np.atleast_2d(np.asarray(returns, dtype=float))
+        days = returns.shape[0]
+        if days == 0 or not len(keys):
+            return
+        positions = self._grow(keys)
+        observed = ~np.isnan(returns)
+        prior_mean = self.mean[positions]
+        block = np.where(observed, returns, prior_mean)
+
+        block_mean = block.mean(axis=0)
+        centered = block - block_mean
+        delta = block_mean - prior_mean
+        total = self.periods + days
+        increment = centered.T @ centered + np.outer(delta, delta) * (self.periods * days / total)
+        if np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+            window = slice(positions[0], positions[0] + len(positions))
+            self.comoment[window, window] += increment
+        else:
+            self.comoment[np.ix_(positions, positions)] += increment
+        self.mean[positions] = prior_mean + delta * (days / total)
+        self.observations[positions] += observed.sum(axis=0)
+        self.periods = total
+
+    def update_frame(self, frame: pd.DataFrame, column: str = "return_1d") -> int:
+        """Apply per-asset returns from a long frame, one period per bar date newer than ``last_date``.
+
+        Rows marked ``quote_source == "mock"`` are ignored. Returns the number of dates applied.
+        """
+
+        if frame.empty or column not in frame.columns:
+            return 0
+        rows = frame
+        if "quote_source" in rows.columns:
+            rows = rows[rows["quote_source"] != "mock"]
+        bar_date = pd.to_datetime(rows["as_of"]).dt.normalize()
+        if self.last_date is not None:
+            rows, bar_date = rows[bar_date > self.last_date], bar_date[bar_date > self.last_date]
+        if rows.empty:
+            return 0
+        date_codes, dates = pd.factorize(bar_date, sort=True)
+        key_codes, keys = pd.factorize(pd.Series(asset_keys(rows)))
+        returns = np.full((len(dates), len(keys)), np.nan)
+        returns[date_codes, key_codes] = pd.to_numeric(rows[column], errors="coerce").to_numpy(dtype=float)
+        returns[~np.isfinite(returns)] = np.nan
+        self.update(returns, list(keys))
+        self.last_date = pd.Timestamp(dates[-1])
+        return len(dates)
+
+    def seed(self, history: pd.DataFrame) -> int:
+        """Initialise from stored bars, deriving close-to-close returns per asset."""
+
+        if history.empty:
+            return 0
+        bars = prepare_history(history)
+        bars["return_1d"] = bars.groupby(KEYS, sort=False, observed=True)["close"].pct_change()
+        return self.update_frame(bars)
+
+    def correlation_block(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Shrunk correlations between two sets of state positions, without forming the full matrix."""
+
+        rows = np.asarray(rows, dtype=np.intp)
+        columns = np.asarray(columns, dtype=np.intp)
+        variance = np.diag(self.comoment)
+        eligible = (self.observations >= self.min_periods) & (variance > 0)
+        scale = np.where(eligible, 1.0 / np.sqrt(np.where(variance > 0, variance, 1.0)), 0.0)
+        correlation = self.comoment[np.ix_(rows, columns)] * scale[rows, None] * scale[None, columns]
+        correlation *= 1.0 - self.shrinkage
+        correlation[rows[:, None] == columns[None, :]] = 1.0
+        return np.clip(correlation, -1.0, 1.0)
+
+
+def correlation_diversification(
+    features: pd.DataFrame,
+    covariance: StreamingCovariance,
+    holdings: pd.DataFrame | None = None,
+    top_n: int = 10,
+    weights: ScoringWeights | None = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> np.ndarray:
+    """Diversification sub-score from each asset's mean correlation to the holdings and to the top-N set.
+
+    The top-N set is ranked on the other sub-scores. For each reference set an
+    asset's average correlation with its members (itself excluded) is mapped
+    from [-1, 1] to a score in [0, 1]; the two set scores are averaged.
+    Candidates are processed ``block_size`` rows at a time against the
+    reference columns only. Assets without enough history score neutral.
+    """
+
+    scores = np.full(len(features), NEUTRAL_DIVERSIFICATION)
+    if features.empty or covariance.empty:
+        return scores
+    weights = weights or ScoringWeights()
+    base = sub_score_matrix(features)[:, :-1] @ weights.as_vector()[:-1]
+    candidate_keys = asset_keys(features)
+    candidates = covariance.indices(candidate_keys)
+
+    references = [covariance.indices(candidate_keys[top_n_indices(base, top_n)])]
+    if holdings is not None and not holdings.empty:
+        references.append(covariance.indices(asset_keys(holdings)))
+    references = [np.unique(reference[reference >= 0]) for reference in references]
+    references = [reference for reference in references if reference.size]
+    if not references:
+        return scores
+
+    known = np.flatnonzero(candidates >= 0)
+    for start in range(0, len(known), block_size):
+        rows = known[start : start + block_size]
+        set_scores = []
+        for reference in references:
+            correlation = covariance.correlation_block(candidates[rows], reference)
+            others = candidates[rows][:, None] != reference[None, :]
+            count = others.sum(axis=1)
+            mean = np.where(count > 0, (correlation * others).sum(axis=1) / np.maximum(count, 1), 0.0)
+            set_scores.append((1.0 - mean) / 2.0)
+        scores[rows] = np.mean(set_scores, axis=0)
+    return scores
+
+
+__all__ = [
+    "COVARIANCE_STATE_NAME",
+    "StreamingCovariance",
+    "asset_keys",
+    "correlation_diversification",
+]
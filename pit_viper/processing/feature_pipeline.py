@@ -1,63 +1,202 @@
 """Data cleaning and feature engineering for market data."""
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Sequence
 
 import numpy as np
 import pandas as pd
 
 from ..ingestion.base import IngestionResult
+from ..utils.storage import DataStore
+from .feature_state import FeatureState
+from .rolling import HISTORY_COLUMNS, rolling_features_for
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_LOOKBACK = 300
 
 
 @dataclass
 class FeaturePipelineResult:
+    """``returns`` is the close-to-close return per ``combined`` row, NaN where the asset has no prior bar
+    (``features["return_1d"]`` reports those as 0)."""
+
     combined: pd.DataFrame
     features: pd.DataFrame
+    returns: pd.Series | None = None
+
+
+def _clean_source(result: IngestionResult) -> pd.DataFrame:
+    """Typed key columns for one source; ``assign`` leaves every other column shared, not copied."""
+
+    frame = result.data
+    as_of = frame["as_of"] if "as_of" in frame.columns else pd.Series(pd.Timestamp.now("UTC"), index=frame.index)
+    return frame.assign(
+        asset_type=result.asset_type,
+        asset_id=frame["asset_id"].astype(str),
+        close=pd.to_numeric(frame["close"], errors="coerce"),
+        volume=pd.to_numeric(frame["volume"], errors="coerce") if "volume" in frame.columns else np.nan,
+        as_of=pd.to_datetime(as_of, utc=True, errors="coerce").dt.tz_localize(None),
+    )
 
 
 def clean_and_combine(results: Iterable[IngestionResult]) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
-    for result in results:
-        frame = result.data.copy()
-        frame["asset_type"] = result.asset_type
-        frame["asset_id"] = frame["asset_id"].astype(str)
-        frame["close"] = pd.to_numeric(frame["close"], errors="coerce")
-        frame["volume"] = pd.to_numeric(frame.get("volume", np.nan), errors="coerce")
-        frame["as_of"] = pd.to_datetime(frame.get("as_of", pd.Timestamp.utcnow()), utc=True, errors="coerce").dt.tz_localize(None)
-        frames.append(frame)
+    """Concatenate sources into one frame sorted by asset and time, dropping rows without an id or close.
+
+    Sources are not copied before concatenation, and filtering and sorting
+    are applied as a single ``take`` (skipped when rows are already clean
+    and ordered), so the data is materialised once.
+    """
+
+    frames = [_clean_source(result) for result in results]
     if not frames:
         return pd.DataFrame()
     combined = pd.concat(frames, ignore_index=True)
-    combined.dropna(subset=["asset_id", "close"], inplace=True)
-    combined.sort_values(["asset_id", "as_of"], inplace=True)
-    combined.reset_index(drop=True, inplace=True)
-    return combined
+    keep = combined["asset_id"].notna() & combined["close"].notna()
+    order = combined.loc[keep, ["asset_id", "as_of"]].sort_values(["asset_id", "as_of"]).index.to_numpy()
+    if len(order) == len(combined) and (order == np.arange(len(order))).all():
+        return combined
+    return combined.take(order).reset_index(drop=True)
+
+
+def _finite_or_zero(values: np.ndarray) -> np.ndarray:
+    """Replace NaN and +/-inf with 0 in place."""
+
+    values[~np.isfinite(values)] = 0.0
+    return values
+
+
+def _float_column(frame: pd.DataFrame, column: str, default: str = "close") -> np.ndarray:
+    return frame[column if column in frame.columns else default].to_numpy(dtype=float, na_value=np.nan)
+
+
+def engineer_features(
+    combined: pd.DataFrame,
+    history: pd.DataFrame | None = None,
+    state: FeatureState | None = None,
+    rolling: Dict[str, np.ndarray] | None = None,
+) -> pd.DataFrame:
+    """Derive scoring features.
+
+    Earlier bars for the per-asset rolling windows come either from a full
+    ``history`` frame or, in incremental mode, from a persisted ``state`` that
+    holds only the tail each window needs and is advanced with today's bars.
+    ``rolling`` passes windows already computed by either (see
+    :func:`run_feature_pipeline`) instead.
 
+    ``combined`` is not copied: each feature is computed once into its own
+    array and attached with ``assign``, and input columns are only rewritten
+    when they hold NaN or infinite values (which, like every numeric
+    feature, become 0).
+    """
 
-def engineer_features(combined: pd.DataFrame) -> pd.DataFrame:
     if combined.empty:
         return pd.DataFrame()
-    feature_frame = combined.copy()
-    feature_frame["log_close"] = np.log(feature_frame["close"].clip(lower=1e-6))
-    feature_frame["liquidity_score"] = np.log1p(feature_frame.get("volume", 0)).fillna(0)
-    feature_frame["volatility_proxy"] = (
-        (feature_frame.get("high", feature_frame["close"]) - feature_frame.get("low", feature_frame["close"]))
-        / feature_frame["close"].replace(0, np.nan)
-    ).fillna(0)
-    feature_frame["momentum_proxy"] = (
-        feature_frame["close"].pct_change().fillna(0)
-    )
-    feature_frame["valuation_proxy"] = 1 / feature_frame["log_close"].replace(0, np.nan)
-    feature_frame.replace([np.inf, -np.inf], np.nan, inplace=True)
-    feature_frame.fillna(0, inplace=True)
-    return feature_frame
+    close = _float_column(combined, "close")
+    volume = _float_column(combined, "volume") if "volume" in combined.columns else np.zeros(len(combined))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_close = np.log(np.clip(close, 1e-6, None))
+        spread = (_float_column(combined, "high") - _float_column(combined, "low")) / np.where(close == 0, np.nan, close)
+        valuation = 1 / np.where(log_close == 0, np.nan, log_close)
+        liquidity = np.log1p(volume)
+
+    features: Dict[str, np.ndarray | pd.Series] = {}
+    for column in combined.select_dtypes("number").columns:
+        values = combined[column]
+        if not np.isfinite(values.to_numpy(dtype=float, na_value=np.nan)).all():
+            features[column] = values.replace([np.inf, -np.inf], np.nan).fillna(0)
+    features["log_close"] = _finite_or_zero(log_close)
+    features["liquidity_score"] = _finite_or_zero(liquidity)
+    features["volatility_proxy"] = _finite_or_zero(spread)
+    if rolling is None:
+        rolling = _rolling_windows(combined, history, state)
+    for column, values in rolling.items():
+        features[column] = _finite_or_zero(np.asarray(values, dtype=float))
+    features["momentum_proxy"] = features["return_1d"]
+    features["valuation_proxy"] = _finite_or_zero(valuation)
+    return combined.assign(**features)
+
+
+def _rolling_windows(
+    combined: pd.DataFrame, history: pd.DataFrame | None, state: FeatureState | None
+) -> Dict[str, np.ndarray]:
+    return state.update(combined) if state is not None else rolling_features_for(combined, history)
+
+
+def _history_rows(frame: pd.DataFrame) -> pd.DataFrame:
+    """Real bars in the fixed history schema; mock rows are never stored as history."""
+
+    if "quote_source" in frame.columns:
+        frame = frame[frame["quote_source"] != "mock"]
+    rows = frame.reindex(columns=HISTORY_COLUMNS)
+    rows["as_of"] = pd.to_datetime(rows["as_of"])
+    for column in ("close", "high", "low", "volume"):
+        rows[column] = pd.to_numeric(rows[column], errors="coerce").astype(float)
+    return rows.dropna(subset=["asset_type", "asset_id", "as_of"])
+
+
+def append_market_history(store: DataStore, category: str, combined: pd.DataFrame) -> None:
+    """Upsert today's bars into the partitioned history, backfilling it from flat daily snapshots on first use."""
 
+    if not store.history_dates(category):
+        snapshots = store.list_frames(category, "market_")[::-1]
+        if snapshots:
+            logger.info("Backfilling partitioned market history from %d daily snapshots", len(snapshots))
+            store.write_history(_history_rows(pd.concat([pd.read_parquet(path) for path in snapshots], ignore_index=True)), category)
+    store.write_history(_history_rows(combined), category)
 
-def run_feature_pipeline(results: Iterable[IngestionResult]) -> FeaturePipelineResult:
+
+def load_market_history(
+    store: DataStore,
+    category: str,
+    lookback: int = DEFAULT_HISTORY_LOOKBACK,
+    columns: Sequence[str] | None = None,
+    asset_types: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """Read bars for the newest ``lookback`` days, dropping rows that were mock data.
+
+    When the category has a partitioned history only the matching date and
+    ``asset_types`` partitions and the requested ``columns`` are read;
+    otherwise the newest ``lookback`` flat ``market_*`` snapshots are loaded.
+    """
+
+    columns = list(columns) if columns is not None else HISTORY_COLUMNS
+    dates = store.history_dates(category)
+    if dates:
+        start = dates[-lookback] if lookback < len(dates) else None
+        return store.read_history(category, columns=columns, start=start, asset_types=asset_types)
+
+    frames: List[pd.DataFrame] = []
+    for path in store.list_frames(category, "market_")[:lookback]:
+        frame = pd.read_parquet(path)
+        if "quote_source" in frame.columns:
+            frame = frame[frame["quote_source"] != "mock"]
+        if asset_types is not None:
+            frame = frame[frame["asset_type"].isin(list(asset_types))]
+        frames.append(frame[[column for column in columns if column in frame.columns]])
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_feature_pipeline(
+    results: Iterable[IngestionResult], history: pd.DataFrame | None = None, state: FeatureState | None = None
+) -> FeaturePipelineResult:
     combined = clean_and_combine(results)
-    features = engineer_features(combined)
-    return FeaturePipelineResult(combined=combined, features=features)
+    if combined.empty:
+        return FeaturePipelineResult(combined=combined, features=pd.DataFrame())
+    rolling = _rolling_windows(combined, history, state)
+    returns = pd.Series(rolling["return_1d"], index=combined.index, name="return_1d")
+    features = engineer_features(combined, rolling=rolling)
+    return FeaturePipelineResult(combined=combined, features=features, returns=returns)
 
 
-__all__ = ["FeaturePipelineResult", "run_feature_pipeline"]
+__all__ = [
+    "FeaturePipelineResult",
+    "append_market_history",
+    "engineer_features",
+    "load_market_history",
+    "run_feature_pipeline",
+]
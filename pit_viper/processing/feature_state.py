@@ -0,0 +1,101 @@
+"""Persisted per-asset rolling state for incremental feature updates."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .rolling import (
+    DEFAULT_ATR_WINDOW,
+    DEFAULT_MOMENTUM_HORIZONS,
+    DEFAULT_VOLATILITY_WINDOW,
+    DEFAULT_VOLUME_WINDOW,
+    HISTORY_COLUMNS,
+    KEYS,
+    prepare_history,
+    rolling_features_for,
+)
+
+FEATURE_STATE_NAME = "feature_state.parquet"
+TAIL_LENGTH = max(
+    max(DEFAULT_MOMENTUM_HORIZONS) + 1,
+    DEFAULT_VOLATILITY_WINDOW + 1,
+    DEFAULT_ATR_WINDOW + 1,
+    DEFAULT_VOLUME_WINDOW,
+)
+
+
+class FeatureState:
+    """The last ``tail_length`` bars of every asset.
+
+    Every rolling feature is a function of at most ``tail_length`` consecutive
+    bars, so this tail is a sufficient statistic: extending it with new bars
+    reproduces a full-history recomputation exactly, while the work done on each
+    update scales with the number of assets that received bars rather than with
+    the length of the stored history.
+    """
+
+    def __init__(self, path: Path, bars: pd.DataFrame | None = None, tail_length: int = TAIL_LENGTH) -> None:
+        self.path = Path(path)
+        self.tail_length = tail_length
+        self.bars = bars if bars is not None else pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    @classmethod
+    def load(cls, path: Path, tail_length: int = TAIL_LENGTH) -> "FeatureState":
+        path = Path(path)
+        bars = pd.read_parquet(path) if path.exists() else None
+        return cls(path, bars, tail_length)
+
+    @property
+    def empty(self) -> bool:
+        return self.bars.empty
+
+    def _tail(self, bars: pd.DataFrame) -> pd.DataFrame:
+        ordered = prepare_history(bars)
+        return ordered.groupby(KEYS, sort=False, observed=True).tail(self.tail_length).reindex(columns=HISTORY_COLUMNS)
+
+    def seed(self, history: pd.DataFrame) -> None:
+        """Initialise the state from a full history, keeping only each asset's tail."""
+
+        if history.empty:
+            return
+        frames = [frame for frame in (self.bars, history.reindex(columns=HISTORY_COLUMNS)) if not frame.empty]
+        self.bars = self._tail(pd.concat(frames, ignore_index=True)).reset_index(drop=True)
+
+    def update(self, current: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Compute rolling features for ``current`` rows and advance the state with them.
+
+        Only the tails of assets present in ``current`` are touched. Rows whose
+        ``quote_source`` is ``mock`` get features but are not written into the state.
+        """
+
+        if current.empty:
+            return rolling_features_for(current)
+        current_keys = pd.MultiIndex.from_frame(current[KEYS].astype(str))
+        state_keys = pd.MultiIndex.from_frame(self.bars[KEYS].astype(str)) if not self.bars.empty else None
+        touched = state_keys.isin(current_keys) if state_keys is not None else np.zeros(0, dtype=bool)
+        previous = self.bars[touched]
+        features = rolling_features_for(current, previous)
+
+        accepted = current
+        if "quote_source" in current.columns:
+            accepted = current[current["quote_source"] != "mock"]
+        frames = [frame for frame in (previous, accepted.reindex(columns=HISTORY_COLUMNS)) if not frame.empty]
+        if frames:
+            advanced = self._tail(pd.concat(frames, ignore_index=True))
+            untouched = self.bars[~touched]
+            self.bars = pd.concat([untouched, advanced], ignore_index=True) if not untouched.empty else advanced.reset_index(drop=True)
+        return features
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        self.bars.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+__all__ = ["FEATURE_STATE_NAME", "FeatureState", "TAIL_LENGTH"]
@@ -0,0 +1,231 @@
+"""Parse brokerage holdings exports into the portfolio schema, caching parsed snapshots."""
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_COLUMNS = ("asset_id", "asset_type", "quantity", "cost_basis", "source", "account")
+NUMERIC_COLUMNS = ("quantity", "cost_basis")
+EXPORT_SUFFIXES = (".csv",)
+MANIFEST_NAME = "manifest.json"
+
+# Export header -> schema column. Headers are matched case-insensitively.
+COLUMN_ALIASES: Dict[str, str] = {
+    "asset_id": "asset_id",
+    "symbol": "asset_id",
+    "asset": "asset_id",
+    "asset_type": "asset_type",
+    "quantity": "quantity",
+    "amount": "quantity",
+    "balance": "quantity",
+    "cost_basis": "cost_basis",
+    "cost basis total": "cost_basis",
+    "cost basis": "cost_basis",
+    "source": "source",
+    "account": "account",
+    "account number": "account",
+    "account name": "account",
+    "portfolio": "account",
+}
+DEFAULT_ASSET_TYPES = {"coinbase": "crypto", "fidelity": "equity"}
+# Bump whenever parse_export or _to_number change what an unchanged export parses to.
+PARSER_VERSION = 1
+
+
+def _detect_source(path: Path, headers: List[str]) -> str:
+    name = path.name.lower()
+    for source in DEFAULT_ASSET_TYPES:
+        if source in name:
+            return source
+    lowered = {header.lower() for header in headers}
+    if "asset" in lowered:
+        return "coinbase"
+    if "symbol" in lowered:
+        return "fidelity"
+    return "csv"
+
+
+def _read_headers(path: Path) -> List[str]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as handle:
+        first = handle.readline()
+    return next(csv.reader([first]), [])
+
+
+def _to_number(values: pd.Series) -> pd.Series:
+    """Parse export numbers such as ``$1,234.50``, ``(12.00)`` or ``--`` into floats."""
+
+    text = values.astype("string").str.strip()
+    negative = text.str.startswith("(") & text.str.endswith(")")
+    cleaned = text.str.replace(r"[,$()+%\s]", "", regex=True)
+    numbers = pd.to_numeric(cleaned, errors="coerce").astype(float)
+    return numbers.where(~negative.fillna(False), -numbers)
+
+
+def parse_export(path: Path) -> pd.DataFrame:
+    """Parse one holdings export with pyarrow's CSV reader and explicit string column types.
+
+    Only recognised columns are read. Rows whose field count does not match
+    the header (brokerage disclaimers and footers) are skipped, as are rows
+    without a symbol. Missing quantity and cost basis become 0.
+    """
+
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    path = Path(path)
+    headers = _read_headers(path)
+    mapped = {header: COLUMN_ALIASES[header.strip().lower()] for header in headers if header.strip().lower() in COLUMN_ALIASES}
+    wanted: Dict[str, str] = {}
+    for header, column in mapped.items():
+        wanted.setdefault(column, header)
+    if "asset_id" not in wanted:
+        raise ValueError(f"{path} has no symbol column")
+
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(encoding="utf8"),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(wanted.values()),
+            column_types={header: pa.string() for header in wanted.values()},
+            strings_can_be_null=True,
+        ),
+    )
+    raw = table.to_pandas()
+    frame = pd.DataFrame({column: raw[header] for column, header in wanted.items()})
+
+    source = _detect_source(path, headers)
+    frame["asset_id"] = frame["asset_id"].astype("string").str.strip().str.rstrip("*")
+    frame = frame[frame["asset_id"].notna() & (frame["asset_id"] != "")]
+    for column in NUMERIC_COLUMNS:
+        frame[column] = _to_number(frame[column]).fillna(0.0) if column in frame.columns else 0.0
+    if "source" not in frame.columns:
+        frame["source"] = source
+    if "asset_type" not in frame.columns:
+        frame["asset_type"] = DEFAULT_ASSET_TYPES.get(source, "equity")
+    if source == "coinbase" and "asset_type" not in wanted:
+        frame["asset_id"] = frame["asset_id"].where(frame["asset_id"].str.contains("-"), frame["asset_id"] + "-USD")
+    if "account" not in frame.columns:
+        frame["account"] = path.stem
+    frame = frame.reset_index(drop=True)
+    for column in ("asset_id", "asset_type", "source", "account"):
+        frame[column] = frame[column].astype(str)
+    return frame[list(SCHEMA_COLUMNS)]
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parser_fingerprint() -> str:
+    """Identify the parser version and its column tables, so a change to either invalidates cached snapshots."""
+
+    spec = json.dumps([PARSER_VERSION, SCHEMA_COLUMNS, COLUMN_ALIASES, DEFAULT_ASSET_TYPES], sort_keys=True)
+    return hashlib.blake2b(spec.encode(), digest_size=8).hexdigest()
+
+
+class HoldingsCache:
+    """Parsed exports stored as Parquet, keyed by each file's path, size, mtime and content hash.
+
+    A file whose size and mtime match its manifest entry is served without
+    being read. If only the mtime moved, the content hash decides: unchanged
+    bytes reuse the parsed snapshot and refresh the stored mtime. Entries
+    written by a different :func:`parser_fingerprint` are always re-parsed.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._manifest_path = self.directory / MANIFEST_NAME
+        self._entries: Dict[str, Dict[str, object]] = {}
+        self._dirty = False
+        self.parser = parser_fingerprint()
+        if self._manifest_path.exists():
+            try:
+                self._entries = json.loads(self._manifest_path.read_text())
+            except (OSError, json.JSONDecodeError):
+                logger.warning("Ignoring unreadable holdings cache manifest %s", self._manifest_path)
+
+    def _snapshot_path(self, key: str, digest: str) -> Path:
+        # The parse depends on the file name (account, source), so identical bytes at two paths get two snapshots.
+        name = hashlib.blake2b(f"{key}\0{digest}".encode(), digest_size=16).hexdigest()
+        return self.directory / f"{name}.parquet"
+
+    def load(self, path: Path) -> pd.DataFrame:
+        """Return the parsed export, re-parsing only when the file's contents changed."""
+
+        key = str(Path(path).resolve())
+        stat = os.stat(path)
+        entry = self._entries.get(key)
+        current = entry is not None and entry.get("parser") == self.parser
+        if current and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            cached = self._read(key, str(entry["digest"]))
+            if cached is not None:
+                return cached
+        digest = file_digest(path)
+        if current and entry["digest"] == digest:
+            cached = self._read(key, digest)
+            if cached is not None:
+                self._entries[key] = self._entry(stat, digest)
+                self._dirty = True
+                return cached
+        frame = parse_export(path)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot = self._snapshot_path(key, digest)
+        tmp_path = snapshot.with_suffix(".tmp")
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, snapshot)
+        self._entries[key] = self._entry(stat, digest)
+        if entry is not None and entry["digest"] != digest:
+            self._snapshot_path(key, str(entry["digest"])).unlink(missing_ok=True)
+        self._dirty = True
+        return frame
+
+    def _entry(self, stat: os.stat_result, digest: str) -> Dict[str, object]:
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest, "parser": self.parser}
+
+    def _read(self, key: str, digest: str) -> Optional[pd.DataFrame]:
+        snapshot = self._snapshot_path(key, digest)
+        return pd.read_parquet(snapshot) if snapshot.exists() else None
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._entries, indent=2, sort_keys=True))
+        os.replace(tmp_path, self._manifest_path)
+        self._dirty = False
+
+
+def load_holdings_dir(directory: Path, cache_dir: Path | None = None) -> pd.DataFrame:
+    """Parse every export in ``directory`` (through ``cache_dir`` when given) into one frame."""
+
+    paths = sorted(path for path in Path(directory).iterdir() if path.suffix.lower() in EXPORT_SUFFIXES)
+    cache = HoldingsCache(cache_dir) if cache_dir is not None else None
+    frames = []
+    for path in paths:
+        try:
+            frames.append(cache.load(path) if cache is not None else parse_export(path))
+        except Exception as exc:  # noqa: BLE001 - one bad export should not drop the others
+            logger.warning("Skipping holdings export %s: %s", path, exc)
+    if cache is not None:
+        cache.save()
+    if not frames:
+        return pd.DataFrame(columns=list(SCHEMA_COLUMNS))
+    return pd.concat(frames, ignore_index=True)
+
+
+__all__ = ["PARSER_VERSION", "SCHEMA_COLUMNS", "HoldingsCache", "load_holdings_dir", "parse_export", "parser_fingerprint"]
@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
 
@@ -17,9 +18,27 @@ class PortfolioSnapshot:
 DEFAULT_COLUMNS = ("asset_id", "asset_type", "quantity", "cost_basis", "source")
 
 
-def load_holdings(csv_path: Optional[Path] = None) -> PortfolioSnapshot:
-    if csv_path and csv_path.exists():
-        holdings = pd.read_csv(csv_path)
+def load_holdings(csv_path: Optional[Path] = None, cache_dir: Optional[Path] = None) -> PortfolioSnapshot:
+    """Load holdings from one export or a directory of exports, falling back to a mock book.
+
+    Exports are parsed by :mod:`~pit_viper.processing.holdings`; with
+    ``cache_dir`` unchanged files are served from their parsed snapshot.
+    """
+
+    from .holdings import HoldingsCache, load_holdings_dir, parse_export
+
+    csv_path = Path(csv_path) if csv_path else None
+    if csv_path and csv_path.is_dir():
+        holdings = load_holdings_dir(csv_path, cache_dir)
+        source = "directory"
+    elif csv_path and csv_path.exists():
+        if cache_dir is not None:
+            cache = HoldingsCache(cache_dir)
+            holdings = cache.load(csv_path)
+            cache.save()
+        else:
+            holdings = parse_export(csv_path)
+        source = "file"
     else:
         holdings = pd.DataFrame(
             [
@@ -39,19 +58,151 @@ def load_holdings(csv_path: Optional[Path] = None) -> PortfolioSnapshot:
                 },
             ]
         )
+        source = "mock"
     for column in DEFAULT_COLUMNS:
         if column not in holdings.columns:
             holdings[column] = 0
-    return PortfolioSnapshot(holdings=holdings[list(DEFAULT_COLUMNS)], metadata={"source": "file" if csv_path else "mock"})
+    columns = list(DEFAULT_COLUMNS) + (["account"] if "account" in holdings.columns else [])
+    return PortfolioSnapshot(holdings=holdings[columns], metadata={"source": source})
+
+
+HOLDING_KEYS = ["asset_id", "asset_type"]
+DEFAULT_ACCOUNT = "default"
+
+
+def _account_labels(holdings: pd.DataFrame) -> pd.Series:
+    if "account" in holdings.columns:
+        return holdings["account"].fillna(DEFAULT_ACCOUNT).astype(str)
+    if "source" in holdings.columns:
+        return holdings["source"].fillna(DEFAULT_ACCOUNT).astype(str)
+    return pd.Series(DEFAULT_ACCOUNT, index=holdings.index)
+
+
+def _key_index(frame: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([frame[key].astype(str) for key in HOLDING_KEYS], names=HOLDING_KEYS)
+
+
+def latest_prices(combined: pd.DataFrame) -> pd.Series:
+    """Last close per ``(asset_id, asset_type)``, indexed for repeated lookups."""
+
+    if combined.empty:
+        return pd.Series(dtype=float, index=pd.MultiIndex.from_arrays([[], []], names=HOLDING_KEYS), name="close")
+    ordered = combined.sort_values("as_of", kind="stable") if "as_of" in combined.columns else combined
+    prices = pd.Series(
+        pd.to_numeric(ordered["close"], errors="coerce").to_numpy(dtype=float), index=_key_index(ordered), name="close"
+    )
+    return prices[~prices.index.duplicated(keep="last")]
+
+
+def _lookup(index: pd.MultiIndex, values: np.ndarray, keys: pd.MultiIndex) -> np.ndarray:
+    found = np.full(len(keys), np.nan)
+    positions = index.get_indexer(keys)
+    matched = positions >= 0
+    found[matched] = values[positions[matched]]
+    return found
 
 
-def reconcile(holdings: pd.DataFrame, recommendations: pd.DataFrame) -> pd.DataFrame:
+@dataclass
+class PortfolioValuation:
+    """Lot-level valuation plus per-account totals (per portfolio and account when holdings carry a ``portfolio`` column)."""
+
+    positions: pd.DataFrame
+    accounts: pd.DataFrame
+
+
+def value_holdings(
+    holdings: pd.DataFrame, prices: pd.Series, target_weights: pd.Series | None = None
+) -> PortfolioValuation:
+    """Value every lot against ``prices`` (from :func:`latest_prices`) in one indexed lookup.
+
+    ``cost_basis`` is the total paid for the lot. Weights are fractions of the
+    lot's account market value. ``drift`` is the weight minus a target: the
+    weight given by ``target_weights`` (a series keyed like ``prices``) or,
+    without one, the lot's share of the account's cost basis. Lots without a
+    price keep NaN market values and are left out of account totals.
+    """
+
+    positions = holdings.reset_index(drop=True).copy()
+    positions["account"] = _account_labels(positions).to_numpy()
+    keys = _key_index(positions)
+    quantity = pd.to_numeric(positions["quantity"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    cost_basis = pd.to_numeric(positions["cost_basis"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    price = _lookup(prices.index, prices.to_numpy(dtype=float), keys)
+    market_value = quantity * price
+    priced = ~np.isnan(market_value)
+
+    group_columns = ["portfolio", "account"] if "portfolio" in positions.columns else ["account"]
+    account_codes, account_names = pd.factorize(pd.MultiIndex.from_frame(positions[group_columns].astype(str)))
+    account_value = np.bincount(account_codes, weights=np.where(priced, market_value, 0.0), minlength=len(account_names))
+    account_cost = np.bincount(account_codes, weights=np.where(priced, cost_basis, 0.0), minlength=len(account_names))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(priced, market_value / account_value[account_codes], np.nan)
+        cost_weight = np.where(priced, cost_basis / account_cost[account_codes], np.nan)
+        pnl_pct = np.where(cost_basis != 0, (market_value - cost_basis) / np.abs(cost_basis), np.nan)
+    if target_weights is not None:
+        target = np.nan_to_num(_lookup(target_weights.index, target_weights.to_numpy(dtype=float), keys))
+    else:
+        target = cost_weight
+
+    positions["price"] = price
+    positions["market_value"] = market_value
+    positions["unrealized_pnl"] = market_value - cost_basis
+    positions["unrealized_pnl_pct"] = pnl_pct
+    positions["weight"] = weight
+    positions["target_weight"] = target
+    positions["drift"] = weight - target
+
+    lots = np.bincount(account_codes, minlength=len(account_names))
+    max_abs_drift = np.full(len(account_names), np.nan)
+    np.fmax.at(max_abs_drift, account_codes, np.abs(positions["drift"].to_numpy(dtype=float)))
+    accounts = pd.DataFrame(
+        {
+            **{column: account_names.get_level_values(level) for level, column in enumerate(group_columns)},
+            "lots": lots,
+            "priced_lots": np.bincount(account_codes, weights=priced, minlength=len(account_names)).astype(int),
+            "market_value": account_value,
+            "cost_basis": account_cost,
+            "unrealized_pnl": account_value - account_cost,
+            "max_abs_drift": max_abs_drift,
+        }
+    )
+    return PortfolioValuation(positions=positions, accounts=accounts)
+
+
+def reconcile(
+    holdings: pd.DataFrame, recommendations: pd.DataFrame, valuation: PortfolioValuation | None = None
+) -> pd.DataFrame:
+    """Annotate recommendations with what is already held, summed across lots and accounts."""
+
     if holdings.empty or recommendations.empty:
         return pd.DataFrame()
-    merged = recommendations.merge(holdings, how="left", on=["asset_id", "asset_type"], suffixes=("", "_held"))
-    merged["position_delta"] = merged["quantity"].fillna(0)
-    merged["in_portfolio"] = merged["quantity"].notna()
-    return merged
+    source = valuation.positions if valuation is not None else holdings
+    held = source.assign(
+        quantity=pd.to_numeric(source["quantity"], errors="coerce").fillna(0.0),
+        cost_basis=pd.to_numeric(source["cost_basis"], errors="coerce").fillna(0.0),
+    )
+    aggregations = {"quantity": "sum", "cost_basis": "sum"}
+    if valuation is not None:
+        aggregations.update(market_value="sum", unrealized_pnl="sum")
+    totals = held.groupby([held[key].astype(str) for key in HOLDING_KEYS], sort=False).agg(aggregations)
+
+    reconciled = recommendations.reset_index(drop=True).copy()
+    positions = totals.index.get_indexer(_key_index(reconciled))
+    found = positions >= 0
+    for column in totals.columns:
+        values = totals[column].to_numpy(dtype=float)
+        reconciled[column] = np.where(found, values[np.maximum(positions, 0)], np.nan)
+    reconciled["position_delta"] = reconciled["quantity"].fillna(0)
+    reconciled["in_portfolio"] = found
+    return reconciled
 
 
-__all__ = ["PortfolioSnapshot", "load_holdings", "reconcile"]
+__all__ = [
+    "HOLDING_KEYS",
+    "PortfolioSnapshot",
+    "PortfolioValuation",
+    "latest_prices",
+    "load_holdings",
+    "reconcile",
+    "value_holdings",
+]
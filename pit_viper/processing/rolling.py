@@ -0,0 +1,135 @@
+"""Vectorized rolling-window features over multi-day price history."""
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+KEYS = ["asset_type", "asset_id"]
+HISTORY_COLUMNS = ["asset_type", "asset_id", "as_of", "close", "high", "low", "volume"]
+DEFAULT_MOMENTUM_HORIZONS = (5, 21, 63)
+DEFAULT_VOLATILITY_WINDOW = 21
+DEFAULT_ATR_WINDOW = 14
+DEFAULT_VOLUME_WINDOW = 21
+
+
+def rolling_feature_columns(
+    horizons: Sequence[int] = DEFAULT_MOMENTUM_HORIZONS,
+    volatility_window: int = DEFAULT_VOLATILITY_WINDOW,
+    atr_window: int = DEFAULT_ATR_WINDOW,
+    volume_window: int = DEFAULT_VOLUME_WINDOW,
+) -> List[str]:
+    return (
+        ["return_1d"]
+        + [f"momentum_{horizon}d" for horizon in horizons]
+        + [f"realized_vol_{volatility_window}d", f"atr_{atr_window}d", f"volume_zscore_{volume_window}d"]
+    )
+
+
+def prepare_history(history: pd.DataFrame) -> pd.DataFrame:
+    """Sort bars by asset and time, keeping the last observation per asset and calendar day."""
+
+    as_of = pd.to_datetime(history["as_of"])
+    panel = history.assign(as_of=as_of, bar_date=as_of.dt.normalize()).reset_index(drop=True)
+    # Sort and de-duplicate on the key columns only, then gather the rows once.
+    keys = panel[KEYS + ["as_of", "bar_date"]].sort_values(KEYS + ["as_of"], kind="stable")
+    keep = ~keys.duplicated(KEYS + ["bar_date"], keep="last").to_numpy()
+    return panel.take(keys.index.to_numpy()[keep]).reset_index(drop=True)
+
+
+def _column(panel: pd.DataFrame, name: str, default: np.ndarray) -> np.ndarray:
+    if name not in panel.columns:
+        return default
+    values = pd.to_numeric(panel[name], errors="coerce").to_numpy(dtype=float)
+    return np.where(np.isnan(values), default, values)
+
+
+def _lag(values: np.ndarray, periods: int, position: np.ndarray) -> np.ndarray:
+    lagged = np.full_like(values, np.nan)
+    if periods < len(values):
+        lagged[periods:] = values[:-periods] if periods else values
+    lagged[position < periods] = np.nan
+    return lagged
+
+
+def _rolling(values: np.ndarray, window: int, position: np.ndarray, stat: str, first_valid: int = 0) -> np.ndarray:
+    """Rolling statistic over the flat sorted array, masking windows that would span two assets."""
+
+    rolled = getattr(pd.Series(values).rolling(window, min_periods=window), stat)().to_numpy(copy=True)
+    rolled[position < first_valid + window - 1] = np.nan
+    return rolled
+
+
+def compute_rolling_features(
+    history: pd.DataFrame,
+    horizons: Sequence[int] = DEFAULT_MOMENTUM_HORIZONS,
+    volatility_window: int = DEFAULT_VOLATILITY_WINDOW,
+    atr_window: int = DEFAULT_ATR_WINDOW,
+    volume_window: int = DEFAULT_VOLUME_WINDOW,
+) -> pd.DataFrame:
+    """Add per-asset momentum, realized volatility, ATR and volume z-scores to a bar panel.
+
+    All windows run once over the flat array sorted by asset and time; the
+    position of each bar within its asset masks any window that would reach
+    into the previous asset, so no Python-level loop over assets is needed.
+    Features are NaN until an asset has enough bars for the window.
+    """
+
+    panel = prepare_history(history)
+    if panel.empty:
+        for column in rolling_feature_columns(horizons, volatility_window, atr_window, volume_window):
+            panel[column] = pd.Series(dtype=float)
+        return panel
+
+    position = panel.groupby(KEYS, sort=False, observed=True).cumcount().to_numpy()
+    close = pd.to_numeric(panel["close"], errors="coerce").to_numpy(dtype=float)
+    high = _column(panel, "high", close)
+    low = _column(panel, "low", close)
+    volume = _column(panel, "volume", np.zeros_like(close))
+
+    previous_close = _lag(close, 1, position)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        panel["return_1d"] = close / previous_close - 1
+        for horizon in horizons:
+            panel[f"momentum_{horizon}d"] = close / _lag(close, horizon, position) - 1
+        log_returns = np.log(close / previous_close)
+
+    panel[f"realized_vol_{volatility_window}d"] = _rolling(log_returns, volatility_window, position, "std", first_valid=1)
+
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+    panel[f"atr_{atr_window}d"] = _rolling(true_range, atr_window, position, "mean")
+
+    volume_mean = _rolling(volume, volume_window, position, "mean")
+    volume_std = _rolling(volume, volume_window, position, "std")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        panel[f"volume_zscore_{volume_window}d"] = np.where(volume_std > 0, (volume - volume_mean) / volume_std, 0.0)
+    panel.loc[np.isnan(volume_std), f"volume_zscore_{volume_window}d"] = np.nan
+    return panel
+
+
+def rolling_features_for(current: pd.DataFrame, history: pd.DataFrame | None = None) -> Dict[str, np.ndarray]:
+    """Rolling features for each row of ``current``, computed over ``history`` plus those rows."""
+
+    frames = [current[[column for column in HISTORY_COLUMNS if column in current.columns]].assign(_row=np.arange(len(current)))]
+    if history is not None and not history.empty:
+        frames.insert(0, history[[column for column in HISTORY_COLUMNS if column in history.columns]].assign(_row=-1))
+    panel = compute_rolling_features(pd.concat(frames, ignore_index=True))
+    panel = panel[panel["_row"] >= 0]
+    rows = panel["_row"].to_numpy()
+    aligned: Dict[str, np.ndarray] = {}
+    for column in rolling_feature_columns():
+        values = np.full(len(current), np.nan)
+        values[rows] = panel[column].to_numpy(dtype=float)
+        aligned[column] = values
+    return aligned
+
+
+__all__ = [
+    "HISTORY_COLUMNS",
+    "KEYS",
+    "compute_rolling_features",
+    "prepare_history",
+    "rolling_feature_columns",
+    "rolling_features_for",
+]
@@ -2,12 +2,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable
+from typing import Iterable
 
 import numpy as np
 import pandas as pd
 
 
+SUB_SCORES = ("valuation", "momentum", "liquidity", "risk", "diversification")
+SUB_SCORE_COLUMNS = ("valuation_score", "momentum_score", "liquidity_score_norm", "risk_score", "diversification_bonus")
+SWEEP_MAX_CELLS = 20_000_000
+RECOMMENDATION_COLUMNS = [
+    "asset_id",
+    "asset_type",
+    "composite_score",
+    "close",
+    "momentum_proxy",
+    "volatility_proxy",
+    "liquidity_score",
+]
+
+
 @dataclass
 class ScoringWeights:
     valuation: float = 0.35
@@ -16,58 +30,282 @@ class ScoringWeights:
     risk: float = 0.2
     diversification: float = 0.1
 
+    def as_vector(self) -> np.ndarray:
+        """Weights in ``SUB_SCORES`` order."""
+
+        return np.array([getattr(self, name) for name in SUB_SCORES], dtype=float)
+
 
-def _normalize(series: pd.Series) -> pd.Series:
-    if series.empty:
-        return series
-    min_val = series.min()
-    max_val = series.max()
+def _normalize(values: np.ndarray) -> np.ndarray:
+    """Min-max scale to [0, 1]; a constant column scores 1 and missing values score 0."""
+
+    if values.size == 0:
+        return values
+    finite = ~np.isnan(values)
+    if not finite.any():
+        return np.zeros_like(values)
+    min_val = values[finite].min()
+    max_val = values[finite].max()
     if min_val == max_val:
-        return pd.Series(np.ones_like(series), index=series.index)
-    return (series - min_val) / (max_val - min_val)
+        return np.ones_like(values)
+    normalized = (values - min_val) / (max_val - min_val)
+    normalized[~finite] = 0.0
+    return normalized
+
+
+def _feature(features: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in features.columns:
+        return np.zeros(len(features))
+    return pd.to_numeric(features[column], errors="coerce").to_numpy(dtype=float)
+
+
+def sub_score_matrix(features: pd.DataFrame, diversification: np.ndarray | None = None) -> np.ndarray:
+    """Normalized sub-scores as an ``(assets, len(SUB_SCORES))`` matrix.
+
+    ``diversification`` replaces the default ``1 / count(asset_type)`` term,
+    e.g. with :func:`~pit_viper.processing.covariance.correlation_diversification`.
+    """
+
+    matrix = np.empty((len(features), len(SUB_SCORES)))
+    matrix[:, 0] = _normalize(_feature(features, "valuation_proxy"))
+    matrix[:, 1] = _normalize(_feature(features, "momentum_proxy"))
+    matrix[:, 2] = _normalize(_feature(features, "liquidity_score"))
+    matrix[:, 3] = 1 - _normalize(_feature(features, "volatility_proxy"))
+    if diversification is not None:
+        matrix[:, 4] = diversification
+    elif "asset_type" in features.columns and len(features):
+        codes, _ = pd.factorize(features["asset_type"])
+        counts = np.bincount(codes[codes >= 0])
+        matrix[:, 4] = np.where(codes >= 0, 1.0 / counts[np.maximum(codes, 0)], 0.0)
+    else:
+        matrix[:, 4] = 0.0
+    return matrix
+
+
+def top_n_indices(scores: np.ndarray, top_n: int) -> np.ndarray:
+    """Positions of the ``top_n`` highest scores, best first, via partial selection.
+
+    A linear-time partition finds the cut-off score; only the rows above it are
+    sorted. Ties are broken by position, including at the cut-off.
+    """
+
+    top_n = min(max(top_n, 0), len(scores))
+    if top_n == 0:
+        return np.zeros(0, dtype=np.intp)
+    if top_n < len(scores):
+        threshold = -np.partition(-scores, top_n - 1)[top_n - 1]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[: top_n - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(len(scores))
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+def top_n_per_row(scores: np.ndarray, top_n: int) -> np.ndarray:
+    """:func:`top_n_indices` applied to every row of ``scores`` at once.
+
+    Returns a ``(rows, top_n)`` array of column positions with the same
+    ordering and tie rules as the one-dimensional version.
+    """
+
+    rows, columns = scores.shape
+    top_n = min(max(top_n, 0), columns)
+    if top_n == 0:
+        return np.zeros((rows, 0), dtype=np.intp)
+    if top_n < columns:
+        threshold = -np.partition(-scores, top_n - 1, axis=1)[:, top_n - 1 : top_n]
+        selected = scores >= threshold
+        crowded = np.flatnonzero(selected.sum(axis=1) > top_n)
+        if crowded.size:
+            above = scores[crowded] > threshold[crowded]
+            tied = selected[crowded] & ~above
+            remaining = top_n - above.sum(axis=1, keepdims=True)
+            selected[crowded] = above | (tied & (np.cumsum(tied, axis=1) <= remaining))
+        positions = np.nonzero(selected)[1].reshape(rows, top_n)
+    else:
+        positions = np.broadcast_to(np.arange(columns), (rows, columns))
+    selected_scores = np.take_along_axis(scores, positions, axis=1)
+    order = np.argsort(-selected_scores, axis=1, kind="stable")
+    return np.take_along_axis(positions, order, axis=1)
+
+
+def weight_matrix(weight_sets: Iterable[ScoringWeights] | np.ndarray | pd.DataFrame) -> np.ndarray:
+    """Stack weight sets into a ``(scenarios, len(SUB_SCORES))`` array."""
+
+    if isinstance(weight_sets, pd.DataFrame):
+        return weight_sets.reindex(columns=list(SUB_SCORES)).fillna(0.0).to_numpy(dtype=float)
+    if isinstance(weight_sets, np.ndarray):
+        matrix = np.atleast_2d(weight_sets).astype(float)
+    else:
+        matrix = np.array([weights.as_vector() for weights in weight_sets], dtype=float).reshape(-1, len(SUB_SCORES))
+    if matrix.shape[1] != len(SUB_SCORES):
+        raise ValueError(f"Weight matrix needs {len(SUB_SCORES)} columns ({', '.join(SUB_SCORES)}), got {matrix.shape[1]}")
+    return matrix
+
+
+@dataclass
+class WeightSweep:
+    """Outcome of scoring one universe under many weight sets.
 
+    ``top`` lists each scenario's leaders in long form; ``stability`` has one
+    row per asset that reached any top-N with how often and how high it
+    ranked; ``overlap`` is each scenario's Jaccard overlap with the reference
+    weights' top-N.
+    """
+
+    weights: pd.DataFrame
+    top: pd.DataFrame
+    stability: pd.DataFrame
+    overlap: np.ndarray
+
+
+def sweep_weights(
+    features: pd.DataFrame,
+    weight_sets: Iterable[ScoringWeights] | np.ndarray | pd.DataFrame,
+    top_n: int = 10,
+    reference: ScoringWeights | None = None,
+    max_cells: int = SWEEP_MAX_CELLS,
+    diversification: np.ndarray | None = None,
+) -> WeightSweep:
+    """Score ``features`` under every weight set in one pass over the shared sub-score matrix.
+
+    Composite scores for a block of scenarios come from one matrix product;
+    blocks are sized so at most ``max_cells`` composite values are held at a
+    time, which keeps large universes times large sweeps within memory.
+    """
+
+    weights = weight_matrix(weight_sets)
+    scenarios = len(weights)
+    weights_frame = pd.DataFrame(weights, columns=list(SUB_SCORES))
+    weights_frame.index.name = "scenario"
+    top_n = min(max(top_n, 0), len(features))
+
+    matrix = sub_score_matrix(features, diversification)
+    positions = np.zeros((scenarios, top_n), dtype=np.intp)
+    leaders = np.zeros((scenarios, top_n))
+    block = max(1, max_cells // max(len(features), 1))
+    for start in range(0, scenarios, block):
+        composite = weights[start : start + block] @ matrix.T
+        chosen = top_n_per_row(composite, top_n)
+        positions[start : start + block] = chosen
+        leaders[start : start + block] = np.take_along_axis(composite, chosen, axis=1)
+
+    reference_top = top_n_indices(matrix @ (reference or ScoringWeights()).as_vector(), top_n)
+    overlap = np.zeros(scenarios)
+    if top_n:
+        in_reference = np.zeros(len(features), dtype=bool)
+        in_reference[reference_top] = True
+        shared = in_reference[positions].sum(axis=1)
+        overlap = shared / (2 * top_n - shared)
+
+    asset_ids = features["asset_id"].to_numpy() if "asset_id" in features.columns else np.arange(len(features))
+    ranks = np.broadcast_to(np.arange(1, top_n + 1), positions.shape)
+    top = pd.DataFrame(
+        {
+            "scenario": np.repeat(np.arange(scenarios), top_n),
+            "rank": ranks.ravel(),
+            "asset_id": asset_ids[positions.ravel()],
+            "composite_score": leaders.ravel(),
+        }
+    )
+
+    flat = positions.ravel()
+    appearances = np.bincount(flat, minlength=len(features))
+    rank_sum = np.bincount(flat, weights=ranks.ravel(), minlength=len(features))
+    rank_sq_sum = np.bincount(flat, weights=ranks.ravel() ** 2, minlength=len(features))
+    best_rank = np.full(len(features), top_n + 1)
+    np.minimum.at(best_rank, flat, ranks.ravel())
+    reached = np.flatnonzero(appearances)
+    mean_rank = rank_sum[reached] / appearances[reached]
+    stability = pd.DataFrame(
+        {
+            "asset_id": asset_ids[reached],
+            "appearances": appearances[reached],
+            "frequency": appearances[reached] / max(scenarios, 1),
+            "mean_rank": mean_rank,
+            "rank_std": np.sqrt(np.maximum(rank_sq_sum[reached] / appearances[reached] - mean_rank**2, 0.0)),
+            "best_rank": best_rank[reached],
+        }
+    )
+    if "asset_type" in features.columns:
+        stability.insert(1, "asset_type", features["asset_type"].to_numpy()[reached])
+    stability.sort_values(["appearances", "mean_rank"], ascending=[False, True], inplace=True, kind="stable")
+    stability.reset_index(drop=True, inplace=True)
+    return WeightSweep(weights=weights_frame, top=top, stability=stability, overlap=overlap)
+
+
+def score_assets(
+    features: pd.DataFrame, weights: ScoringWeights | None = None, diversification: np.ndarray | None = None
+) -> pd.DataFrame:
+    """Score every asset and return the full frame sorted by ``composite_score``.
+
+    Prefer :func:`rank_assets` when only the leading rows are needed.
+    """
 
-def score_assets(features: pd.DataFrame, weights: ScoringWeights | None = None) -> pd.DataFrame:
     if features.empty:
         return pd.DataFrame(columns=["asset_id", "score"])
 
     weights = weights or ScoringWeights()
-    scored = features.copy()
-    scored["valuation_score"] = _normalize(features.get("valuation_proxy", 0)).fillna(0)
-    scored["momentum_score"] = _normalize(features.get("momentum_proxy", 0)).fillna(0)
-    scored["liquidity_score_norm"] = _normalize(features.get("liquidity_score", 0)).fillna(0)
-    scored["risk_score"] = 1 - _normalize(features.get("volatility_proxy", 0)).fillna(0)
-
-    diversification_bonus = (
-        scored.groupby("asset_type")["asset_id"].transform("count").rpow(-1).fillna(0)
-    )
+    matrix = sub_score_matrix(features, diversification)
+    composite = matrix @ weights.as_vector()
+    order = top_n_indices(composite, len(composite))
 
-    scored["composite_score"] = (
-        scored["valuation_score"] * weights.valuation
-        + scored["momentum_score"] * weights.momentum
-        + scored["liquidity_score_norm"] * weights.liquidity
-        + scored["risk_score"] * weights.risk
-        + diversification_bonus * weights.diversification
-    )
-    scored.sort_values("composite_score", ascending=False, inplace=True)
-    scored.reset_index(drop=True, inplace=True)
+    scored = features.take(order).reset_index(drop=True)
+    for position, column in enumerate(SUB_SCORE_COLUMNS[:-1]):
+        scored[column] = matrix[order, position]
+    scored["composite_score"] = composite[order]
     return scored
 
 
+def rank_assets(
+    features: pd.DataFrame,
+    weights: ScoringWeights | None = None,
+    top_n: int = 10,
+    columns: Iterable[str] = RECOMMENDATION_COLUMNS,
+    diversification: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """Top ``top_n`` assets by composite score without sorting or copying the full universe.
+
+    Sub-scores are computed as one matrix and combined with a single
+    matrix-vector product; only the selected rows are materialised, so the
+    result matches ``summarize_recommendations(score_assets(features), top_n)``.
+    """
+
+    columns = list(columns)
+    if features.empty:
+        return pd.DataFrame(columns=columns)
+
+    weights = weights or ScoringWeights()
+    composite = sub_score_matrix(features, diversification) @ weights.as_vector()
+    selected = top_n_indices(composite, top_n)
+
+    source_columns = [column for column in columns if column in features.columns and column != "composite_score"]
+    ranked = features[source_columns].take(selected).reset_index(drop=True)
+    if "composite_score" in columns:
+        ranked["composite_score"] = composite[selected]
+    return ranked[[column for column in columns if column in ranked.columns]]
+
+
 def summarize_recommendations(scored: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
     if scored.empty:
         return scored
-    columns = [
-        "asset_id",
-        "asset_type",
-        "composite_score",
-        "close",
-        "momentum_proxy",
-        "volatility_proxy",
-        "liquidity_score",
-    ]
-    available_columns = [col for col in columns if col in scored.columns]
+    available_columns = [col for col in RECOMMENDATION_COLUMNS if col in scored.columns]
     return scored.loc[: top_n - 1, available_columns].copy()
 
 
-__all__ = ["ScoringWeights", "score_assets", "summarize_recommendations"]
+__all__ = [
+    "RECOMMENDATION_COLUMNS",
+    "SUB_SCORES",
+    "ScoringWeights",
+    "WeightSweep",
+    "rank_assets",
+    "score_assets",
+    "sub_score_matrix",
+    "summarize_recommendations",
+    "sweep_weights",
+    "top_n_per_row",
+    "top_n_indices",
+    "weight_matrix",
+]
@@ -0,0 +1,220 @@
+"""Vectorized VADER-compatible lexicon scorer for very large text batches.
+
+``LexiconScorer`` tokenizes a whole batch at once, resolves every distinct token
+against the VADER lexicon through a single hashed index lookup, and applies the
+main VADER rules as array operations over the flattened token stream:
+
+* lexicon valence, with ``no`` handled as a negator of the next lexicon word;
+* ALL CAPS emphasis when only some words in the text are capitalised;
+* booster/dampener words up to three tokens back (scaled 1.0, 0.95, 0.9);
+* negation up to three tokens back, including ``never so``/``never this`` and
+  ``without doubt``, plus the ``least`` rule;
+* the contrastive ``but`` (x0.5 before, x1.5 after the first ``but``);
+* ``!``/``?`` punctuation emphasis and the ``alpha=15`` normalisation.
+
+Not reproduced: emoji-to-text conversion, the multi-word idiom table
+(``SPECIAL_CASES`` such as "the shit" or "bad ass") and the n-gram boosters
+("kind of", "sort of"). The reference ``but`` rule also locates each word
+to rescale with ``list.index`` on its valence, so when a halved valence
+collides with a later one it rescales the wrong word; this scorer applies the
+intended per-position rule instead. On text without those constructs the
+compound score matches
+``SentimentIntensityAnalyzer.polarity_scores()["compound"]`` to within
+``PARITY_TOLERANCE``; see ``tests/test_sentiment_parity.py``.
+"""
+from __future__ import annotations
+
+import string
+import threading
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .scoring import vader_analyzer
+
+PARITY_TOLERANCE = 1e-4
+ALPHA = 15.0
+N_SCALAR = -0.74
+C_INCR = 0.733
+BOOSTER_DAMPING = (1.0, 0.95, 0.9)
+
+
+class LexiconScorer:
+    """Batch scorer returning VADER-style compound scores as a NumPy array."""
+
+    def __init__(self, lexicon: Optional[Mapping[str, float]] = None) -> None:
+        from vaderSentiment import vaderSentiment as vader
+
+        if lexicon is None:
+            lexicon = vader_analyzer().lexicon
+        self._negate = frozenset(vader.NEGATE)
+        self._boosters = {word: value for word, value in vader.BOOSTER_DICT.items() if " " not in word}
+        self._lexicon_index = pd.Index(list(lexicon.keys()))
+        self._lexicon_values = np.fromiter(lexicon.values(), dtype=float, count=len(lexicon))
+
+    def __call__(self, text: str) -> float:
+        return float(self.score_batch([text])[0])
+
+    def _tokens(self, texts: Sequence[str]) -> pd.DataFrame:
+        raw = pd.Series(list(texts), dtype=object).fillna("").astype(str).str.split().explode()
+        raw = raw.dropna()
+        stripped = raw.str.strip(string.punctuation)
+        tokens = raw.where(stripped.str.len() <= 2, stripped)
+        frame = pd.DataFrame({"doc": raw.index.to_numpy(), "token": tokens.to_numpy()})
+        frame["position"] = frame.groupby("doc", sort=False).cumcount().to_numpy()
+        return frame
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        compound = np.zeros(len(texts))
+        if not texts:
+            return compound
+        frame = self._tokens(texts)
+        if frame.empty:
+            return compound
+
+        doc = frame["doc"].to_numpy()
+        position = frame["position"].to_numpy()
+        token = frame["token"].to_numpy(dtype=object)
+        upper = frame["token"].str.isupper().to_numpy(dtype=bool)
+        codes, vocabulary = pd.factorize(frame["token"].str.lower())
+        vocabulary = pd.Index(vocabulary)
+
+        lexicon_slot = self._lexicon_index.get_indexer(vocabulary)
+        vocab_in_lexicon = lexicon_slot >= 0
+        vocab_valence = np.where(vocab_in_lexicon, self._lexicon_values[lexicon_slot], 0.0)
+        vocab_booster = np.array([self._boosters.get(word, 0.0) for word in vocabulary], dtype=float)
+        vocab_is_booster = np.array([word in self._boosters for word in vocabulary], dtype=bool)
+        vocab_negated = np.array([word in self._negate or "n't" in word for word in vocabulary], dtype=bool)
+
+        def _vocab_flag(*words: str) -> np.ndarray:
+            return vocabulary.isin(words)
+
+        flags = {
+            "no": _vocab_flag("no"),
+            "kind": _vocab_flag("kind"),
+            "of": _vocab_flag("of"),
+            "or_nor": _vocab_flag("or", "nor"),
+            "never": _vocab_flag("never"),
+            "so_this": _vocab_flag("so", "this"),
+            "without": _vocab_flag("without"),
+            "doubt": _vocab_flag("doubt"),
+            "least": _vocab_flag("least"),
+            "at_very": _vocab_flag("at", "very"),
+            "but": _vocab_flag("but"),
+        }
+
+        n_tokens = len(codes)
+        doc_length = np.bincount(doc, minlength=len(texts))[doc]
+
+        def _shift(values: np.ndarray, offset: int, fill) -> np.ndarray:
+            """Value of the token ``offset`` places away within the same text (negative = earlier)."""
+
+            shifted = np.full(n_tokens, fill, dtype=values.dtype)
+            if offset < 0:
+                shifted[-offset:] = values[:offset]
+                shifted[position < -offset] = fill
+            else:
+                shifted[: n_tokens - offset] = values[offset:]
+                shifted[position + offset >= doc_length] = fill
+            return shifted
+
+        def _token_flag(name: str, offset: int = 0) -> np.ndarray:
+            values = flags[name][codes]
+            return values if offset == 0 else _shift(values, offset, False)
+
+        in_lexicon = vocab_in_lexicon[codes]
+        is_booster = vocab_is_booster[codes]
+        negated = vocab_negated[codes]
+        booster = vocab_booster[codes]
+
+        upper_count = np.bincount(doc, weights=upper, minlength=len(texts))
+        word_count = np.bincount(doc, minlength=len(texts))
+        cap_differential = word_count - upper_count
+        cap_diff_doc = (cap_differential > 0) & (cap_differential < word_count)
+        cap_diff = cap_diff_doc[doc]
+
+        scored = in_lexicon & ~is_booster & ~(_token_flag("kind") & _token_flag("of", 1))
+        valence = np.where(scored, vocab_valence[codes], 0.0)
+        lexicon_valence = valence.copy()
+
+        next_in_lexicon = _shift(in_lexicon, 1, False)
+        valence = np.where(scored & _token_flag("no") & next_in_lexicon, 0.0, valence)
+        no_before = _token_flag("no", -1) | _token_flag("no", -2) | (_token_flag("no", -3) & _token_flag("or_nor", -1))
+        valence = np.where(scored & no_before, lexicon_valence * N_SCALAR, valence)
+
+        emphasis = scored & upper & cap_diff
+        valence = np.where(emphasis, valence + np.where(valence > 0, C_INCR, -C_INCR), valence)
+
+        prev_so_this = _token_flag("so_this", -1)
+        for step, damping in enumerate(BOOSTER_DAMPING):
+            offset = -(step + 1)
+            prior_exists = scored & (position > step)
+            prior_not_lexicon = prior_exists & ~_shift(in_lexicon, offset, False)
+            prior_booster = _shift(booster, offset, 0.0)
+            prior_upper = _shift(upper, offset, False)
+            scalar = np.where(valence < 0, -prior_booster, prior_booster)
+            scalar = np.where(
+                (prior_booster != 0) & prior_upper & cap_diff,
+                scalar + np.where(valence > 0, C_INCR, -C_INCR),
+                scalar,
+            )
+            valence = np.where(prior_not_lexicon, valence + scalar * damping, valence)
+
+            prior_negated = _shift(negated, offset, False)
+            if step == 0:
+                negate = prior_not_lexicon & prior_negated
+                boost = np.zeros(n_tokens, dtype=bool)
+            elif step == 1:
+                boost = prior_not_lexicon & _token_flag("never", -2) & prev_so_this
+                keep = prior_not_lexicon & _token_flag("without", -2) & _token_flag("doubt", -1)
+                negate = prior_not_lexicon & ~boost & ~keep & prior_negated
+            else:
+                boost = prior_not_lexicon & (
+                    (_token_flag("never", -3) & _token_flag("so_this", -2)) | prev_so_this
+                )
+                keep = prior_not_lexicon & _token_flag("without", -3) & (_token_flag("doubt", -2) | _token_flag("doubt", -1))
+                negate = prior_not_lexicon & ~boost & ~keep & prior_negated
+            valence = np.where(boost, valence * 1.25, valence)
+            valence = np.where(negate, valence * N_SCALAR, valence)
+
+        prev_least = _token_flag("least", -1) & ~_shift(in_lexicon, -1, False)
+        least_negates = scored & prev_least & ((position == 1) | ((position > 1) & ~_token_flag("at_very", -2)))
+        valence = np.where(least_negates, valence * N_SCALAR, valence)
+
+        is_but = _token_flag("but")
+        first_but = np.full(len(texts), np.iinfo(np.int64).max)
+        np.minimum.at(first_but, doc[is_but], position[is_but])
+        but_position = first_but[doc]
+        has_but = but_position != np.iinfo(np.int64).max
+        valence = np.where(has_but & (position < but_position), valence * 0.5, valence)
+        valence = np.where(has_but & (position > but_position), valence * 1.5, valence)
+
+        totals = np.bincount(doc, weights=valence, minlength=len(texts))
+        text_series = pd.Series(texts, dtype=object).fillna("").astype(str)
+        exclamations = np.minimum(text_series.str.count("!").to_numpy(), 4) * 0.292
+        questions = text_series.str.count(r"\?").to_numpy()
+        question_amp = np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0.0))
+        amplifier = exclamations + question_amp
+        totals = totals + np.sign(totals) * amplifier
+
+        compound = np.clip(totals / np.sqrt(totals * totals + ALPHA), -1.0, 1.0)
+        return np.round(compound, 4)
+
+
+_SHARED: Optional[LexiconScorer] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def lexicon_scorer() -> LexiconScorer:
+    """Return a process-wide scorer, building the lookup tables on first use."""
+
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = LexiconScorer()
+        return _SHARED
+
+
+__all__ = ["LexiconScorer", "PARITY_TOLERANCE", "lexicon_scorer"]
@@ -5,9 +5,9 @@ from dataclasses import dataclass
 from typing import Iterable
 
 import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from ..utils.config import AppConfig
+from .scoring import Scorer, SentimentCache, resolve_workers, score_texts, scorer_for, sentiment_cache_for, vader_compound
 
 
 @dataclass
@@ -30,9 +30,6 @@ _DEFAULT_HEADLINES = [
 ]
 
 
-_ANALYZER = SentimentIntensityAnalyzer()
-
-
 def _call_newsapi(api_key: str | None, tickers: Iterable[str]) -> pd.DataFrame:
     if not api_key:
         raise ValueError("NewsAPI key missing")
@@ -67,16 +64,14 @@ def _fallback_articles() -> pd.DataFrame:
     return pd.DataFrame(_DEFAULT_HEADLINES)
 
 
-def _score_articles(articles: pd.DataFrame) -> pd.DataFrame:
+def _score_articles(
+    articles: pd.DataFrame, cache: SentimentCache | None = None, workers: int = 1, scorer: Scorer = vader_compound
+) -> pd.DataFrame:
     if articles.empty:
         return articles
-    sentiments = []
-    for _, row in articles.iterrows():
-        text = str(row.get("title", ""))
-        score = _ANALYZER.polarity_scores(text)["compound"]
-        sentiments.append(score)
+    titles = articles["title"].fillna("").astype(str).tolist() if "title" in articles.columns else [""] * len(articles)
     scored = articles.copy()
-    scored["sentiment"] = sentiments
+    scored["sentiment"] = score_texts(titles, scorer, cache, workers)
     return scored
 
 
@@ -91,8 +86,11 @@ def collect_news_sentiment(config: AppConfig, tickers: Iterable[str]) -> NewsSen
         articles = fallback
         used_fallback = True
 
+    cache = sentiment_cache_for(config)
     try:
-        scored = _score_articles(articles)
+        scorer = scorer_for(config, vader_compound)
+        scored = _score_articles(articles, cache, resolve_workers(config.sentiment.workers), scorer)
+        cache.save()
     except Exception:
         scored = articles.copy()
         scored["sentiment"] = scored.get("sentiment", 0.0)
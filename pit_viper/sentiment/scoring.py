@@ -0,0 +1,230 @@
+"""Batched, memoized sentiment scoring shared by the news and social collectors."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from ..utils.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 100_000
+CACHE_FILENAME = "sentiment_cache.parquet"
+ENGINES = ("vader", "lexicon")
+PARALLEL_THRESHOLD = 2_000
+CHUNKS_PER_WORKER = 4
+
+Scorer = Callable[[str], float]
+
+if TYPE_CHECKING:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+_ANALYZER: Optional["SentimentIntensityAnalyzer"] = None
+_ANALYZER_LOCK = threading.Lock()
+
+
+def vader_analyzer() -> "SentimentIntensityAnalyzer":
+    """Return the process-wide VADER analyzer, loading its lexicon on first use."""
+
+    global _ANALYZER
+    with _ANALYZER_LOCK:
+        if _ANALYZER is None:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+            _ANALYZER = SentimentIntensityAnalyzer()
+        return _ANALYZER
+
+
+def vader_compound(text: str) -> float:
+    """Reference VADER compound score; module-level so it pickles for the process pool."""
+
+    return vader_analyzer().polarity_scores(text)["compound"]
+
+
+def text_key(text: str) -> str:
+    """Stable digest used as the cache key so raw post text is never persisted."""
+
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SentimentCache:
+    """Bounded LRU map of text digest to compound score, optionally backed by Parquet."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, path: Optional[Path] = None) -> None:
+        self.maxsize = maxsize
+        self.path = Path(path) if path is not None else None
+        self._scores: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            stored = pd.read_parquet(self.path)
+            self._scores.update(zip(stored["key"], stored["score"].astype(float)))
+            self._trim()
+
+    def _trim(self) -> None:
+        while len(self._scores) > self.maxsize:
+            self._scores.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, float]:
+        found: Dict[str, float] = {}
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                    found[key] = score
+        return found
+
+    def put_many(self, scores: Dict[str, float]) -> None:
+        with self._lock:
+            for key, score in scores.items():
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            self._trim()
+
+    def save(self) -> Optional[Path]:
+        if self.path is None:
+            return None
+        with self._lock:
+            frame = pd.DataFrame({"key": list(self._scores.keys()), "score": list(self._scores.values())})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+def _score_chunk(scorer: Scorer, chunk: Sequence[str]) -> List[float]:
+    return [float(scorer(text)) for text in chunk]
+
+
+def score_texts_parallel(texts: Sequence[str], scorer: Scorer, workers: int) -> List[float]:
+    """Score texts across a process pool, returning results in input order.
+
+    ``scorer`` must be a module-level function so it pickles by reference; each
+    worker then imports its module once and keeps its own analyzer for every
+    chunk it receives. Workers are spawned rather than forked because the
+    pipeline has background threads running when sentiment is scored.
+    """
+
+    texts = list(texts)
+    if not texts:
+        return []
+    workers = max(1, workers)
+    chunk_size = max(1, -(-len(texts) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [texts[start : start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as executor:
+        results = executor.map(_score_chunk, [scorer] * len(chunks), chunks)
+        return [score for chunk_scores in results for score in chunk_scores]
+
+
+def _picklable(scorer: Scorer) -> bool:
+    try:
+        pickle.dumps(scorer)
+    except Exception:  # noqa: BLE001 - lambdas and closures cannot cross process boundaries
+        return False
+    return True
+
+
+def score_texts(
+    texts: Sequence[str],
+    scorer: Scorer,
+    cache: SentimentCache | None = None,
+    workers: int = 1,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+) -> List[float]:
+    """Score a batch of texts, running ``scorer`` once per distinct text not already cached.
+
+    Results are returned in input order; duplicates share one computation. A
+    scorer exposing ``score_batch`` receives all misses in one call. Otherwise,
+    when ``workers`` > 1 and at least ``parallel_threshold`` texts miss the
+    cache, the misses are scored on a process pool.
+    """
+
+    keys = [text_key(text) for text in texts]
+    unique: Dict[str, str] = dict(zip(keys, texts))
+    scores = cache.get_many(list(unique)) if cache is not None else {}
+    pending = {key: text for key, text in unique.items() if key not in scores}
+    score_batch = getattr(scorer, "score_batch", None)
+    if score_batch is not None:
+        computed = dict(zip(pending, (float(score) for score in score_batch(list(pending.values())))))
+    elif workers > 1 and len(pending) >= parallel_threshold and _picklable(scorer):
+        computed = dict(zip(pending, score_texts_parallel(list(pending.values()), scorer, workers)))
+    else:
+        if workers > 1 and len(pending) >= parallel_threshold:
+            logger.warning("Scorer %r cannot be sent to worker processes; scoring serially", scorer)
+        computed = {key: float(scorer(text)) for key, text in pending.items()}
+    if cache is not None and computed:
+        cache.put_many(computed)
+    scores.update(computed)
+    return [scores[key] for key in keys]
+
+
+_CACHES: Dict[Optional[Path], SentimentCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def sentiment_cache_for(config: AppConfig) -> SentimentCache:
+    """Return the process-wide score cache, persisted under the state directory when enabled.
+
+    Each engine keeps its own file so switching engines never serves scores
+    computed by the other one.
+    """
+
+    path = None
+    if config.sentiment.persist_cache:
+        filename = CACHE_FILENAME
+        if config.sentiment.engine != "vader":
+            filename = f"sentiment_cache_{config.sentiment.engine}.parquet"
+        path = (config.storage.data_dir / config.storage.state_subdir / filename).resolve()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            cache = _CACHES[path] = SentimentCache(config.sentiment.cache_size, path)
+        return cache
+
+
+def scorer_for(config: AppConfig, vader_scorer: Scorer) -> Scorer:
+    """Pick the configured scoring engine, falling back to ``vader_scorer``."""
+
+    engine = config.sentiment.engine
+    if engine == "lexicon":
+        from .lexicon import lexicon_scorer
+
+        return lexicon_scorer()
+    if engine != "vader":
+        logger.warning("Unknown sentiment engine %r; using vader", engine)
+    return vader_scorer
+
+
+def resolve_workers(workers: int) -> int:
+    """Interpret a configured worker count, where ``0`` means one per CPU."""
+
+    return (os.cpu_count() or 1) if workers <= 0 else workers
+
+
+__all__ = [
+    "ENGINES",
+    "SentimentCache",
+    "resolve_workers",
+    "score_texts",
+    "score_texts_parallel",
+    "scorer_for",
+    "sentiment_cache_for",
+    "text_key",
+    "vader_analyzer",
+    "vader_compound",
+]
@@ -5,9 +5,9 @@ from dataclasses import dataclass
 from typing import Dict, Iterable, List
 
 import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from ..utils.config import AppConfig
+from .scoring import Scorer, SentimentCache, resolve_workers, score_texts, scorer_for, sentiment_cache_for, vader_compound
 
 
 @dataclass
@@ -16,9 +16,6 @@ class SocialSentiment:
     aggregated: pd.DataFrame
 
 
-_ANALYZER = SentimentIntensityAnalyzer()
-
-
 def _mock_posts() -> pd.DataFrame:
     return pd.DataFrame(
         [
@@ -29,24 +26,25 @@ def _mock_posts() -> pd.DataFrame:
     )
 
 
-def _score_posts(posts: pd.DataFrame) -> pd.DataFrame:
+def _score_posts(
+    posts: pd.DataFrame, cache: SentimentCache | None = None, workers: int = 1, scorer: Scorer = vader_compound
+) -> pd.DataFrame:
     if posts.empty:
         return posts
-    scores = []
-    for _, row in posts.iterrows():
-        text = str(row.get("text", ""))
-        score = _ANALYZER.polarity_scores(text)["compound"]
-        scores.append(score)
+    texts = posts["text"].fillna("").astype(str).tolist() if "text" in posts.columns else [""] * len(posts)
     scored = posts.copy()
-    scored["sentiment"] = scores
+    scored["sentiment"] = score_texts(texts, scorer, cache, workers)
     return scored
 
 
 def collect_social_sentiment(config: AppConfig, tickers: Iterable[str]) -> SocialSentiment:
     # Placeholder: in production use praw/tweepy/StockTwits API
     posts = _mock_posts()
+    cache = sentiment_cache_for(config)
     try:
-        scored = _score_posts(posts)
+        scorer = scorer_for(config, vader_compound)
+        scored = _score_posts(posts, cache, resolve_workers(config.sentiment.workers), scorer)
+        cache.save()
     except Exception:
         scored = posts
     aggregated = (
@@ -0,0 +1,112 @@
+"""Roll daily artifacts into monthly files and enforce per-category retention."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from .storage import DataStore, artifact_span
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLUMN = "snapshot_date"
+SORT_COLUMNS = ("asset_type", "asset_id", "ticker", "source", "as_of")
+
+
+@dataclass
+class CompactionReport:
+    compacted: Dict[str, List[str]] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"compacted": self.compacted, "removed": self.removed}
+
+
+def _sorted(frame: pd.DataFrame) -> pd.DataFrame:
+    keys = [SNAPSHOT_COLUMN] + [column for column in SORT_COLUMNS if column in frame.columns]
+    return frame.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+def compact_category(
+    store: DataStore, category: str, retention_days: int = 0, today: pd.Timestamp | None = None
+) -> CompactionReport:
+    """Merge complete months of daily Parquet files and drop artifacts past retention.
+
+    Daily ``<prefix>YYYY-MM-DD.parquet`` files from months before the current
+    one are concatenated (with a ``snapshot_date`` column recording the file
+    they came from), sorted by snapshot date and asset keys, and written as
+    ``<prefix>YYYY-MM.parquet`` before the dailies are removed. A late daily
+    for an already compacted month is merged into that month's file. With a
+    positive ``retention_days`` any artifact whose last day is older than
+    the cutoff is deleted, JSON included.
+    """
+
+    today = pd.Timestamp(today if today is not None else pd.Timestamp.now()).normalize()
+    month_start = today.replace(day=1)
+    report = CompactionReport()
+    manifest = store.reconcile_manifest(category)
+    target_dir = store.root / category
+
+    groups: Dict[Tuple[str, str], List[Tuple[str, pd.Timestamp]]] = {}
+    for name in manifest:
+        span = artifact_span(name)
+        if span is None or not name.endswith(".parquet") or span[1] != span[2] or span[1] >= month_start:
+            continue
+        groups.setdefault((span[0], span[1].strftime("%Y-%m")), []).append((name, span[1]))
+
+    for (prefix, month), dailies in sorted(groups.items()):
+        monthly = f"{prefix}{month}"
+        frames = []
+        merged_days = {day for _, day in dailies}
+        if f"{monthly}.parquet" in manifest:
+            existing = pd.read_parquet(target_dir / f"{monthly}.parquet")
+            frames.append(existing[~pd.to_datetime(existing[SNAPSHOT_COLUMN]).isin(merged_days)])
+        for name, day in sorted(dailies, key=lambda item: item[1]):
+            frames.append(pd.read_parquet(target_dir / name).assign(**{SNAPSHOT_COLUMN: day}))
+        store.write_frame(_sorted(pd.concat(frames, ignore_index=True)), category, monthly)
+        names = [name for name, _ in dailies]
+        for name in names:
+            (target_dir / name).unlink(missing_ok=True)
+        store.update_manifest(category, removed=names)
+        report.compacted[f"{monthly}.parquet"] = sorted(names)
+
+    if retention_days > 0:
+        cutoff = today - pd.Timedelta(days=retention_days)
+        expired = [
+            name for name, entry in store.manifest(category).items() if entry.get("end") and pd.Timestamp(entry["end"]) < cutoff
+        ]
+        for name in expired:
+            (target_dir / name).unlink(missing_ok=True)
+        store.update_manifest(category, removed=expired)
+        report.removed.extend(sorted(expired))
+
+    logger.info(
+        "Compacted %s: %d monthly files written, %d artifacts past retention removed",
+        category,
+        len(report.compacted),
+        len(report.removed),
+    )
+    return report
+
+
+def prune_history(store: DataStore, category: str, retention_days: int, today: pd.Timestamp | None = None) -> List[str]:
+    """Delete history date partitions older than ``retention_days``; returns the removed partition paths."""
+
+    if retention_days <= 0:
+        return []
+    today = pd.Timestamp(today if today is not None else pd.Timestamp.now()).normalize()
+    cutoff = today - pd.Timedelta(days=retention_days)
+    base = store.history_path(category)
+    removed = []
+    for partition in sorted(base.glob("asset_type=*/date=*")):
+        if pd.Timestamp(partition.name.split("=", 1)[1]) < cutoff:
+            for path in partition.iterdir():
+                path.unlink()
+            partition.rmdir()
+            removed.append(partition.relative_to(base).as_posix())
+    return removed
+
+
+__all__ = ["CompactionReport", "SNAPSHOT_COLUMN", "compact_category", "prune_history"]
@@ -6,7 +6,10 @@ import os
 from dataclasses import dataclass, field
 from datetime import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from .schema import StorageSchema
 
 
 def _load_json_env(var_name: str) -> Dict[str, str]:
@@ -52,6 +55,38 @@ class StorageConfig:
     processed_subdir: str = field(default="processed")
     sentiment_subdir: str = field(default="sentiment")
     advice_subdir: str = field(default="advice")
+    reference_subdir: str = field(default="reference")
+    state_subdir: str = field(default="state")
+    # Days of artifacts kept per category by the compaction job; 0 keeps everything.
+    raw_retention_days: int = field(default=int(os.getenv("PIT_VIPER_RAW_RETENTION_DAYS", "0")))
+    processed_retention_days: int = field(default=int(os.getenv("PIT_VIPER_PROCESSED_RETENTION_DAYS", "0")))
+    sentiment_retention_days: int = field(default=int(os.getenv("PIT_VIPER_SENTIMENT_RETENTION_DAYS", "0")))
+    advice_retention_days: int = field(default=int(os.getenv("PIT_VIPER_ADVICE_RETENTION_DAYS", "0")))
+    history_retention_days: int = field(default=int(os.getenv("PIT_VIPER_HISTORY_RETENTION_DAYS", "0")))
+
+    def retention(self) -> Dict[str, int]:
+        """Retention in days for each compacted category, keyed by subdirectory."""
+
+        return {
+            self.raw_subdir: self.raw_retention_days,
+            self.processed_subdir: self.processed_retention_days,
+            self.sentiment_subdir: self.sentiment_retention_days,
+            self.advice_subdir: self.advice_retention_days,
+        }
+
+    def schemas(self) -> Dict[str, "StorageSchema"]:
+        """Storage schemas keyed by the configured subdirectory names, for :class:`DataStore`."""
+
+        from .schema import DEFAULT_SCHEMAS
+
+        schemas = dict(DEFAULT_SCHEMAS)
+        for default, subdir in (
+            ("raw", self.raw_subdir),
+            ("processed", self.processed_subdir),
+            ("sentiment", self.sentiment_subdir),
+        ):
+            schemas[subdir] = DEFAULT_SCHEMAS[default]
+        return schemas
 
     def path_for(self, category: str) -> Path:
         target = self.data_dir / category
@@ -67,6 +102,47 @@ class NotificationConfig:
     slack_webhook: Optional[str] = field(default=os.getenv("PIT_VIPER_SLACK_WEBHOOK"))
 
 
+@dataclass
+class IngestionConfig:
+    """Controls how the asset-class connectors are scheduled."""
+
+    max_workers: int = field(default=int(os.getenv("PIT_VIPER_INGEST_WORKERS", "5")))
+    fetch_timeout: float = field(default=float(os.getenv("PIT_VIPER_INGEST_TIMEOUT", "120")))
+    http_concurrency: int = field(default=int(os.getenv("PIT_VIPER_HTTP_CONCURRENCY", "16")))
+    yahoo_chunk_size: int = field(default=int(os.getenv("PIT_VIPER_YAHOO_CHUNK_SIZE", "100")))
+    quote_max_age: float = field(default=float(os.getenv("PIT_VIPER_QUOTE_MAX_AGE", "900")))
+
+
+@dataclass
+class FeatureConfig:
+    """Controls how rolling features and the return covariance are maintained between runs."""
+
+    incremental: bool = field(default=os.getenv("PIT_VIPER_INCREMENTAL_FEATURES", "1") not in ("0", "false", "no"))
+    correlation_diversification: bool = field(
+        default=os.getenv("PIT_VIPER_CORRELATION_DIVERSIFICATION", "1") not in ("0", "false", "no")
+    )
+    covariance_shrinkage: float = field(default=float(os.getenv("PIT_VIPER_COVARIANCE_SHRINKAGE", "0.2")))
+    covariance_min_periods: int = field(default=int(os.getenv("PIT_VIPER_COVARIANCE_MIN_PERIODS", "20")))
+
+
+@dataclass
+class PortfolioConfig:
+    """Where holdings exports are read from."""
+
+    holdings_path: Optional[str] = field(default=os.getenv("PIT_VIPER_HOLDINGS_PATH"))
+    holdings_cache_subdir: str = field(default="holdings_cache")
+
+
+@dataclass
+class SentimentConfig:
+    """Controls text scoring for the news and social collectors."""
+
+    cache_size: int = field(default=int(os.getenv("PIT_VIPER_SENTIMENT_CACHE_SIZE", "100000")))
+    persist_cache: bool = field(default=os.getenv("PIT_VIPER_SENTIMENT_CACHE_PERSIST", "1") not in ("0", "false", "no"))
+    workers: int = field(default=int(os.getenv("PIT_VIPER_SENTIMENT_WORKERS", "1")))
+    engine: str = field(default=os.getenv("PIT_VIPER_SENTIMENT_ENGINE", "vader").lower())
+
+
 @dataclass
 class AppConfig:
     """Top-level application configuration."""
@@ -76,6 +152,10 @@ class AppConfig:
     storage: StorageConfig
     notification: NotificationConfig
     sentiment_sources: Dict[str, Dict[str, str]]
+    ingestion: IngestionConfig = field(default_factory=IngestionConfig)
+    features: FeatureConfig = field(default_factory=FeatureConfig)
+    sentiment: SentimentConfig = field(default_factory=SentimentConfig)
+    portfolio: PortfolioConfig = field(default_factory=PortfolioConfig)
 
 
 def load_config() -> AppConfig:
@@ -104,7 +184,11 @@ def load_config() -> AppConfig:
         storage=StorageConfig(data_dir=data_dir),
         notification=NotificationConfig(),
         sentiment_sources=sentiment_sources,
+        ingestion=IngestionConfig(),
+        features=FeatureConfig(),
+        sentiment=SentimentConfig(),
+        portfolio=PortfolioConfig(),
     )
 
 
-__all__ = ["AppConfig", "ApiCredentials", "load_config"]
+__all__ = ["AppConfig", "ApiCredentials", "FeatureConfig", "IngestionConfig", "PortfolioConfig", "SentimentConfig", "load_config"]
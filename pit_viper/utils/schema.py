@@ -0,0 +1,84 @@
+"""Per-category Parquet layout: compact column dtypes and writer settings."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class StorageSchema:
+    """How frames in one storage category are typed and encoded on disk.
+
+    ``categorical`` columns (low-cardinality labels such as asset type or
+    source) are stored dictionary-encoded and read back as pandas
+    categoricals; ``float32`` columns are derived values that do not need
+    double precision. Prices and volumes are never narrowed. ``statistics``
+    is either a flag or the columns whose min/max are written for row-group
+    pruning; ``row_group_size`` of ``None`` keeps pyarrow's default.
+    """
+
+    categorical: Tuple[str, ...] = ()
+    float32: Tuple[str, ...] = ()
+    compression: str = "zstd"
+    compression_level: int | None = None
+    row_group_size: int | None = None
+    statistics: bool | Tuple[str, ...] = True
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return ``df`` with the schema's columns cast; other columns are untouched."""
+
+        casts: Dict[str, object] = {}
+        for column in self.categorical:
+            if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                casts[column] = "category"
+        for column in self.float32:
+            if column in df.columns and pd.api.types.is_float_dtype(df[column]) and df[column].dtype != np.float32:
+                casts[column] = np.float32
+        return df.astype(casts) if casts else df
+
+    def write_options(self) -> Dict[str, object]:
+        """Keyword arguments for ``pyarrow.parquet.write_table`` (and ``DataFrame.to_parquet``)."""
+
+        options: Dict[str, object] = {
+            "compression": self.compression,
+            "write_statistics": list(self.statistics) if isinstance(self.statistics, tuple) else self.statistics,
+        }
+        if self.compression_level is not None:
+            options["compression_level"] = self.compression_level
+        if self.row_group_size is not None:
+            options["row_group_size"] = self.row_group_size
+        return options
+
+    def dataset_options(self) -> Dict[str, object]:
+        """Keyword arguments for ``pyarrow.dataset.write_dataset``."""
+
+        import pyarrow.dataset as ds
+
+        options = self.write_options()
+        row_group_size = options.pop("row_group_size", None)
+        dataset_options: Dict[str, object] = {"file_options": ds.ParquetFileFormat().make_write_options(**options)}
+        if row_group_size is not None:
+            dataset_options["max_rows_per_group"] = row_group_size
+            dataset_options["min_rows_per_group"] = row_group_size
+        return dataset_options
+
+
+LABEL_COLUMNS = ("asset_type", "currency", "source", "quote_source", "exchange")
+
+DEFAULT_SCHEMA = StorageSchema()
+DEFAULT_SCHEMAS: Dict[str, StorageSchema] = {
+    "raw": StorageSchema(categorical=LABEL_COLUMNS, compression_level=6),
+    # Processed snapshots hold prices and volumes only (derived features are recomputed, never stored),
+    # so nothing here is narrowed to float32.
+    "processed": StorageSchema(categorical=LABEL_COLUMNS, statistics=("asset_type", "asset_id", "as_of", "snapshot_date")),
+    "sentiment": StorageSchema(
+        categorical=("source",), float32=("sentiment_score",), statistics=("ticker", "snapshot_date")
+    ),
+    "history": StorageSchema(row_group_size=64_000, statistics=("asset_id", "as_of", "close", "volume")),
+}
+
+
+__all__ = ["DEFAULT_SCHEMA", "DEFAULT_SCHEMAS", "StorageSchema"]
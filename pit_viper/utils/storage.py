@@ -1,35 +1,322 @@
 """Utility helpers for persisting pipeline artifacts to the local filesystem."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Sequence
 
 import pandas as pd
 
+from .schema import DEFAULT_SCHEMA, DEFAULT_SCHEMAS, StorageSchema
+
+if TYPE_CHECKING:
+    from .config import StorageConfig
+
+try:  # POSIX only; elsewhere manifests are only serialised within a process.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_COPY_ON_WRITE = int(pd.__version__.split(".", 1)[0]) >= 3
+HISTORY_DIR = "history"
+MANIFEST_NAME = "_manifest"
+ARTIFACT_SUFFIXES = (".parquet", ".json")
+_PERIOD_PATTERN = re.compile(r"^(?P<prefix>.*?)(?P<period>\d{4}-\d{2}(?:-\d{2})?)$")
+
+
+def artifact_span(name: str) -> tuple[str, pd.Timestamp, pd.Timestamp] | None:
+    """``(prefix, first_day, last_day)`` for ``market_2024-05-01`` or monthly ``market_2024-05`` names."""
+
+    match = _PERIOD_PATTERN.match(Path(name).stem if name.endswith(ARTIFACT_SUFFIXES) else name)
+    if match is None:
+        return None
+    period = match["period"]
+    try:
+        start = pd.Timestamp(period if len(period) > 7 else f"{period}-01")
+    except ValueError:
+        return None
+    end = start if len(period) > 7 else start + pd.offsets.MonthEnd(0)
+    return match["prefix"], start, end
+
 
 @dataclass
 class DataStore:
-    """Lightweight Parquet-based persistence layer."""
+    """Lightweight Parquet-based persistence layer.
+
+    Frames are written with the :class:`~pit_viper.utils.schema.StorageSchema`
+    registered for their category (the history dataset uses ``"history"``).
+    Every artifact is written to a temporary sibling and renamed into place,
+    so readers never see a partial file. The ``*_async`` variants queue the
+    write on a single background thread (so writes land in submission order)
+    and :meth:`flush` waits for everything queued so far.
+
+    Each category keeps a JSON ``_manifest`` of its artifacts (rows and the
+    days each covers), updated on every write and by compaction, so
+    :meth:`list_frames` only has to compare file names with it rather than
+    stat every file. Updates hold a lock shared by every store in the process
+    and a ``flock`` on the category, so concurrent stores and overlapping
+    cron runs do not lose entries.
+    """
 
     root: Path
+    schemas: Dict[str, StorageSchema] = field(default_factory=lambda: dict(DEFAULT_SCHEMAS))
+    _executor: ThreadPoolExecutor | None = field(default=None, init=False, repr=False, compare=False)
+    _pending: List[Future] = field(default_factory=list, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_config(cls, storage: "StorageConfig") -> "DataStore":
+        """A store under ``storage.data_dir`` whose schemas follow the configured subdirectory names."""
+
+        return cls(Path(storage.data_dir), schemas=storage.schemas())
+
+    def schema_for(self, category: str) -> StorageSchema:
+        return self.schemas.get(category, DEFAULT_SCHEMA)
 
     def write_frame(self, df: pd.DataFrame, category: str, name: str) -> Path:
         path = self._build_path(category, name)
-        df.to_parquet(path, index=False)
+        schema = self.schema_for(category)
+        with _atomic(path) as tmp_path:
+            schema.apply(df).to_parquet(tmp_path, index=False, **schema.write_options())
+        self._register(category, path, rows=len(df))
         return path
 
     def write_json(self, payload: Dict[str, Any], category: str, name: str) -> Path:
-        path = self._build_path(category, name, suffix=".json")
-        import json
+        return self._write_text(json.dumps(payload, indent=2, default=str), category, name)
 
-        path.write_text(json.dumps(payload, indent=2, default=str))
+    def _write_text(self, text: str, category: str, name: str) -> Path:
+        path = self._build_path(category, name, suffix=".json")
+        with _atomic(path) as tmp_path:
+            tmp_path.write_text(text)
+        self._register(category, path)
         return path
 
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Run ``fn`` on the background writer thread after everything queued before it."""
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="datastore-writer")
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._pending = [pending for pending in self._pending if not pending.done()] + [future]
+        return future
+
+    def write_frame_async(self, df: pd.DataFrame, category: str, name: str) -> Future:
+        """Queue :meth:`write_frame`; later changes to ``df`` do not affect what is written."""
+
+        # Under copy-on-write (always on from pandas 3) a shallow copy is already a snapshot.
+        return self.submit(self.write_frame, df.copy(deep=not _COPY_ON_WRITE), category, name)
+
+    def write_json_async(self, payload: Dict[str, Any], category: str, name: str) -> Future:
+        """Queue :meth:`write_json`; ``payload`` is serialised before this returns."""
+
+        return self.submit(self._write_text, json.dumps(payload, indent=2, default=str), category, name)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every queued write has finished, re-raising the first failure."""
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+        done, not_done = wait(pending, timeout=timeout)
+        if not_done:
+            with self._lock:
+                self._pending = list(not_done) + self._pending
+            raise TimeoutError(f"{len(not_done)} storage writes still pending after {timeout}s")
+        for future in pending:
+            future.result()
+
     def read_frame(self, category: str, name: str) -> pd.DataFrame:
         path = self._build_path(category, name)
         return pd.read_parquet(path)
 
+    def list_frames(self, category: str, prefix: str = "") -> List[Path]:
+        """Return Parquet files in ``category`` whose names start with ``prefix``, newest name first."""
+
+        target_dir = self.root / category
+        if not target_dir.exists():
+            return []
+        names = [name for name in self.reconcile_manifest(category) if name.startswith(prefix) and name.endswith(".parquet")]
+        return sorted((target_dir / name for name in names), reverse=True)
+
+    def manifest(self, category: str) -> Dict[str, Dict[str, Any]]:
+        """Artifacts in ``category`` by file name, built from one directory scan the first time it is needed."""
+
+        path = self.root / category / MANIFEST_NAME
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return self._scan(category)
+
+    def reconcile_manifest(self, category: str) -> Dict[str, Dict[str, Any]]:
+        """The manifest, corrected for artifacts added or removed behind its back.
+
+        File names are compared with one ``listdir`` (no per-file ``stat``);
+        the manifest is only rewritten when they disagree.
+        """
+
+        entries = self.manifest(category)
+        on_disk = set(self._artifact_names(category))
+        missing, vanished = on_disk - entries.keys(), entries.keys() - on_disk
+        if not missing and not vanished and (self.root / category / MANIFEST_NAME).exists():
+            return entries
+        target_dir = self.root / category
+        added = {}
+        for name in missing:
+            try:
+                added[name] = _manifest_entry(target_dir / name)
+            except FileNotFoundError:
+                continue
+        return self.update_manifest(category, added, vanished)
+
+    def _artifact_names(self, category: str) -> List[str]:
+        target_dir = self.root / category
+        if not target_dir.exists():
+            return []
+        return [
+            name
+            for name in os.listdir(target_dir)
+            if name.endswith(ARTIFACT_SUFFIXES) and not name.startswith((".", "_"))
+        ]
+
+    def _scan(self, category: str) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        for name in sorted(self._artifact_names(category)):
+            try:
+                entries[name] = _manifest_entry(self.root / category / name)
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def update_manifest(
+        self, category: str, added: Dict[str, Dict[str, Any]] | None = None, removed: Iterable[str] = ()
+    ) -> Dict[str, Dict[str, Any]]:
+        path = self.root / category / MANIFEST_NAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _manifest_lock(path):
+            entries = self.manifest(category)
+            entries.update(added or {})
+            for name in removed:
+                entries.pop(name, None)
+            with _atomic(path) as tmp_path:
+                tmp_path.write_text(json.dumps(entries, indent=1, sort_keys=True))
+            return entries
+
+    def _register(self, category: str, path: Path, rows: int | None = None) -> None:
+        self.update_manifest(category, {path.name: _manifest_entry(path, rows)})
+
+    def history_path(self, category: str) -> Path:
+        return self.root / category / HISTORY_DIR
+
+    def history_dates(self, category: str) -> List[pd.Timestamp]:
+        """Distinct ``date`` partitions of the category's history dataset, oldest first."""
+
+        base = self.history_path(category)
+        if not base.exists():
+            return []
+        dates = {path.name.split("=", 1)[1] for path in base.glob("asset_type=*/date=*") if path.is_dir()}
+        return sorted(pd.Timestamp(value) for value in dates)
+
+    def write_history(self, df: pd.DataFrame, category: str, keys: Sequence[str] = ("asset_id", "as_of")) -> Path:
+        """Upsert bars into a Hive-partitioned dataset (``asset_type=<type>/date=<day>``).
+
+        Only the partitions the new rows fall in are read back and rewritten;
+        rows sharing ``asset_type`` and ``keys`` with stored ones replace them.
+        Rows are sorted by ``asset_id`` within each file so row-group
+        statistics can skip unrelated symbols on read. Partitions are
+        written to a staging directory and renamed into place file by file.
+        """
+
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        base = self.history_path(category)
+        if df.empty:
+            return base
+        frame = df.assign(date=pd.to_datetime(df["as_of"]).dt.normalize())
+        days = frame["date"].drop_duplicates()
+        if base.exists():
+            existing = self.read_history(category, start=days.min(), end=days.max(), asset_types=frame["asset_type"].unique())
+            if not existing.empty:
+                existing = existing.assign(date=pd.to_datetime(existing["as_of"]).dt.normalize())
+                existing = existing[existing["date"].isin(days)]
+                frame = pd.concat([existing, frame], ignore_index=True)
+                frame = frame.drop_duplicates(["asset_type", *keys], keep="last")
+        frame = frame.sort_values(["asset_type", "date", "asset_id", "as_of"], kind="stable")
+        frame["date"] = frame["date"].dt.date
+        schema = self.schema_for(HISTORY_DIR)
+        staging = base.with_name(f".{base.name}.staging")
+        shutil.rmtree(staging, ignore_errors=True)
+        ds.write_dataset(
+            pa.Table.from_pandas(schema.apply(frame), preserve_index=False),
+            staging,
+            format="parquet",
+            partitioning=_history_partitioning(),
+            basename_template="part-{i}.parquet",
+            **schema.dataset_options(),
+        )
+        # Swap files in one partition at a time so a crash never leaves a partition half-written.
+        for partition in sorted({path.parent for path in staging.rglob("*.parquet")}):
+            target = base / partition.relative_to(staging)
+            target.mkdir(parents=True, exist_ok=True)
+            staged = {path.name for path in partition.glob("*.parquet")}
+            for name in sorted(staged):
+                os.replace(partition / name, target / name)
+            for stale in target.glob("*.parquet"):
+                if stale.name not in staged:
+                    stale.unlink()
+        shutil.rmtree(staging, ignore_errors=True)
+        return base
+
+    def read_history(
+        self,
+        category: str,
+        columns: Sequence[str] | None = None,
+        start: Any = None,
+        end: Any = None,
+        asset_types: Iterable[str] | None = None,
+        asset_ids: Iterable[str] | None = None,
+        where: Any = None,
+    ) -> pd.DataFrame:
+        """Read bars from the history dataset, pushing every filter down to Parquet.
+
+        ``start``/``end`` (inclusive days) and ``asset_types`` prune whole
+        partition directories; ``asset_ids`` and an optional pyarrow
+        expression ``where`` are checked against row-group statistics before
+        any data pages are decoded. Only ``columns`` are read.
+        """
+
+        import pyarrow.dataset as ds
+
+        base = self.history_path(category)
+        if not base.exists():
+            return pd.DataFrame(columns=list(columns) if columns is not None else None)
+        dataset = ds.dataset(base, format="parquet", partitioning=_history_partitioning())
+        conditions = []
+        if start is not None:
+            conditions.append(ds.field("date") >= pd.Timestamp(start).date())
+        if end is not None:
+            conditions.append(ds.field("date") <= pd.Timestamp(end).date())
+        if asset_types is not None:
+            conditions.append(ds.field("asset_type").isin(list(asset_types)))
+        if asset_ids is not None:
+            conditions.append(ds.field("asset_id").isin(list(asset_ids)))
+        if where is not None:
+            conditions.append(where)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        if columns is None:
+            columns = [name for name in dataset.schema.names if name != "date"]
+        return dataset.to_table(columns=list(columns), filter=expression).to_pandas()
+
     def _build_path(self, category: str, name: str, suffix: str = ".parquet") -> Path:
         target_dir = self.root / category
         target_dir.mkdir(parents=True, exist_ok=True)
@@ -38,4 +325,68 @@ class DataStore:
         return target_dir / name
 
 
-__all__ = ["DataStore"]
+def _manifest_entry(path: Path, rows: int | None = None) -> Dict[str, Any]:
+    span = artifact_span(path.name)
+    return {
+        "rows": rows,
+        "bytes": path.stat().st_size,
+        "start": span[1].date().isoformat() if span else None,
+        "end": span[2].date().isoformat() if span else None,
+    }
+
+
+@contextmanager
+def _atomic(path: Path) -> Iterator[Path]:
+    """Yield a hidden temporary sibling of ``path`` and rename it over ``path`` once written.
+
+    The temporary name is unique per writer, so concurrent writers of the same
+    artifact never rename or delete each other's half-written file.
+    """
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:12]}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+_MANIFEST_LOCKS: Dict[Path, threading.RLock] = {}
+_MANIFEST_LOCKS_GUARD = threading.Lock()
+_FLOCK_DEPTH = threading.local()
+
+
+@contextmanager
+def _manifest_lock(path: Path) -> Iterator[None]:
+    """Exclusive access to one manifest for every store in this process and, via ``flock``, across processes."""
+
+    key = path.resolve()
+    with _MANIFEST_LOCKS_GUARD:
+        lock = _MANIFEST_LOCKS.setdefault(key, threading.RLock())
+    with lock:
+        depths = _FLOCK_DEPTH.__dict__.setdefault("depths", {})
+        if fcntl is None or depths.get(key):
+            depths[key] = depths.get(key, 0) + 1
+            try:
+                yield
+            finally:
+                depths[key] -= 1
+            return
+        with open(path.with_name(f".{path.name}.lock"), "a") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            depths[key] = 1
+            try:
+                yield
+            finally:
+                depths[key] = 0
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _history_partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("asset_type", pa.string()), ("date", pa.date32())]), flavor="hive")
+
+
+__all__ = ["DataStore", "HISTORY_DIR", "MANIFEST_NAME", "artifact_span"]
@@ -3,7 +3,12 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import pandas as pd
+
+from pit_viper.ingestion.base import IngestionResult, _generate_mock_prices
+from pit_viper.orchestration import advice_job
 from pit_viper.orchestration.advice_job import run_daily_advice
+from pit_viper.processing.portfolio import PortfolioSnapshot
 from pit_viper.utils.config import load_config
 
 
@@ -21,3 +26,33 @@ def test_run_daily_advice(tmp_path: Path, monkeypatch):
 
     loaded = json.loads(advice_files[0].read_text())
     assert "summary" in loaded
+
+
+def test_batch_advice_shares_one_market_pass(tmp_path, monkeypatch):
+    monkeypatch.setenv("PIT_VIPER_DATA_DIR", str(tmp_path))
+    calls = []
+
+    def fake_ingestion(config):
+        calls.append(config)
+        prices = _generate_mock_prices(["SPY", "QQQ", "AAPL"], "equity").assign(quote_source="live")
+        return [IngestionResult("equity", prices, {"source": "test"})]
+
+    monkeypatch.setattr(advice_job, "run_ingestion", fake_ingestion)
+    holdings = {
+        "household": pd.DataFrame(
+            {"asset_id": ["SPY", "AAPL"], "asset_type": "equity", "quantity": [2.0, 1.0], "cost_basis": [10.0, 5.0], "source": "csv"}
+        ),
+        "client": pd.DataFrame({"asset_id": ["QQQ"], "asset_type": "equity", "quantity": [3.0], "cost_basis": [9.0], "source": "csv"}),
+    }
+    portfolios = {name: PortfolioSnapshot(frame, {"source": "file"}) for name, frame in holdings.items()}
+
+    outputs = advice_job.run_batch_advice(load_config(), portfolios)
+
+    assert len(calls) == 1
+    assert list(outputs) == ["household", "client"]
+    assert [row["asset_id"] for row in outputs["household"]["portfolio"]["positions"]] == ["SPY", "AAPL"]
+    assert [row["asset_id"] for row in outputs["client"]["portfolio"]["positions"]] == ["QQQ"]
+    assert outputs["client"]["recommendations"] == outputs["household"]["recommendations"]
+    advice_files = sorted(path.name for path in (tmp_path / "advice").glob("*.json"))
+    assert [name.rsplit("_", 1)[0] for name in advice_files] == ["advice_client", "advice_household"]
+    assert json.loads((tmp_path / "advice" / advice_files[0]).read_text())["summary"]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pit_viper.processing.backtest import FeaturePanel, backtest_from_store, composite_scores, feature_frame_for, run_backtest
+from pit_viper.processing.scoring import ScoringWeights, rank_assets
+from pit_viper.utils.storage import DataStore
+
+
+def _history(assets: int = 12, days: int = 30, seed: int = 4) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-03-01", periods=days)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.03, (days, assets)), axis=0))
+    return pd.DataFrame(
+        {
+            "asset_type": np.tile(np.where(np.arange(assets) % 3, "equity", "crypto"), days),
+            "asset_id": np.tile([f"A{idx}" for idx in range(assets)], days),
+            "as_of": np.repeat(dates, assets),
+            "close": close.ravel(),
+            "high": close.ravel() * rng.uniform(1.0, 1.05, days * assets),
+            "low": close.ravel() * rng.uniform(0.95, 1.0, days * assets),
+            "volume": rng.integers(100, 10_000, days * assets).astype(float),
+        }
+    )
+
+
+def test_panel_scores_match_daily_ranking():
+    history = _history()
+    history = history.drop(index=history.index[(history["asset_id"] == "A3") & (history["as_of"] > "2024-03-20")])
+    features = feature_frame_for(history)
+    panel = FeaturePanel.from_frame(features)
+    weights = ScoringWeights(valuation=0.1, momentum=0.5)
+
+    composite = composite_scores(panel, weights)
+    result = run_backtest(panel, weights, top_n=4, cost_bps=0)
+
+    for day in (5, 25):
+        date = panel.dates[day]
+        daily = features[features["as_of"].dt.normalize() == date].reset_index(drop=True)
+        expected = rank_assets(daily, weights, top_n=4)
+        assert result.holdings.loc[result.holdings["date"] == date, "asset_id"].tolist() == expected["asset_id"].tolist()
+        scored = composite[day][np.isfinite(composite[day])]
+        np.testing.assert_allclose(np.sort(scored)[::-1][:4], expected["composite_score"])
+    assert np.isinf(composite[25][panel.asset_ids == "A3"]).all()
+
+
+def test_portfolio_returns_costs_and_drawdown():
+    dates = pd.bdate_range("2024-01-01", periods=4)
+    panel = FeaturePanel(
+        dates=dates,
+        asset_ids=np.array(["UP", "DOWN"], dtype=object),
+        asset_types=np.array(["equity", "equity"], dtype=object),
+        close=np.array([[10.0, 10.0], [11.0, 9.0], [12.1, 9.9], [10.89, 9.9]]),
+        features={
+            "valuation_proxy": np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 0.0]]),
+            "momentum_proxy": np.zeros((4, 2)),
+            "liquidity_score": np.zeros((4, 2)),
+            "volatility_proxy": np.zeros((4, 2)),
+        },
+    )
+
+    result = run_backtest(panel, ScoringWeights(), top_n=1, cost_bps=100)
+
+    assert result.holdings["asset_id"].tolist() == ["UP", "DOWN", "UP"]
+    np.testing.assert_allclose(result.daily["gross_return"], [0.1, 0.1, -0.1])
+    np.testing.assert_allclose(result.daily["turnover"], [0.5, 1.0, 1.0])
+    np.testing.assert_allclose(result.daily["cost"], [0.01, 0.02, 0.02])
+    np.testing.assert_allclose(result.daily["equity"], np.cumprod([1.09, 1.08, 0.88]))
+    assert result.summary["max_drawdown"] == result.daily["drawdown"].min() < 0
+    assert result.summary["hit_rate"] == 2 / 3
+
+
+def test_backtest_from_store_reads_market_snapshots(tmp_path):
+    store = DataStore(tmp_path)
+    history = _history(assets=5, days=8)
+    for date, frame in history.groupby("as_of"):
+        store.write_frame(frame, "processed", f"market_{date.date()}")
+
+    result = backtest_from_store(store, "processed", top_n=2)
+
+    assert len(result.daily) == 7
+    assert result.holdings.groupby("date").size().eq(2).all()
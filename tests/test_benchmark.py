@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+
+from pit_viper import benchmark
+
+
+def test_run_benchmarks_times_every_stage_per_size():
+    report = benchmark.run_benchmarks(sizes=(10, 30), repeats=2, history_days=5)
+
+    assert {"created", "python", "pandas", "repeats"} <= set(report["meta"])
+    assert {(row["stage"], row["size"]) for row in report["results"]} == {
+        (stage.name, size) for stage in benchmark.STAGES for size in (10, 30)
+    }
+    for row in report["results"]:
+        assert len(row["runs"]) == 2
+        assert 0 <= row["min_s"] <= row["median_s"]
+    json.dumps(report)
+
+
+def test_compare_flags_only_meaningful_slowdowns():
+    def report(**times):
+        return {"results": [{"stage": stage, "size": 100, "min_s": seconds} for stage, seconds in times.items()]}
+
+    rows = benchmark.compare(
+        report(fast=0.20, noisy=0.002, steady=0.11, new=1.0),
+        report(fast=0.10, noisy=0.001, steady=0.10),
+        threshold=0.25,
+        min_delta=0.005,
+    )
+
+    flagged = {row["stage"]: row["regressed"] for row in rows}
+    assert flagged == {"fast": True, "noisy": False, "steady": False}
+
+
+def test_main_exits_non_zero_on_regression(tmp_path):
+    baseline = benchmark.run_benchmarks(sizes=(10,), stages=["score_assets"], repeats=1, history_days=3)
+    for row in baseline["results"]:
+        row["min_s"] = 1e-9
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(baseline))
+
+    args = ["--sizes", "10", "--stages", "score_assets", "--repeats", "1", "--history-days", "3", "--min-delta", "0"]
+    assert benchmark.main(args + ["--compare", str(path)]) == 1
+    assert benchmark.main(args + ["--output", str(tmp_path / "run.json")]) == 0
+    assert json.loads((tmp_path / "run.json").read_text())["results"][0]["stage"] == "score_assets"
+
+
+def test_read_stages_run_alone_against_seeded_data():
+    report = benchmark.run_benchmarks(sizes=(10,), stages=["store_read", "history_read", "history_write"], repeats=2, history_days=4)
+
+    rows = {row["stage"]: row for row in report["results"]}
+    assert rows["store_read"]["rows"] == 10
+    # 7 equity assets with 4 bars of history each.
+    assert rows["history_read"]["rows"] == 28
+    assert len(rows["history_write"]["runs"]) == 2
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pit_viper.processing.covariance import StreamingCovariance, correlation_diversification
+
+
+def _returns(days: int = 120, seed: int = 2) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, (days, 1))
+    return np.hstack([market + rng.normal(0, 0.002, (days, 2)), rng.normal(0, 0.01, (days, 2))])
+
+
+def _long_frame(returns: np.ndarray, ids=("A", "B", "C", "D")) -> pd.DataFrame:
+    days, assets = returns.shape
+    dates = pd.bdate_range("2024-01-01", periods=days)
+    return pd.DataFrame(
+        {
+            "asset_type": "equity",
+            "asset_id": np.tile(list(ids), days),
+            "as_of": np.repeat(dates, assets),
+            "return_1d": returns.ravel(),
+        }
+    )
+
+
+def test_streaming_updates_match_batch_correlation(tmp_path):
+    returns = _returns()
+    covariance = StreamingCovariance(tmp_path / "cov.npz", shrinkage=0.0, min_periods=1)
+    covariance.update(returns[:70], ["A", "B", "C", "D"])
+    for day in range(70, len(returns)):
+        covariance.update(returns[day : day + 1, [2, 0, 3, 1]], ["C", "A", "D", "B"])
+
+    positions = covariance.indices(["A", "B", "C", "D"])
+    np.testing.assert_allclose(covariance.comoment[np.ix_(positions, positions)] / (len(returns) - 1), np.cov(returns.T))
+    np.testing.assert_allclose(covariance.correlation_block(positions, positions), np.corrcoef(returns.T), atol=1e-12)
+
+    covariance.save()
+    reloaded = StreamingCovariance.load(tmp_path / "cov.npz", shrinkage=0.5, min_periods=1)
+    shrunk = reloaded.correlation_block(positions[:1], positions[1:2])
+    np.testing.assert_allclose(shrunk, 0.5 * np.corrcoef(returns.T)[0, 1])
+
+
+def test_update_frame_applies_each_date_once(tmp_path):
+    frame = _long_frame(_returns(days=30))
+    covariance = StreamingCovariance(tmp_path / "cov.npz")
+
+    assert covariance.update_frame(frame.iloc[:80]) == 20
+    assert covariance.update_frame(frame) == 10
+    assert covariance.update_frame(frame) == 0
+    assert covariance.periods == 30
+    assert covariance.observations.tolist() == [30, 30, 30, 30]
+
+
+def test_diversification_prefers_assets_uncorrelated_with_holdings(tmp_path):
+    covariance = StreamingCovariance(tmp_path / "cov.npz", min_periods=10)
+    covariance.update_frame(_long_frame(_returns()))
+    features = pd.DataFrame(
+        {
+            "asset_type": "equity",
+            "asset_id": ["A", "B", "C", "D", "NEW"],
+            "valuation_proxy": [1.0, 0.0, 0.0, 0.0, 0.0],
+            "momentum_proxy": 0.0,
+            "liquidity_score": 0.0,
+            "volatility_proxy": 0.0,
+        }
+    )
+    holdings = pd.DataFrame({"asset_type": ["equity"], "asset_id": ["A"]})
+
+    scores = correlation_diversification(features, covariance, holdings, top_n=1, block_size=2)
+
+    assert scores[1] < 0.25 < scores[2]
+    assert scores[4] == 0.5
+
+
+def test_pipeline_returns_keep_missing_bars_out_of_the_covariance(tmp_path):
+    from pit_viper.ingestion.base import IngestionResult
+    from pit_viper.processing.feature_pipeline import run_feature_pipeline
+
+    history = pd.DataFrame(
+        {"asset_type": "equity", "asset_id": "OLD", "as_of": pd.Timestamp("2024-06-27"), "close": [100.0], "volume": 1.0}
+    )
+    today = pd.DataFrame({"asset_id": ["OLD", "NEW"], "close": [110.0, 50.0], "volume": 1.0, "as_of": pd.Timestamp("2024-06-28")})
+
+    result = run_feature_pipeline([IngestionResult("equity", today, {})], history)
+
+    assert result.combined["asset_id"].tolist() == ["NEW", "OLD"]
+    np.testing.assert_allclose(result.features["return_1d"], [0.0, 0.1])
+    assert result.returns.isna().tolist() == [True, False]
+    covariance = StreamingCovariance(tmp_path / "state.npz")
+    covariance.update_frame(result.combined.assign(return_1d=result.returns))
+    assert dict(zip(covariance.keys, covariance.observations)) == {"equity:NEW": 0, "equity:OLD": 1}
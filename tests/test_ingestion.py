@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from pit_viper.ingestion.base import IngestionResult
+from pit_viper.ingestion.runner import IngestionTask, run_ingestion
+from pit_viper.utils.config import load_config
+
+
+def _static_fetch(asset_type: str, delay: float = 0.0):
+    def _fetch(config):
+        time.sleep(delay)
+        frame = pd.DataFrame({"asset_id": [f"{asset_type}-1"], "asset_type": [asset_type], "close": [1.0]})
+        return IngestionResult(asset_type=asset_type, data=frame, metadata={"source": "test", "count": "1"})
+
+    return _fetch
+
+
+def _broken_fetch(config):
+    raise RuntimeError("boom")
+
+
+def test_run_ingestion_preserves_order_and_degrades(tmp_path, monkeypatch):
+    monkeypatch.setenv("PIT_VIPER_DATA_DIR", str(tmp_path))
+    config = load_config()
+    config.ingestion = replace(config.ingestion, max_workers=3, fetch_timeout=0.5)
+    tasks = [
+        IngestionTask("slow", _static_fetch("slow", delay=5.0), ("S1", "S2")),
+        IngestionTask("fast", _static_fetch("fast"), ("F1",)),
+        IngestionTask("broken", _broken_fetch, ("B1",)),
+    ]
+
+    started = time.monotonic()
+    results = run_ingestion(config, tasks)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 3.0
+    assert [result.asset_type for result in results] == ["slow", "fast", "broken"]
+    assert results[0].metadata["source"] == "mock"
+    assert results[0].metadata["error"] == "timeout"
+    assert list(results[0].data["asset_id"]) == ["S1", "S2"]
+    assert results[1].metadata["source"] == "test"
+    assert results[2].metadata["source"] == "mock"
+    assert results[2].metadata["error"].startswith("error:")
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+class _FakeSession:
+    def __init__(self):
+        self.urls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get(self, url, timeout):
+        self.urls.append(url)
+        product_id = url.split("/")[-2]
+        return _FakeResponse({"price": str(len(product_id)), "volume": "5"})
+
+
+def test_coinbase_prices_share_one_session(monkeypatch):
+    from pit_viper.ingestion import crypto
+
+    session = _FakeSession()
+    monkeypatch.setattr(crypto, "_build_session", lambda pool_size: session)
+    symbols = [f"C{idx}-USD" for idx in range(40)]
+
+    frame = crypto._coinbase_prices(symbols, api_key="key", max_concurrency=4)
+
+    assert len(session.urls) == 40
+    assert list(frame["asset_id"]) == symbols
+    assert frame["close"].tolist() == [float(len(symbol)) for symbol in symbols]
+    assert frame["as_of"].nunique() == 1
+
+
+class _FlakyProductSession(_FakeSession):
+    """Tickers always answer; product metadata fails for one product."""
+
+    def get(self, url, timeout):
+        if url.endswith("/ticker"):
+            return super().get(url, timeout)
+        self.urls.append(url)
+        product_id = url.rsplit("/", 1)[-1]
+        if product_id == "BAD-EUR":
+            raise RuntimeError("429 Too Many Requests")
+        return _FakeResponse({"quote_currency": product_id.split("-")[1]})
+
+
+def test_failed_currency_lookups_are_retried_not_fatal(tmp_path, monkeypatch):
+    import sys
+    import types
+
+    from pit_viper.ingestion import crypto, yahoo
+    from pit_viper.ingestion.reference import ReferenceDataCache
+
+    monkeypatch.setattr(crypto, "_build_session", lambda pool_size: _FlakyProductSession())
+    reference = ReferenceDataCache(tmp_path / "ref.json")
+
+    frame = crypto._coinbase_prices(["BTC-GBP", "BAD-EUR"], api_key="key", reference=reference)
+
+    assert frame.set_index("asset_id")["currency"].to_dict() == {"BTC-GBP": "GBP", "BAD-EUR": "USD"}
+    assert reference.get("BTC-GBP", "currency") == "GBP"
+    assert reference.get("BAD-EUR", "currency") is None
+
+    class Ticker:
+        def __init__(self, symbol):
+            raise RuntimeError("transient")
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(Ticker=Ticker))
+    assert yahoo.lookup_currencies(["7203.T"]) == {"7203.T": None}
+    assert reference.get_many(["7203.T"], "currency", yahoo.lookup_currencies) == {}
+
+
+def test_yfinance_prices_download_in_chunks(monkeypatch):
+    import sys
+    import types
+
+    from pit_viper.ingestion import equities
+
+    calls = []
+
+    def download(tickers, **kwargs):
+        calls.append(list(tickers))
+        index = pd.date_range("2024-01-01", periods=2, name="Date")
+        columns = pd.MultiIndex.from_product([tickers, ["Open", "High", "Low", "Close", "Volume"]])
+        return pd.DataFrame(1.0, index=index, columns=columns)
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.fast_info = types.SimpleNamespace(currency="CAD" if symbol.endswith(".TO") else "USD")
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=download, Ticker=Ticker))
+    symbols = [f"T{idx}" for idx in range(5)] + ["RY.TO"]
+
+    frame = equities._yfinance_prices(symbols, chunk_size=4)
+
+    assert calls == [symbols[:4], symbols[4:]]
+    assert list(frame["asset_id"]) == symbols
+    assert frame.set_index("asset_id").loc["RY.TO", "currency"] == "CAD"
+    assert (frame["as_of"] == pd.Timestamp("2024-01-02")).all()
+
+
+def test_hung_connector_does_not_block_tasks_queued_behind_it(tmp_path, monkeypatch):
+    import threading
+
+    monkeypatch.setenv("PIT_VIPER_DATA_DIR", str(tmp_path))
+    config = load_config()
+    config.ingestion = replace(config.ingestion, max_workers=1, fetch_timeout=0.3)
+    release = threading.Event()
+    tasks = [
+        IngestionTask("hung", lambda config: release.wait(), ("H1",)),
+        IngestionTask("fast", _static_fetch("fast"), ("F1",)),
+    ]
+
+    started = time.monotonic()
+    try:
+        results = run_ingestion(config, tasks)
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 3.0
+    assert [result.metadata.get("error") for result in results] == ["timeout", None]
+    assert results[1].metadata["source"] == "test"
+
+
+def test_hung_connector_does_not_delay_interpreter_exit(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    script = """
+import threading
+from dataclasses import replace
+from pit_viper.ingestion.runner import IngestionTask, run_ingestion
+from pit_viper.utils.config import load_config
+
+config = load_config()
+config.ingestion = replace(config.ingestion, fetch_timeout=0.2)
+hang = lambda config: threading.Event().wait()
+print(run_ingestion(config, [IngestionTask("hung", hang, ("H1",))])[0].metadata["error"])
+"""
+    started = time.monotonic()
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        check=True,
+        env={**os.environ, "PIT_VIPER_DATA_DIR": str(tmp_path)},
+    )
+
+    assert completed.stdout.strip() == "timeout"
+    assert time.monotonic() - started < 15
+
+
+def test_reference_cache_fetches_only_missing_or_expired(tmp_path):
+    from datetime import datetime, timedelta
+
+    from pit_viper.ingestion.reference import ReferenceDataCache
+
+    path = tmp_path / "reference" / "reference_data.json"
+    cache = ReferenceDataCache(path, field_ttls={"currency": timedelta(days=7)})
+    requested = []
+
+    def fetch(symbols):
+        requested.append(list(symbols))
+        return {symbol: "USD" for symbol in symbols}
+
+    assert cache.get_many(["AAPL", "MSFT"], "currency", fetch) == {"AAPL": "USD", "MSFT": "USD"}
+    cache.save()
+
+    reloaded = ReferenceDataCache(path, field_ttls={"currency": timedelta(days=7)})
+    reloaded.put("MSFT", "currency", "USD", now=datetime.utcnow() - timedelta(days=8))
+    reloaded.get_many(["AAPL", "MSFT", "SPY"], "currency", fetch)
+
+    assert requested == [["AAPL", "MSFT"], ["MSFT", "SPY"]]
+
+
+def test_failed_description_lookups_are_not_cached(tmp_path, monkeypatch):
+    from pit_viper.ingestion import yahoo
+    from pit_viper.ingestion.reference import ReferenceDataCache
+
+    names = {"SPY": "SPDR S&P 500 ETF"}
+    monkeypatch.setattr(yahoo, "_lookup_description", names.get)
+    cache = ReferenceDataCache(tmp_path / "ref.json")
+
+    assert yahoo.lookup_descriptions(["SPY", "XYZ"]) == {"SPY": "SPDR S&P 500 ETF", "XYZ": None}
+    assert cache.get_many(["SPY", "XYZ"], "description", yahoo.lookup_descriptions) == {"SPY": "SPDR S&P 500 ETF"}
+    assert cache.get("XYZ", "description") is None
+
+
+def test_reference_cache_evicts_idle_and_least_recent(tmp_path):
+    from datetime import datetime, timedelta
+
+    from pit_viper.ingestion.reference import ReferenceDataCache
+
+    cache = ReferenceDataCache(tmp_path / "ref.json", max_entries=2, idle_eviction=timedelta(days=30))
+    now = datetime.utcnow()
+    cache.put("OLD", "currency", "USD", now=now - timedelta(days=60))
+    cache.put("A", "currency", "USD", now=now - timedelta(days=3))
+    cache.put("B", "currency", "USD", now=now - timedelta(days=2))
+    cache.put("C", "currency", "USD", now=now - timedelta(days=1))
+
+    assert cache.evict(now=now) == 2
+    assert cache.get("B", "currency") == "USD"
+    assert cache.get("A", "currency") is None
+    assert cache.get("OLD", "currency") is None
+
+
+def test_resilient_fetch_serves_cache_and_degrades_per_symbol(tmp_path):
+    from datetime import timedelta
+
+    from pit_viper.ingestion.base import resilient_fetch
+    from pit_viper.ingestion.quotes import QuoteCache
+    from pit_viper.utils.storage import DataStore
+
+    quotes = QuoteCache(DataStore(tmp_path), "processed", max_age=timedelta(minutes=15))
+    calls = []
+
+    def fetch(symbols):
+        calls.append(list(symbols))
+        rows = [{"asset_id": symbol, "close": 100.0 + idx} for idx, symbol in enumerate(symbols) if symbol != "BAD"]
+        return pd.DataFrame(rows)
+
+    first, counts = resilient_fetch("equity", ["AAA", "BAD"], fetch, quotes)
+    assert counts == {"live": 1, "cache": 0, "stale": 0, "mock": 1}
+    assert list(first["quote_source"]) == ["live", "mock"]
+
+    reloaded = QuoteCache(DataStore(tmp_path), "processed", max_age=timedelta(minutes=15))
+    second, counts = resilient_fetch("equity", ["AAA", "BBB"], fetch, reloaded)
+    reloaded.wait(timeout=5)
+    assert counts == {"live": 1, "cache": 1, "stale": 0, "mock": 0}
+    assert list(second["asset_id"]) == ["AAA", "BBB"]
+    assert second.set_index("asset_id").loc["AAA", "close"] == 100.0
+    assert calls[1:] == [["BBB"], ["AAA"]]
+
+    reloaded.max_age = timedelta(0)
+    third, counts = resilient_fetch("equity", ["AAA"], lambda symbols: pd.DataFrame(), reloaded)
+    assert counts["stale"] == 1
+    assert third["close"].iloc[0] == 100.0
+
+
+def test_hung_quote_refresh_times_out_and_late_results_are_dropped(tmp_path):
+    import threading
+    from concurrent.futures import TimeoutError as FutureTimeout
+    from datetime import timedelta
+
+    import pytest
+
+    from pit_viper.ingestion.quotes import QuoteCache
+    from pit_viper.utils.storage import DataStore
+
+    quotes = QuoteCache(DataStore(tmp_path), "processed", max_age=timedelta(minutes=15), refresh_timeout=0.2)
+    release = threading.Event()
+
+    def fetch(symbols):
+        release.wait()
+        return pd.DataFrame({"asset_id": symbols, "close": 1.0})
+
+    future = quotes.refresh_in_background("equity", ["AAA"], fetch)
+    assert quotes.refresh_in_background("equity", ["AAA"], fetch) is future
+    assert all(thread.daemon for thread in threading.enumerate() if thread.name.startswith("quote-refresh"))
+    with pytest.raises(FutureTimeout):
+        future.result(timeout=5)
+
+    release.set()
+    time.sleep(0.2)
+    assert quotes.lookup("equity", ["AAA"]).empty
+    assert quotes.refresh_in_background("equity", ["AAA"], fetch).result(timeout=5) is None
+    assert quotes.lookup("equity", ["AAA"])["close"].tolist() == [1.0]
+
+
+def test_synthetic_market_is_process_stable_and_universe_independent():
+    import os
+    import subprocess
+    import sys
+
+    from pit_viper.ingestion.synthetic import synthetic_market, synthetic_paths, synthetic_symbols
+
+    frame = synthetic_market(["AAA", "BBB", "CCC"], days=30, end="2024-06-28", correlation=0.5)
+    assert frame.shape == (90, 9)
+    assert (frame["low"] <= frame[["open", "close"]].min(axis=1)).all()
+    assert (frame["high"] >= frame[["open", "close"]].max(axis=1)).all()
+
+    reordered = synthetic_market(["ZZZ", "BBB"], days=30, end="2024-06-28", correlation=0.5)
+    columns = ["as_of", "close", "open", "high", "low", "volume"]
+    pd.testing.assert_frame_equal(
+        frame.loc[frame["asset_id"] == "BBB", columns].reset_index(drop=True),
+        reordered.loc[reordered["asset_id"] == "BBB", columns].reset_index(drop=True),
+    )
+
+    script = "from pit_viper.ingestion.synthetic import synthetic_market; print(synthetic_market(['AAA'], days=5, end='2024-06-28')['close'].sum())"
+    runs = {
+        subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True, env={**os.environ, "PYTHONHASHSEED": str(hash_seed)}
+        ).stdout
+        for hash_seed in (1, 2)
+    }
+    assert runs == {f"{synthetic_market(['AAA'], days=5, end='2024-06-28')['close'].sum()}\n"}
+
+    paths = synthetic_paths(synthetic_symbols(200), 1000, drift=0.0, volatility=0.2, correlation=0.4, seed=7)
+    returns = np.diff(np.log(paths["close"]), axis=0)
+    correlation = np.corrcoef(returns.T)[np.triu_indices(200, 1)]
+    assert abs(correlation.mean() - 0.4) < 0.03
+    assert abs(returns.std(axis=0).mean() * np.sqrt(252) - 0.2) < 0.01
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Runs in a fresh interpreter so the peak-RSS reading only reflects this pipeline.
+SCRIPT = r"""
+import gc, json, tracemalloc
+import numpy as np, pandas as pd
+from pit_viper.ingestion.base import IngestionResult
+from pit_viper.processing.feature_pipeline import clean_and_combine, engineer_features
+from pit_viper.processing.scoring import rank_assets
+
+def proc_status():
+    fields = {}
+    with open("/proc/self/status") as handle:
+        for line in handle:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                fields[key] = int(value.split()[0]) * 1024
+    return fields
+
+rng = np.random.default_rng(0)
+results = []
+for asset_type, count in (("equity", 70_000), ("crypto", 30_000)):
+    close = rng.lognormal(3, 1, count)
+    ids = np.array([f"{asset_type[0]}{idx:07d}" for idx in range(count)], dtype=object)[rng.permutation(count)]
+    frame = pd.DataFrame({
+        "asset_id": ids, "currency": "USD", "close": close, "open": close, "high": close * 1.01, "low": close * 0.99,
+        "volume": rng.integers(1, 1_000_000, count), "as_of": pd.Timestamp("2024-05-01 16:00"), "quote_source": "live",
+    })
+    results.append(IngestionResult(asset_type, frame, {}))
+engineer_features(clean_and_combine([IngestionResult("equity", results[0].data.head(50), {})]))
+gc.collect()
+
+with open("/proc/self/clear_refs", "w") as handle:
+    handle.write("5")
+rss_before = proc_status()["VmRSS"]
+tracemalloc.start()
+features = engineer_features(clean_and_combine(results))
+ranked = rank_assets(features)
+traced_peak = tracemalloc.get_traced_memory()[1]
+tracemalloc.stop()
+print(json.dumps({
+    "rows": len(features),
+    "output_bytes": int(features.memory_usage(deep=True).sum()),
+    "rss_peak_bytes": proc_status()["VmHWM"] - rss_before,
+    "traced_peak_bytes": traced_peak,
+}))
+"""
+
+
+def _can_reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not _can_reset_peak_rss(), reason="needs Linux /proc peak-RSS reset")
+def test_feature_pipeline_peak_memory_stays_near_output_size():
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parents[1]
+    )
+    usage = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert usage["rows"] == 100_000
+    # With a full copy per stage this peaked at ~4.3x (RSS) and ~2.8x (traced) the feature frame; now ~2.75x and ~1.4x.
+    assert usage["rss_peak_bytes"] < 3.5 * usage["output_bytes"], usage
+    assert usage["traced_peak_bytes"] < 2.0 * usage["output_bytes"], usage
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from pit_viper.processing.portfolio import latest_prices, reconcile, value_holdings
+
+
+def _holdings() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "asset_id": ["SPY", "SPY", "BTC-USD", "GONE"],
+            "asset_type": ["equity", "equity", "crypto", "equity"],
+            "quantity": [10, 5, 0.5, 3],
+            "cost_basis": [4000.0, 2500.0, 15000.0, 300.0],
+            "source": ["fidelity", "fidelity", "coinbase", "fidelity"],
+            "account": ["ira", "taxable", "taxable", "ira"],
+        }
+    )
+
+
+def _prices() -> pd.Series:
+    combined = pd.DataFrame(
+        {
+            "asset_id": ["SPY", "BTC-USD", "SPY", "BTC-USD"],
+            "asset_type": ["equity", "crypto", "equity", "equity"],
+            "close": [490.0, 60000.0, 500.0, 1.0],
+            "as_of": pd.to_datetime(["2024-05-01", "2024-05-02", "2024-05-02", "2024-05-02"]),
+        }
+    )
+    return latest_prices(combined)
+
+
+def test_value_holdings_computes_values_weights_and_drift():
+    valuation = value_holdings(_holdings(), _prices())
+    positions = valuation.positions
+
+    np.testing.assert_allclose(positions["price"], [500.0, 500.0, 60000.0, np.nan])
+    np.testing.assert_allclose(positions["market_value"], [5000.0, 2500.0, 30000.0, np.nan])
+    np.testing.assert_allclose(positions["unrealized_pnl"], [1000.0, 0.0, 15000.0, np.nan])
+    np.testing.assert_allclose(positions["weight"], [1.0, 2500 / 32500, 30000 / 32500, np.nan])
+    np.testing.assert_allclose(positions["drift"], [0.0, 2500 / 32500 - 2500 / 17500, 30000 / 32500 - 15000 / 17500, np.nan])
+
+    accounts = valuation.accounts.set_index("account")
+    assert accounts.loc["ira", "lots"] == 2 and accounts.loc["ira", "priced_lots"] == 1
+    np.testing.assert_allclose(accounts["market_value"], [5000.0, 32500.0])
+    np.testing.assert_allclose(accounts["unrealized_pnl"], [1000.0, 15000.0])
+
+
+def test_target_weights_override_cost_weights():
+    targets = pd.Series([0.5], index=pd.MultiIndex.from_tuples([("BTC-USD", "crypto")], names=["asset_id", "asset_type"]))
+
+    positions = value_holdings(_holdings(), _prices(), targets).positions
+
+    np.testing.assert_allclose(positions["target_weight"].iloc[:3], [0.0, 0.0, 0.5])
+
+
+def test_reconcile_sums_lots_for_recommended_assets():
+    holdings = _holdings()
+    recommendations = pd.DataFrame({"asset_id": ["SPY", "ETH-USD"], "asset_type": ["equity", "crypto"], "composite_score": [0.9, 0.8]})
+
+    reconciled = reconcile(holdings, recommendations, value_holdings(holdings, _prices()))
+
+    assert reconciled["in_portfolio"].tolist() == [True, False]
+    assert reconciled["position_delta"].tolist() == [15.0, 0.0]
+    np.testing.assert_allclose(reconciled["market_value"], [7500.0, np.nan])
+
+
+FIDELITY_EXPORT = """Account Number,Symbol,Description,Quantity,Last Price,Cost Basis Total
+X123,SPY,SPDR S&P 500,"1,000",$500.00,"$400,000.00"
+X123,FCASH**,Cash,25.5,$1.00,--
+X123,LOSS,Loser,10,$1.00,($50.00)
+
+"Brokerage services are provided by Fidelity Brokerage Services LLC"
+"""
+
+COINBASE_EXPORT = """Asset,Amount,Cost Basis
+BTC,0.5,"$15,000.00"
+ETH-USD,2,3000
+"""
+
+
+def test_parse_exports_and_cache_reuse(tmp_path, monkeypatch):
+    from pit_viper.processing import holdings as holdings_module
+    from pit_viper.processing.portfolio import load_holdings
+
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    (exports / "fidelity_ira.csv").write_text(FIDELITY_EXPORT)
+    (exports / "coinbase.csv").write_text(COINBASE_EXPORT)
+    cache_dir = tmp_path / "cache"
+
+    snapshot = load_holdings(exports, cache_dir)
+    frame = snapshot.holdings.set_index("asset_id")
+    assert snapshot.metadata["source"] == "directory"
+    assert frame.loc["SPY", ["quantity", "cost_basis"]].tolist() == [1000.0, 400000.0]
+    assert frame.loc["SPY", "account"] == "X123"
+    assert frame.loc["FCASH", "cost_basis"] == 0.0
+    assert frame.loc["LOSS", "cost_basis"] == -50.0
+    assert frame.loc["BTC-USD", ["asset_type", "account", "cost_basis"]].tolist() == ["crypto", "coinbase", 15000.0]
+    assert len(frame) == 5
+
+    parsed = []
+    original = holdings_module.parse_export
+    monkeypatch.setattr(holdings_module, "parse_export", lambda path: parsed.append(path.name) or original(path))
+
+    assert load_holdings(exports, cache_dir).holdings.equals(snapshot.holdings)
+    assert parsed == []
+
+    coinbase = exports / "coinbase.csv"
+    stat = coinbase.stat()
+    os.utime(coinbase, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    load_holdings(exports, cache_dir)
+    assert parsed == []
+
+    coinbase.write_text(COINBASE_EXPORT.replace("0.5", "0.75"))
+    reloaded = load_holdings(exports, cache_dir).holdings.set_index("asset_id")
+    assert parsed == ["coinbase.csv"]
+    assert reloaded.loc["BTC-USD", "quantity"] == 0.75
+    assert len(list(cache_dir.glob("*.parquet"))) == 2
+
+    monkeypatch.setattr(holdings_module, "PARSER_VERSION", holdings_module.PARSER_VERSION + 1)
+    parsed.clear()
+    load_holdings(exports, cache_dir)
+    assert sorted(parsed) == ["coinbase.csv", "fidelity_ira.csv"]
+    parsed.clear()
+    load_holdings(exports, cache_dir)
+    assert parsed == []
+
+
+def test_identical_exports_keep_their_own_accounts(tmp_path):
+    from pit_viper.processing.portfolio import load_holdings
+
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    for name in ("fidelity_ira.csv", "fidelity_roth.csv"):
+        (exports / name).write_text(COINBASE_EXPORT)
+    cache_dir = tmp_path / "cache"
+
+    for _ in range(2):
+        holdings = load_holdings(exports, cache_dir).holdings
+        assert sorted(holdings["account"].unique()) == ["fidelity_ira", "fidelity_roth"]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pit_viper.processing.feature_pipeline import engineer_features
+from pit_viper.processing.rolling import compute_rolling_features
+
+
+def _panel(assets: int = 4, days: int = 40, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=days)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (assets, days)), axis=1))
+    return pd.DataFrame(
+        {
+            "asset_type": "equity",
+            "asset_id": np.repeat([f"A{idx}" for idx in range(assets)], days),
+            "as_of": np.tile(dates, assets),
+            "close": close.ravel(),
+            "high": close.ravel() * 1.01,
+            "low": close.ravel() * 0.98,
+            "volume": rng.integers(1_000, 5_000, assets * days).astype(float),
+        }
+    ).sample(frac=1.0, random_state=seed)
+
+
+def test_rolling_features_match_grouped_reference():
+    panel = compute_rolling_features(_panel(), horizons=(5,), volatility_window=10, atr_window=5, volume_window=10)
+    grouped = panel.groupby("asset_id")
+
+    momentum = grouped["close"].pct_change(5)
+    log_returns = np.log(panel["close"]).groupby(panel["asset_id"]).diff()
+    volatility = log_returns.groupby(panel["asset_id"]).rolling(10).std().reset_index(level=0, drop=True)
+    volume = grouped["volume"].rolling(10)
+    zscore = ((panel["volume"] - volume.mean().reset_index(level=0, drop=True)) / volume.std().reset_index(level=0, drop=True))
+
+    np.testing.assert_allclose(panel["momentum_5d"], momentum, equal_nan=True)
+    np.testing.assert_allclose(panel["realized_vol_10d"], volatility.sort_index(), equal_nan=True)
+    np.testing.assert_allclose(panel["volume_zscore_10d"], zscore.sort_index(), equal_nan=True)
+    assert panel.groupby("asset_id")["atr_5d"].apply(lambda values: values.isna().sum()).eq(4).all()
+
+
+def test_momentum_proxy_never_spans_assets():
+    combined = pd.DataFrame(
+        {
+            "asset_type": ["equity", "equity"],
+            "asset_id": ["AAA", "BBB"],
+            "close": [10.0, 20.0],
+            "volume": [1.0, 1.0],
+            "as_of": pd.to_datetime(["2024-02-01", "2024-02-01"]),
+        }
+    )
+    history = combined.assign(close=[8.0, 25.0], as_of=pd.to_datetime(["2024-01-31", "2024-01-31"]))
+
+    without_history = engineer_features(combined)
+    with_history = engineer_features(combined, history)
+
+    assert without_history["momentum_proxy"].tolist() == [0.0, 0.0]
+    np.testing.assert_allclose(with_history["momentum_proxy"], [0.25, -0.2])
+
+
+def test_incremental_state_matches_full_recompute(tmp_path):
+    from pit_viper.processing.feature_state import FeatureState
+    from pit_viper.processing.rolling import rolling_feature_columns
+
+    panel = _panel(assets=3, days=90).sort_values(["asset_id", "as_of"])
+    dates = sorted(panel["as_of"].unique())
+    state = FeatureState(tmp_path / "state.parquet")
+    state.seed(panel[panel["as_of"] < dates[-5]])
+    state.save()
+
+    for date in dates[-5:]:
+        current = panel[panel["as_of"] == date].reset_index(drop=True)
+        state = FeatureState.load(tmp_path / "state.parquet")
+        incremental = state.update(current)
+        state.save()
+        full = engineer_features(current, panel[panel["as_of"] < date])
+        for column in rolling_feature_columns():
+            np.testing.assert_allclose(np.nan_to_num(incremental[column]), full[column], rtol=1e-9)
+
+    assert len(FeatureState.load(tmp_path / "state.parquet").bars) == 3 * state.tail_length
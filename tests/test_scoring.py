@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pit_viper.processing.scoring import (
+    ScoringWeights,
+    rank_assets,
+    score_assets,
+    summarize_recommendations,
+    sweep_weights,
+    top_n_per_row,
+    top_n_indices,
+)
+
+
+def _features(assets: int = 500, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "asset_id": [f"A{idx}" for idx in range(assets)],
+            "asset_type": rng.choice(["equity", "crypto", "fund", "bond"], assets),
+            "close": rng.uniform(1, 500, assets),
+            "valuation_proxy": rng.normal(size=assets),
+            "momentum_proxy": rng.normal(size=assets),
+            "volatility_proxy": rng.uniform(0, 1, assets),
+            "liquidity_score": rng.uniform(0, 10, assets),
+        }
+    )
+    frame.loc[::17, "momentum_proxy"] = np.nan
+    return frame
+
+
+def _reference_composite(features: pd.DataFrame, weights: ScoringWeights) -> pd.Series:
+    def normalize(series):
+        return ((series - series.min()) / (series.max() - series.min())).fillna(0)
+
+    diversification = 1 / features.groupby("asset_type")["asset_id"].transform("count")
+    return (
+        normalize(features["valuation_proxy"]) * weights.valuation
+        + normalize(features["momentum_proxy"]) * weights.momentum
+        + normalize(features["liquidity_score"]) * weights.liquidity
+        + (1 - normalize(features["volatility_proxy"])) * weights.risk
+        + diversification * weights.diversification
+    )
+
+
+def test_rank_assets_matches_full_sort():
+    features = _features()
+    weights = ScoringWeights()
+    reference = _reference_composite(features, weights).sort_values(ascending=False)
+
+    ranked = rank_assets(features, weights, top_n=25)
+
+    assert ranked["asset_id"].tolist() == features.loc[reference.index[:25], "asset_id"].tolist()
+    np.testing.assert_allclose(ranked["composite_score"], reference.iloc[:25])
+    pd.testing.assert_frame_equal(ranked, summarize_recommendations(score_assets(features, weights), top_n=25))
+
+
+def test_top_n_indices_orders_ties_by_position():
+    scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9])
+
+    assert top_n_indices(scores, 3).tolist() == [1, 4, 0]
+    assert top_n_indices(scores, 10).tolist() == [1, 4, 0, 2, 3]
+    assert top_n_indices(scores, 0).tolist() == []
+
+
+def test_weight_sweep_matches_individual_rankings():
+    features = _features(assets=300)
+    rng = np.random.default_rng(5)
+    weights = rng.dirichlet(np.ones(5), size=40)
+    weights[:3] = weights[0]
+
+    sweep = sweep_weights(features, weights, top_n=8, max_cells=1_000)
+
+    for scenario in (0, 7, 39):
+        expected = rank_assets(features, ScoringWeights(*weights[scenario]), top_n=8)
+        leaders = sweep.top[sweep.top["scenario"] == scenario]
+        assert leaders["asset_id"].tolist() == expected["asset_id"].tolist()
+        np.testing.assert_allclose(leaders["composite_score"], expected["composite_score"])
+
+    assert sweep.stability["appearances"].sum() == 40 * 8
+    assert sweep.stability["frequency"].between(0, 1).all()
+    assert sweep.overlap[0] == sweep.overlap[1] == sweep.overlap[2]
+    np.testing.assert_allclose(sweep_weights(features, [ScoringWeights()], top_n=8).overlap, [1.0])
+
+
+def test_top_n_per_row_matches_single_row():
+    rng = np.random.default_rng(9)
+    scores = rng.integers(0, 6, size=(12, 50)).astype(float)
+    scores[0] = rng.random(50)
+
+    rows = top_n_per_row(scores, 7)
+
+    for row in range(scores.shape[0]):
+        assert rows[row].tolist() == top_n_indices(scores[row], 7).tolist()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pit_viper.sentiment.scoring import SentimentCache, score_texts, text_key
+
+
+def test_score_texts_deduplicates_and_memoizes(tmp_path):
+    calls = []
+
+    def scorer(text):
+        calls.append(text)
+        return float(len(text))
+
+    cache = SentimentCache(maxsize=10, path=tmp_path / "cache.parquet")
+    texts = ["great quarter", "rug pull", "great quarter", "great quarter"]
+
+    assert score_texts(texts, scorer, cache) == [13.0, 8.0, 13.0, 13.0]
+    assert calls == ["great quarter", "rug pull"]
+
+    cache.save()
+    reloaded = SentimentCache(maxsize=10, path=tmp_path / "cache.parquet")
+    assert score_texts(["rug pull", "to the moon"], scorer, reloaded) == [8.0, 11.0]
+    assert calls[2:] == ["to the moon"]
+
+
+def test_sentiment_cache_evicts_least_recently_used():
+    cache = SentimentCache(maxsize=2)
+    cache.put_many({"a": 1.0, "b": 2.0})
+    cache.get_many(["a"])
+    cache.put_many({"c": 3.0})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1.0, "c": 3.0}
+
+
+def test_parallel_scoring_preserves_order():
+    from pit_viper.sentiment.scoring import vader_compound
+
+    texts = [f"post {idx} is {'great' if idx % 3 else 'terrible'}" for idx in range(200)]
+
+    serial = score_texts(texts, vader_compound)
+    parallel = score_texts(texts, vader_compound, workers=2, parallel_threshold=1)
+
+    assert parallel == serial
+
+
+def test_batch_scorer_receives_only_cache_misses():
+    batches = []
+
+    class BatchScorer:
+        def score_batch(self, texts):
+            batches.append(list(texts))
+            return [float(len(text)) for text in texts]
+
+    cache = SentimentCache(maxsize=10)
+    cache.put_many({text_key("rug pull"): 8.0})
+    texts = ["rug pull", "great quarter", "great quarter", "moon"]
+
+    assert score_texts(texts, BatchScorer(), cache, workers=4, parallel_threshold=1) == [8.0, 13.0, 13.0, 4.0]
+    assert batches == [["great quarter", "moon"]]
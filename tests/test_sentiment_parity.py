@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+vader = pytest.importorskip("vaderSentiment.vaderSentiment")
+
+from pit_viper.sentiment.lexicon import PARITY_TOLERANCE, LexiconScorer
+
+# Reference examples from the VADER project, minus the constructs the lexicon
+# scorer documents as out of scope (emoticons, idioms, "kind of").
+REFERENCE_SENTENCES = [
+    "VADER is smart, handsome, and funny.",
+    "VADER is smart, handsome, and funny!",
+    "VADER is very smart, handsome, and funny.",
+    "VADER is VERY SMART, handsome, and FUNNY.",
+    "VADER is VERY SMART, handsome, and FUNNY!!!",
+    "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "The book was good.",
+    "At least it isn't a horrible book.",
+    "The plot was good, but the characters are uncompelling and the dialog is not great.",
+    "Today SUX!",
+    "Not bad at all",
+    "Sentiment analysis has never been good.",
+    "Sentiment analysis has never been this good!",
+    "Other sentiment analysis tools can be quite bad.",
+    "Without a doubt, excellent idea.",
+    "Roger Dodger is one of the most compelling variations on this theme.",
+    "Roger Dodger is at least compelling as a variation on the theme.",
+    "Roger Dodger is one of the least compelling variations on this theme.",
+    "no good no bad",
+    "AAPL might be overvalued",
+    "Bitcoin consolidating before breakout",
+    "Great great great but bad bad",
+    "",
+    "!!!",
+]
+
+FILLER = (
+    "the market stock price is was will be a an it this that and or not never no very really so "
+    "extremely slightly least at without doubt isn't don't rally crash earnings guidance"
+).split()
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return vader.SentimentIntensityAnalyzer()
+
+
+@pytest.fixture(scope="module")
+def scorer(analyzer):
+    return LexiconScorer(analyzer.lexicon)
+
+
+def _corpus(analyzer, size: int, seed: int, extra: tuple = ()) -> list:
+    rng = random.Random(seed)
+    lexicon = sorted(analyzer.lexicon)
+    filler = list(FILLER) + list(extra)
+    texts = []
+    for _ in range(size):
+        words = [rng.choice(lexicon) if rng.random() < 0.3 else rng.choice(filler) for _ in range(rng.randint(3, 20))]
+        words = [word.upper() if rng.random() < 0.1 else word for word in words]
+        texts.append(" ".join(words) + rng.choice([".", "!", "!!", "?", "??", "???!", ""]))
+    return texts
+
+
+def _reference(analyzer, texts) -> np.ndarray:
+    return np.array([analyzer.polarity_scores(text)["compound"] for text in texts])
+
+
+def test_reference_sentences_match(analyzer, scorer):
+    np.testing.assert_allclose(scorer.score_batch(REFERENCE_SENTENCES), _reference(analyzer, REFERENCE_SENTENCES), atol=PARITY_TOLERANCE)
+
+
+def test_random_corpus_matches_without_but(analyzer, scorer):
+    texts = _corpus(analyzer, 3_000, seed=11)
+    texts = [text for text in texts if "but" not in text.lower().split()]
+    np.testing.assert_allclose(scorer.score_batch(texts), _reference(analyzer, texts), atol=PARITY_TOLERANCE)
+
+
+def test_random_corpus_with_but_stays_close(analyzer, scorer):
+    texts = _corpus(analyzer, 3_000, seed=12, extra=("but", "but"))
+    error = np.abs(scorer.score_batch(texts) - _reference(analyzer, texts))
+    assert (error > PARITY_TOLERANCE).mean() < 0.02
+    assert error.mean() < 1e-3
+
+
+def test_single_text_call_matches_batch(scorer):
+    texts = ["VADER is VERY SMART, handsome, and FUNNY!!!", "The book was good."]
+    assert [scorer(text) for text in texts] == scorer.score_batch(texts).tolist()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Time `python -m pit_viper --help` may add on top of a bare interpreter start.
+HELP_BUDGET_SECONDS = 0.15
+HEAVY_MODULES = ("pandas", "pyarrow", "numpy", "vaderSentiment", "openai", "yfinance", "fredapi", "requests")
+
+_PROBE = """
+import json, runpy, sys
+sys.argv = ["pit_viper"] + sys.argv[1:]
+try:
+    runpy.run_module("pit_viper", run_name="__main__")
+except SystemExit:
+    pass
+heavy = {heavy!r}
+print(json.dumps(sorted({{name.split(".")[0] for name in sys.modules}} & set(heavy))))
+"""
+
+
+def _loaded_modules(*args: str, env: dict | None = None) -> list:
+    probe = _PROBE.format(heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", probe, *args], capture_output=True, text=True, check=True, env=env
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_help_imports_no_heavy_dependencies():
+    assert _loaded_modules("--help") == []
+
+
+def _best_of(command: list, runs: int = 3) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def test_help_fits_startup_budget():
+    baseline = _best_of([sys.executable, "-c", "pass"])
+    help_time = _best_of([sys.executable, "-m", "pit_viper", "--help"])
+    assert help_time - baseline < HELP_BUDGET_SECONDS
+
+
+def test_sentiment_stage_skips_market_and_llm_clients(tmp_path):
+    env = {**os.environ, "PIT_VIPER_DATA_DIR": str(tmp_path), "NEWSAPI_API_KEY": ""}
+    loaded = _loaded_modules("--stage", "sentiment", "--tickers", "AAPL", env=env)
+    assert "vaderSentiment" in loaded
+    assert not {"openai", "yfinance", "fredapi"} & set(loaded)
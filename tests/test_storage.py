@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+
+from pit_viper.processing.feature_pipeline import append_market_history, load_market_history
+from pit_viper.utils.storage import DataStore
+
+
+def _bars(days: int = 6, assets: int = 4) -> pd.DataFrame:
+    dates = pd.bdate_range("2024-04-01", periods=days) + pd.Timedelta(hours=16)
+    return pd.DataFrame(
+        {
+            "asset_type": np.tile(["equity", "equity", "crypto", "crypto"][:assets], days),
+            "asset_id": np.tile(["AAA", "BBB", "BTC-USD", "ETH-USD"][:assets], days),
+            "as_of": np.repeat(dates, assets),
+            "close": np.arange(days * assets, dtype=float) + 1,
+            "high": 0.0,
+            "low": 0.0,
+            "volume": 100.0,
+        }
+    )
+
+
+def test_history_partitions_upserts_and_pushdown_reads(tmp_path):
+    store = DataStore(tmp_path)
+    bars = _bars()
+    store.write_history(bars, "processed")
+
+    layout = sorted(path.relative_to(store.history_path("processed")).as_posix() for path in store.history_path("processed").rglob("*.parquet"))
+    assert layout[0] == "asset_type=crypto/date=2024-04-01/part-0.parquet"
+    assert len(layout) == 12
+    assert store.history_dates("processed")[-1] == pd.Timestamp("2024-04-08")
+
+    revised = bars[bars["as_of"].dt.day == 8].assign(close=-1.0).iloc[:1]
+    store.write_history(revised, "processed")
+    stored = store.read_history("processed")
+    assert len(stored) == len(bars)
+    assert stored.loc[(stored["asset_id"] == "AAA") & (stored["as_of"].dt.day == 8), "close"].tolist() == [-1.0]
+    assert len(stored[stored["as_of"].dt.day == 8]) == 4
+
+    equities = store.read_history("processed", columns=["asset_id", "close", "volume"], start="2024-04-04", asset_types=["equity"])
+    assert list(equities.columns) == ["asset_id", "close", "volume"]
+    assert len(equities) == 2 * 3
+    assert set(equities["asset_id"]) == {"AAA", "BBB"}
+
+    pricey = store.read_history("processed", asset_ids=["ETH-USD"], where=ds.field("close") > 20)
+    assert pricey["close"].tolist() == [24.0]
+
+
+def test_market_history_backfills_from_snapshots_and_limits_lookback(tmp_path):
+    store = DataStore(tmp_path)
+    bars = _bars()
+    for date, frame in list(bars.groupby("as_of"))[:5]:
+        store.write_frame(frame, "processed", f"market_{date.date()}")
+    today = bars[bars["as_of"] == bars["as_of"].max()].assign(quote_source=["live", "live", "mock", "live"])
+
+    append_market_history(store, "processed", today)
+
+    assert len(store.history_dates("processed")) == 6
+    history = load_market_history(store, "processed", lookback=2, columns=["asset_type", "asset_id", "close"], asset_types=["crypto"])
+    assert history["asset_id"].tolist() == ["BTC-USD", "ETH-USD", "ETH-USD"]
+    assert load_market_history(store, "processed").shape == (len(bars) - 1, 7)
+
+
+def test_write_frame_applies_category_schema(tmp_path):
+    import pyarrow.parquet as pq
+
+    from pit_viper.utils.schema import StorageSchema
+
+    store = DataStore(tmp_path)
+    frame = _bars().assign(currency="USD", quote_source="live")
+    path = store.write_frame(frame, "processed", "market_2024-04-08")
+
+    stored = store.read_frame("processed", "market_2024-04-08")
+    assert isinstance(stored["asset_type"].dtype, pd.CategoricalDtype)
+    assert isinstance(stored["quote_source"].dtype, pd.CategoricalDtype)
+    assert stored["close"].dtype == np.float64
+    pd.testing.assert_frame_equal(stored.astype({"asset_type": str, "currency": str, "quote_source": str}), frame, check_dtype=False)
+
+    metadata = pq.ParquetFile(path).metadata.row_group(0)
+    columns = {metadata.column(i).path_in_schema: metadata.column(i) for i in range(metadata.num_columns)}
+    assert columns["close"].compression == "ZSTD"
+    assert columns["asset_id"].is_stats_set and not columns["close"].is_stats_set
+
+    store.schemas["sentiment"] = StorageSchema(float32=("sentiment_score",), compression="snappy", row_group_size=2)
+    path = store.write_frame(pd.DataFrame({"ticker": list("ABC"), "sentiment_score": [0.1, -0.5, 0.25]}), "sentiment", "news")
+    assert store.read_frame("sentiment", "news")["sentiment_score"].dtype == np.float32
+    assert pq.ParquetFile(path).metadata.num_row_groups == 2
+
+
+def test_background_writes_are_ordered_atomic_and_flushed(tmp_path):
+    store = DataStore(tmp_path)
+    store.write_frame(_bars(days=1), "processed", "market_2024-04-01")
+    release = threading.Event()
+    store.submit(release.wait)
+
+    frame = _bars(days=2)
+    pending = store.write_frame_async(frame, "processed", "market_2024-04-01")
+    frame.loc[:, "close"] = -1.0
+    store.write_json_async({"summary": "first"}, "advice", "advice_2024-04-01")
+    store.write_json_async({"summary": "second"}, "advice", "advice_2024-04-01")
+    store.write_frame_async(pd.DataFrame({"bad": [object()]}), "processed", "market_2024-04-01")
+
+    assert len(store.read_frame("processed", "market_2024-04-01")) == 4
+    assert not pending.done()
+    release.set()
+    with pytest.raises(pa.ArrowException):
+        store.flush()
+
+    # The failing write left the previous snapshot in place and no temporary files behind.
+    stored = store.read_frame("processed", "market_2024-04-01")
+    assert len(stored) == 8 and (stored["close"] > 0).all()
+    assert json.loads((tmp_path / "advice" / "advice_2024-04-01.json").read_text()) == {"summary": "second"}
+    assert not list(tmp_path.rglob("*.tmp"))
+    assert [path.name for path in store.list_frames("processed")] == ["market_2024-04-01.parquet"]
+    store.flush()
+
+
+def test_compaction_rolls_months_and_applies_retention(tmp_path):
+    from pit_viper.utils.compaction import compact_category
+
+    store = DataStore(tmp_path)
+    bars = _bars(days=1)
+    for day in ("2024-03-28", "2024-03-29", "2024-04-01", "2024-04-02", "2024-05-01"):
+        store.write_frame(bars.iloc[::-1].assign(as_of=pd.Timestamp(day)), "processed", f"market_{day}")
+        store.write_json({"day": day}, "advice", f"advice_{day}")
+
+    report = compact_category(store, "processed", today=pd.Timestamp("2024-05-03"))
+
+    assert report.compacted == {
+        "market_2024-03.parquet": ["market_2024-03-28.parquet", "market_2024-03-29.parquet"],
+        "market_2024-04.parquet": ["market_2024-04-01.parquet", "market_2024-04-02.parquet"],
+    }
+    names = ["market_2024-05-01.parquet", "market_2024-04.parquet", "market_2024-03.parquet"]
+    assert [path.name for path in store.list_frames("processed", "market_")] == names
+    assert sorted(path.name for path in (tmp_path / "processed").glob("*.parquet")) == sorted(names)
+    march = store.read_frame("processed", "market_2024-03")
+    assert march["snapshot_date"].astype(str).tolist() == ["2024-03-28"] * 4 + ["2024-03-29"] * 4
+    assert march["asset_id"].tolist()[:4] == ["BTC-USD", "ETH-USD", "AAA", "BBB"]
+
+    store.write_frame(bars.assign(close=0.0), "processed", "market_2024-03-29")
+    compact_category(store, "processed", today=pd.Timestamp("2024-05-03"))
+    march = store.read_frame("processed", "market_2024-03")
+    assert len(march) == 8 and (march.loc[march["snapshot_date"] == "2024-03-29", "close"] == 0).all()
+
+    report = compact_category(store, "advice", retention_days=32, today=pd.Timestamp("2024-05-03"))
+    assert report.removed == ["advice_2024-03-28.json", "advice_2024-03-29.json"]
+    assert sorted(store.manifest("advice")) == ["advice_2024-04-01.json", "advice_2024-04-02.json", "advice_2024-05-01.json"]
+    assert len(list((tmp_path / "advice").glob("*.json"))) == 3
+
+
+def test_concurrent_stores_keep_every_manifest_entry(tmp_path):
+    stores = [DataStore(tmp_path), DataStore(tmp_path)]
+    frame = _bars(days=1)
+    errors = []
+
+    def write(store, prefix):
+        try:
+            for idx in range(40):
+                store.write_frame(frame, "processed", f"{prefix}_{idx:03d}")
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(store, prefix)) for store, prefix in zip(stores, ("market", "quotes"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(json.loads((tmp_path / "processed" / "_manifest").read_text())) == 80
+    assert len(stores[0].list_frames("processed")) == 80
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_list_frames_reconciles_manifest_with_directory(tmp_path):
+    store = DataStore(tmp_path)
+    store.write_frame(_bars(days=1), "processed", "market_2024-04-01")
+    store.write_frame(_bars(days=1), "processed", "market_2024-04-02")
+    _bars(days=1).to_parquet(tmp_path / "processed" / "market_2024-04-03.parquet")
+    (tmp_path / "processed" / "market_2024-04-01.parquet").unlink()
+
+    names = [path.name for path in store.list_frames("processed", "market_")]
+
+    assert names == ["market_2024-04-03.parquet", "market_2024-04-02.parquet"]
+    assert sorted(store.manifest("processed")) == sorted(names)
+
+
+def test_schemas_follow_configured_subdirectories(tmp_path):
+    from pit_viper.utils.config import StorageConfig
+    from pit_viper.utils.schema import DEFAULT_SCHEMAS
+
+    storage = StorageConfig(data_dir=tmp_path, processed_subdir="curated", sentiment_subdir="mood")
+    store = DataStore.from_config(storage)
+
+    assert store.schema_for("curated") == DEFAULT_SCHEMAS["processed"]
+    assert store.schema_for("mood") == DEFAULT_SCHEMAS["sentiment"]
+    store.write_frame(pd.DataFrame({"ticker": ["AAA"], "source": ["news"], "sentiment_score": [0.5]}), "mood", "news_2024-04-01")
+    stored = store.read_frame("mood", "news_2024-04-01")
+    assert stored["sentiment_score"].dtype == np.float32
+    assert isinstance(stored["source"].dtype, pd.CategoricalDtype)